@@ -1,7 +1,52 @@
 # app/api/deps.py
-from fastapi import Depends
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+import time
+from typing import Optional
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import database
+from app.core.config import settings
+from app.core.database import get_async_db, primary_session
+from app.services.versions import Version
 
-def get_database() -> Session:
-    return Depends(get_db)
+# Set on responses to writes; while it is in the future the client reads from the primary
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+def get_database() -> AsyncSession:
+    return Depends(get_async_db)
+
+
+def wants_primary(request: Request) -> bool:
+    """Read-your-writes: the client wrote recently, so replicas may not have its data yet."""
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request, primary: AsyncSession = Depends(get_async_db)):
+    """
+    Session for read-only endpoints: a healthy replica when one is configured,
+    otherwise the primary session (which has not connected yet, so it is free to skip).
+    """
+    router = database.replica_router
+    sessionmaker = None if wants_primary(request) else await router.pick()
+    if sessionmaker is None:
+        yield primary
+        return
+    async with sessionmaker() as db:
+        # Kept at hand for reads that must not lag (see primary_session)
+        db.info["primary"] = primary
+        yield db
+
+
+def session_for_version(db: AsyncSession, version: Optional[Version]) -> AsyncSession:
+    """
+    The session to build a response tagged with version from. A replica may not
+    have replayed a change made less than replica_sticky_seconds ago, and a stale
+    body sent under the new ETag would be revalidated with 304s for as long as it
+    is cached, so such responses are read from the primary.
+    """
+    if version is not None and time.time() - version.modified < settings.replica_sticky_seconds:
+        return primary_session(db)
+    return db
@@ -0,0 +1,56 @@
+# app/api/endpoints/admin.py
+import hmac
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from app.core import diagnostics
+from app.core.config import settings
+from app.utils.exceptions import ForbiddenException
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    if not settings.admin_token:
+        raise ForbiddenException("Admin endpoints are disabled; set ADMIN_TOKEN to enable them")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_token):
+        raise ForbiddenException("Invalid admin token")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/slow-queries")
+def get_slow_queries() -> List[Dict[str, Any]]:
+    """
+    Recent statements slower than SLOW_QUERY_MS on this worker, newest last.
+    """
+    return list(diagnostics.slow_queries)
+
+
+@router.get("/n-plus-one")
+def get_n_plus_one_events() -> List[Dict[str, Any]]:
+    """
+    Requests on this worker that ran the same statement N_PLUS_ONE_THRESHOLD times or more.
+    """
+    return list(diagnostics.n_plus_one_events)
+
+
+@router.get("/profiles")
+def get_profiles() -> List[Dict[str, Any]]:
+    """
+    Request profiles captured on this worker (without their reports).
+    """
+    return diagnostics.list_profiles()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: int) -> str:
+    """
+    The text report of one profile, as returned in a profiled response's X-Profile-Id header.
+    """
+    profile = diagnostics.find_profile(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile {profile_id} not found on this worker"
+        )
+    return profile["report"]
@@ -1,12 +1,22 @@
 # app/api/endpoints/books.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List
-from app.core.database import get_db
-from app.schemas.book import BookCreate, BookResponse
-from app.services.book_service import BookService
-from app.utils.exceptions import DatabaseException
+from typing import Any, Dict, List, Optional, Union
+from app.api.deps import get_read_db, session_for_version
+from app.core.database import get_async_db
+from app.schemas.book import (
+    BookCreate, BookResponse, BookPage, BookStatsResponse, BookBulkResult, BookSearchResult, BookSuggestion,
+    BookWithStatsPage
+)
+from app.services.book_service import BookService, BULK_MAX_ITEMS
+from app.services.cache_warmer import cache_warmer
+from app.services.search_service import SearchService
+from app.services.versions import ALL_REVIEWS, CATALOGUE, book_scope, version_service
+from app.utils.conditional import cache_headers, is_not_modified, not_modified_response
+from app.utils.exceptions import BookNotFoundException, DatabaseException, ValidationException
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.responses import precompressed_json_response
 import logging
 from app.core.logger import logger
 
@@ -14,32 +24,71 @@ from app.core.logger import logger
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-@router.get("/", response_model=List[BookResponse])
-async def get_all_books(db: Session = Depends(get_db)):
+# Only include_stats pages go through the response model; the others are cached, pre-validated bodies
+@router.get("/", response_model=Union[BookWithStatsPage, BookPage, List[BookResponse]])
+async def get_all_books(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor"),
+    legacy: bool = Query(False, description="Return the full unpaginated list (old clients)"),
+    include_stats: bool = Query(False, description="Embed rating stats in each book of the page"),
+    db: AsyncSession = Depends(get_read_db)
+):
     """
-    Retrieve all books with caching support.
+    Retrieve books one keyset page at a time, with caching support.
     
-    This endpoint first attempts to retrieve books from Redis cache.
-    If cache is unavailable or data is not found, it falls back to the database.
+    Pages are ordered by id; pass the returned next_cursor to fetch the next one.
+    Each page is cached in Redis, falling back to the database on a miss.
+    Old clients can pass legacy=true to get the previous unpaginated list.
+    With include_stats=true each book carries its rating stats.
+    
+    Responses carry an ETag/Last-Modified from the catalogue version; a matching
+    If-None-Match or If-Modified-Since gets a 304 without a database query.
     """
     try:
-        books = await BookService.get_all_books(db)
-        return books
+        # Read the version before the data, so the tag is never newer than the body
+        version = await version_service.get(*((CATALOGUE, ALL_REVIEWS) if include_stats else (CATALOGUE,)))
+        if version is not None:
+            # The full list ignores limit and cursor
+            version = version.varied(legacy=True) if legacy else version.varied(
+                limit=limit, cursor=cursor or "", include_stats=include_stats
+            )
+        if is_not_modified(request, version):
+            return not_modified_response(version)
+        db = session_for_version(db, version)
+        headers = cache_headers(version)
+
+        # Cached bodies are already validated against the response model: send them as-is
+        # (with their compressed variants, picked by Accept-Encoding)
+        if legacy:
+            return precompressed_json_response(request, await BookService.get_all_books_payload(db), headers)
+        if not include_stats:
+            payload = await BookService.get_books_page_payload(db, limit, cursor)
+            return precompressed_json_response(request, payload, headers)
+
+        page = await BookService.get_books_page(db, limit, cursor)
+        stats = await BookService.get_stats_for_books(db, [item["id"] for item in page["items"]])
+        page["items"] = [{**item, "stats": stats[item["id"]]} for item in page["items"]]
+        response.headers.update(headers)
+        return page
+    except ValidationException:
+        raise
     except SQLAlchemyError as e:
-        logger.error(f"Database error retrieving books: {e}")
+        logger.error("Database error retrieving books: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Database error occurred while retrieving books"
         )
     except Exception as e:
-        logger.error(f"Unexpected error retrieving books: {e}")
+        logger.error("Unexpected error retrieving books: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to retrieve books"
         )
 
 @router.post("/", response_model=BookResponse, status_code=status.HTTP_201_CREATED)
-async def create_book(book_data: BookCreate, db: Session = Depends(get_db)):
+async def create_book(book_data: BookCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new book.
     
@@ -51,7 +100,7 @@ async def create_book(book_data: BookCreate, db: Session = Depends(get_db)):
     except ValueError as e:
         # Handle specific validation/business logic errors
         error_msg = str(e)
-        logger.error(f"Validation error creating book: {error_msg}")
+        logger.error("Validation error creating book: %s", error_msg)
         
         if "already exists" in error_msg:
             raise HTTPException(
@@ -64,14 +113,101 @@ async def create_book(book_data: BookCreate, db: Session = Depends(get_db)):
                 detail=error_msg
             )
     except SQLAlchemyError as e:
-        logger.error(f"Database error creating book: {e}")
+        logger.error("Database error creating book: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Database error occurred while creating book"
         )
     except Exception as e:
-        logger.error(f"Unexpected error creating book: {e}")
+        logger.error("Unexpected error creating book: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create book"
-        )
\ No newline at end of file
+        )
+
+@router.post("/bulk", response_model=BookBulkResult)
+async def bulk_create_books(
+    rows: List[Dict[str, Any]] = Body(..., description=f"Up to {BULK_MAX_ITEMS} books"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create many books in one batched transaction.
+    
+    Rows are validated individually; invalid rows and ISBN conflicts are listed in
+    "errors" by their index without aborting the rest of the batch.
+    """
+    if len(rows) > BULK_MAX_ITEMS:
+        raise ValidationException(f"A bulk request may contain at most {BULK_MAX_ITEMS} books")
+    try:
+        return await BookService.bulk_create_books(db, rows)
+    except SQLAlchemyError as e:
+        logger.error("Database error bulk creating books: %s", e)
+        raise DatabaseException("Database error occurred while creating books")
+
+@router.get("/search", response_model=BookSearchResult)
+async def search_books(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    prefix: bool = Query(False, description="Match the last word as a prefix (search-as-you-type)"),
+    include_reviews: bool = Query(False, description="Also match books by their review comments"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Ranked full-text search over title, author and description.
+    
+    Title matches rank above author matches, which rank above description matches.
+    """
+    try:
+        books = await SearchService.search_books(db, q, limit, offset, prefix, include_reviews)
+        return {"query": q, "items": books, "limit": limit, "offset": offset}
+    except Exception as e:
+        logger.error("Error searching books for %r: %s", q, e)
+        raise DatabaseException("Failed to search books")
+
+
+@router.get("/search/suggest", response_model=List[BookSuggestion])
+async def suggest_books(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=25),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Autocomplete suggestions for a partially typed query.
+    """
+    try:
+        return await SearchService.suggest_titles(db, q, limit)
+    except Exception as e:
+        logger.error("Error suggesting books for %r: %s", q, e)
+        raise DatabaseException("Failed to suggest books")
+
+@router.get("/{book_id}/stats", response_model=BookStatsResponse)
+async def get_book_stats(
+    book_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Review count, average rating and 1-5 star histogram for a book.
+    
+    Served from precomputed aggregates, so the cost does not grow with the number of reviews.
+    Conditional requests are answered from the book's version counter.
+    """
+    try:
+        version = await version_service.get(book_scope(book_id))
+        if is_not_modified(request, version):
+            cache_warmer.record_hit(book_id)
+            return not_modified_response(version)
+        db = session_for_version(db, version)
+        stats = await BookService.get_book_stats(db, book_id)
+        if stats is None:
+            raise BookNotFoundException(book_id)
+        cache_warmer.record_hit(book_id)
+        response.headers.update(cache_headers(version))
+        return stats
+    except BookNotFoundException:
+        raise
+    except Exception as e:
+        logger.error("Error retrieving stats for book %s: %s", book_id, e)
+        raise DatabaseException("Failed to retrieve book stats")
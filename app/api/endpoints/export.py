@@ -0,0 +1,45 @@
+# app/api/endpoints/export.py
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_read_db
+from app.services.export_service import ExportService
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+def _export_response(db: AsyncSession, table_name: str, file_format: str, gzip: bool) -> StreamingResponse:
+    # The session dependency is closed only after the streamed body has been sent
+    return StreamingResponse(
+        ExportService.stream_table(db, table_name, file_format, gzip),
+        media_type=ExportService.media_type(file_format, gzip),
+        headers={
+            "Content-Disposition": f'attachment; filename="{ExportService.filename(table_name, file_format, gzip)}"'
+        }
+    )
+
+
+@router.get("/books")
+async def export_books(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = Query(False, description="Gzip the dump"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Stream a full dump of the books table as NDJSON or CSV.
+    """
+    return _export_response(db, "books", format, gzip)
+
+
+@router.get("/reviews")
+async def export_reviews(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = Query(False, description="Gzip the dump"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Stream a full dump of the reviews table as NDJSON or CSV.
+    """
+    return _export_response(db, "reviews", format, gzip)
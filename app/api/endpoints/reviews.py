@@ -1,53 +1,131 @@
 # app/api/endpoints/reviews.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
-from app.schemas.review import ReviewCreate, ReviewResponse
-from app.services.book_service import BookService
-from app.utils.exceptions import BookNotFoundException, DatabaseException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional, Union
+from app.api.deps import get_read_db, session_for_version
+from app.core.database import get_async_db
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.schemas.review import ReviewCreate, ReviewResponse, ReviewPage, ReviewBulkResult, ReviewQueued
+from app.services.book_index import book_id_index
+from app.services.book_service import BookService, BULK_MAX_ITEMS
+from app.services.cache_warmer import cache_warmer
+from app.services.review_queue import review_queue
+from app.services.versions import book_scope, version_service
+from app.utils.conditional import cache_headers, is_not_modified, not_modified_response
+from app.utils.exceptions import BookNotFoundException, DatabaseException, ValidationException
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Remove the /books prefix from the routes since they should be mounted under /books
-@router.get("/{book_id}/reviews", response_model=List[ReviewResponse])
-def get_book_reviews(book_id: int, db: Session = Depends(get_db)):
+@router.get("/{book_id}/reviews", response_model=Union[ReviewPage, List[ReviewResponse]])
+async def get_book_reviews(
+    book_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor"),
+    legacy: bool = Query(False, description="Return every review unpaginated (old clients)"),
+    db: AsyncSession = Depends(get_read_db)
+):
     """
-    Retrieve all reviews for a specific book.
+    Retrieve reviews for a specific book, one keyset page at a time.
     
-    Returns reviews sorted by creation date (newest first).
+    Returns reviews sorted by creation date (newest first). Pass the returned
+    next_cursor to fetch the next page; legacy=true returns the full list.
+    Unchanged reviews are answered with 304 to If-None-Match/If-Modified-Since.
     """
     try:
-        # Check if book exists
-        book = BookService.get_book_by_id(db, book_id)
-        if not book:
+        version = await version_service.get(book_scope(book_id))
+        if version is not None:
+            version = version.varied(legacy=True) if legacy else version.varied(limit=limit, cursor=cursor or "")
+        if is_not_modified(request, version):
+            cache_warmer.record_hit(book_id)
+            return not_modified_response(version)
+        db = session_for_version(db, version)
+
+        if legacy:
+            if not await BookService.book_exists(db, book_id):
+                raise BookNotFoundException(book_id)
+            reviews = await BookService.get_reviews_by_book_id(db, book_id)
+            response.headers.update(cache_headers(version))
+            return reviews
+
+        page = await BookService.get_reviews_page(db, book_id, limit, cursor)
+        if page is None:
             raise BookNotFoundException(book_id)
-        
-        reviews = BookService.get_reviews_by_book_id(db, book_id)
-        return reviews
-    except BookNotFoundException:
+        # Counted towards the books whose stats and first review page the warmer keeps hot
+        cache_warmer.record_hit(book_id)
+        response.headers.update(cache_headers(version))
+        return page
+    except (BookNotFoundException, ValidationException):
         raise
     except Exception as e:
-        logger.error(f"Error retrieving reviews for book {book_id}: {e}")
+        logger.error("Error retrieving reviews for book %s: %s", book_id, e)
         raise DatabaseException("Failed to retrieve reviews")
 
-@router.post("/{book_id}/reviews", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
-async def create_book_review(book_id: int, review_data: ReviewCreate, db: Session = Depends(get_db)):
+@router.post(
+    "/{book_id}/reviews",
+    response_model=ReviewResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": ReviewQueued, "description": "Queued for a review worker"}}
+)
+async def create_book_review(book_id: int, review_data: ReviewCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new review for a specific book.
+    
+    With REVIEW_INGEST_MODE=queue the review is validated, enqueued and answered
+    with 202; a review worker inserts it shortly after. Without Redis the review
+    is inserted synchronously as usual.
+    """
+    if settings.review_ingest_mode == "queue" and review_queue.available:
+        try:
+            if not await book_id_index.contains(db, book_id):
+                raise BookNotFoundException(book_id)
+            message_id = await review_queue.enqueue(book_id, review_data)
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=ReviewQueued(message_id=message_id, book_id=book_id).model_dump()
+            )
+        except BookNotFoundException:
+            raise
+        except Exception as e:
+            # Fall through to the synchronous insert rather than lose the review
+            logger.error("Failed to enqueue review for book %s, inserting directly: %s", book_id, e)
+
+    try:
+        # No existence check up front: the reviews.book_id foreign key rejects unknown books
+        return await BookService.create_review(db, book_id, review_data)
+    except LookupError:
+        raise BookNotFoundException(book_id)
+    except Exception as e:
+        logger.error("Error creating review for book %s: %s", book_id, e)
+        raise DatabaseException("Failed to create review")
+
+@router.post("/{book_id}/reviews/bulk", response_model=ReviewBulkResult)
+async def bulk_create_book_reviews(
+    book_id: int,
+    rows: List[Dict[str, Any]] = Body(..., description=f"Up to {BULK_MAX_ITEMS} reviews"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
+    Create many reviews for a book in one batched transaction.
+    
+    Invalid rows are listed in "errors" by their index; the book's stats and
+    cached review pages are refreshed once for the whole batch.
+    """
+    if len(rows) > BULK_MAX_ITEMS:
+        raise ValidationException(f"A bulk request may contain at most {BULK_MAX_ITEMS} reviews")
     try:
-        # Check if book exists
-        book = BookService.get_book_by_id(db, book_id)
-        if not book:
+        if not await BookService.book_exists(db, book_id):
             raise BookNotFoundException(book_id)
-        
-        review = await BookService.create_review(db, book_id, review_data)
-        return review
+
+        return await BookService.bulk_create_reviews(db, rows, book_id=book_id)
     except BookNotFoundException:
         raise
     except Exception as e:
-        logger.error(f"Error creating review for book {book_id}: {e}")
-        raise DatabaseException("Failed to create review")
\ No newline at end of file
+        logger.error("Error bulk creating reviews for book %s: %s", book_id, e)
+        raise DatabaseException("Failed to create reviews")
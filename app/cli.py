@@ -0,0 +1,186 @@
+# app/cli.py
+"""
+Command line tools for operating the service.
+
+    python -m app.cli import-books books.ndjson
+    python -m app.cli import-reviews reviews.csv --batch-size 1000
+    python -m app.cli export-books books.ndjson.gz
+    python -m app.cli review-worker --consumer worker-1
+    python -m app.cli warm-cache --top 200
+"""
+import argparse
+import asyncio
+import csv
+import gzip
+import json
+import logging
+import os
+import socket
+import sys
+from typing import Any, Awaitable, Dict, Iterator, List
+from app.core import database
+from app.core.database import dispose_engines
+from app.core.logger import configure_logging
+from app.services.book_service import BookService, BULK_MAX_ITEMS
+from app.services.cache_warmer import cache_warmer
+from app.services.export_service import ExportService, EXPORT_FORMATS
+from app.services.review_queue import review_queue
+
+logger = logging.getLogger(__name__)
+
+
+def _detect_format(path: str, explicit: str) -> str:
+    if explicit:
+        return explicit
+    name = path.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    return "csv" if name.endswith(".csv") else "ndjson"
+
+
+def read_rows(path: str, file_format: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream rows from an NDJSON or CSV file (gzipped if it ends in .gz) without
+    loading it into memory. Empty CSV cells are treated as missing values.
+    """
+    opener = gzip.open if path.lower().endswith(".gz") else open
+    with opener(path, "rt", newline="", encoding="utf-8") as handle:
+        if file_format == "csv":
+            for row in csv.DictReader(handle):
+                yield {key: value for key, value in row.items() if value not in ("", None)}
+        else:
+            for line_number, line in enumerate(handle, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    # Report and skip the line rather than aborting the import
+                    print(f"line {line_number}: invalid JSON: {e}", file=sys.stderr)
+
+
+def batched(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def import_file(kind: str, path: str, file_format: str, batch_size: int) -> Dict[str, int]:
+    totals = {"created": 0, "errors": 0}
+    offset = 0
+    for batch in batched(read_rows(path, file_format), batch_size):
+        async with database.AsyncSessionLocal() as db:
+            if kind == "books":
+                result = await BookService.bulk_create_books(db, batch)
+            else:
+                result = await BookService.bulk_create_reviews(db, batch)
+        totals["created"] += len(result["created"])
+        totals["errors"] += len(result["errors"])
+        for error in result["errors"]:
+            print(f"row {offset + error['index'] + 1}: {error['error']}", file=sys.stderr)
+        offset += len(batch)
+        print(f"{kind}: {offset} rows processed, {totals['created']} created, {totals['errors']} rejected")
+    return totals
+
+
+async def export_file(table_name: str, path: str, file_format: str) -> None:
+    compress = path.lower().endswith(".gz")
+    async with database.AsyncSessionLocal() as db:
+        with open(path, "wb") as handle:
+            async for chunk in ExportService.stream_table(db, table_name, file_format, compress):
+                handle.write(chunk)
+    print(f"{table_name}: exported to {path}")
+
+
+async def run_review_worker(consumer: str, batch_size: int, once: bool) -> Dict[str, int]:
+    totals = await review_queue.run_worker(
+        database.AsyncSessionLocal, consumer, batch_size=batch_size, stop_when_empty=once
+    )
+    print(f"review-worker {consumer}: {totals['created']} created, {totals['rejected']} rejected")
+    return totals
+
+
+async def warm_cache(top_n: int) -> Dict[str, int]:
+    totals = await cache_warmer.warm(database.AsyncSessionLocal, top_n)
+    print(f"warm-cache: {totals['pages']} catalogue pages, {totals['books']} books")
+    return totals
+
+
+def run(coro: Awaitable[Any]) -> Any:
+    """
+    asyncio.run, then close the engines (see dispose_engines) so the process can exit.
+    """
+    async def main():
+        try:
+            return await coro
+        finally:
+            await dispose_engines()
+
+    return asyncio.run(main())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Book Review Service tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for kind in ("books", "reviews"):
+        command = commands.add_parser(f"import-{kind}", help=f"Bulk load {kind} from an NDJSON or CSV file")
+        command.add_argument("path")
+        command.add_argument("--format", choices=["ndjson", "csv"], default="",
+                             help="File format (default: from the file extension)")
+        command.add_argument("--batch-size", type=int, default=1000,
+                             help=f"Rows per transaction (max {BULK_MAX_ITEMS})")
+        command.set_defaults(kind=kind)
+
+        command = commands.add_parser(f"export-{kind}", help=f"Dump all {kind} to NDJSON or CSV (.gz to compress)")
+        command.add_argument("path")
+        command.add_argument("--format", choices=list(EXPORT_FORMATS), default="",
+                             help="File format (default: from the file extension)")
+        command.set_defaults(kind=kind)
+
+    command = commands.add_parser("review-worker", help="Insert reviews queued by POST /books/{id}/reviews")
+    command.add_argument("--consumer", default=f"{socket.gethostname()}-{os.getpid()}",
+                         help="Consumer name, unique per worker (default: host-pid)")
+    command.add_argument("--batch-size", type=int, default=0,
+                         help="Reviews per transaction (default: REVIEW_BATCH_SIZE)")
+    command.add_argument("--once", action="store_true", help="Exit once the queue is empty")
+
+    command = commands.add_parser("warm-cache", help="Fill the hottest cache keys now (e.g. after a Redis flush)")
+    command.add_argument("--top", type=int, default=None,
+                         help="Most-read books to warm (default: CACHE_WARM_TOP_N)")
+
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    configure_logging()
+
+    if args.command.startswith("import-"):
+        batch_size = max(1, min(args.batch_size, BULK_MAX_ITEMS))
+        totals = run(
+            import_file(args.kind, args.path, _detect_format(args.path, args.format), batch_size)
+        )
+        return 1 if totals["errors"] else 0
+    if args.command == "review-worker":
+        try:
+            run(run_review_worker(args.consumer, args.batch_size or None, args.once))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    if args.command == "warm-cache":
+        run(warm_cache(args.top))
+        return 0
+    if args.command.startswith("export-"):
+        run(export_file(args.kind, args.path, _detect_format(args.path, args.format)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# app/core/circuit_breaker.py
+"""
+Circuit breaker for calls to a dependency that may become slow or unreachable.
+
+closed     calls go through; failure_threshold consecutive failures trip it open.
+           A call slower than latency_budget counts as a failure even if it succeeded.
+open       calls are refused without being attempted, for reset_timeout seconds.
+half_open  one trial call is let through: success closes the breaker, failure
+           re-opens it for another reset_timeout.
+"""
+import logging
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a call while the breaker refuses calls."""
+
+
+class CircuitBreaker:
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, latency_budget: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency_budget = latency_budget
+        self.reset()
+
+    def reset(self) -> None:
+        self._state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self.last_error: Optional[str] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() >= self.opened_at + self.reset_timeout:
+            self._state = HALF_OPEN
+        return self._state
+
+    @property
+    def available(self) -> bool:
+        """Whether a call would currently be let through (without claiming it)."""
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and not self._trial_in_flight)
+
+    def before_call(self) -> None:
+        """Claim permission for one call; raises CircuitOpenError when refused."""
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        raise CircuitOpenError(f"{self.name} circuit is {state}")
+
+    def record_success(self, elapsed: float) -> None:
+        if elapsed > self.latency_budget:
+            self.record_failure(f"call took {elapsed * 1000:.0f} ms, budget is {self.latency_budget * 1000:.0f} ms")
+            return
+        if self._state != CLOSED:
+            logger.info("%s circuit closed, calls resumed", self.name)
+        self._state = CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self, error: str) -> None:
+        self.last_error = error
+        self.consecutive_failures += 1
+        trial_failed = self._state == HALF_OPEN
+        self._trial_in_flight = False
+        if trial_failed or (self._state == CLOSED and self.consecutive_failures >= self.failure_threshold):
+            self._state = OPEN
+            self.opened_at = time.monotonic()
+            self.trips += 1
+            logger.warning(
+                "%s circuit opened after %s failures (retrying in %.0fs): %s",
+                self.name, self.consecutive_failures, self.reset_timeout, error
+            )
+
+    def release(self) -> None:
+        """Give back a claimed half-open trial whose call was cancelled before it finished."""
+        self._trial_in_flight = False
+
+    def status(self) -> Dict[str, Any]:
+        state = self.state
+        status = {
+            "state": state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "last_error": self.last_error,
+        }
+        if state == OPEN:
+            status["retry_in"] = round(max(self.opened_at + self.reset_timeout - time.monotonic(), 0.0), 3)
+        return status
@@ -1,16 +1,250 @@
 # app/core/database.py
-from sqlalchemy import create_engine
+import asyncio
+import logging
+import uuid
+from typing import Any, Dict, Optional
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .diagnostics import instrument_queries
+from .metrics import instrument_engine
+from .pool import TimedAsyncQueuePool, TimedNullPool, TimedQueuePool, pool_status
+from .replicas import ReplicaRouter
+
+logger = logging.getLogger(__name__)
+
+# Async drivers used for each sync dialect when no explicit async URL is configured
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Derive the async driver URL from a sync one, e.g.
+    postgresql+psycopg2://... -> postgresql+asyncpg://...
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    Pool and driver keyword arguments for create_engine/create_async_engine,
+    built from the db_* settings.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite lives inside a single connection; keep the dialect's StaticPool
+        return {}
+
+    options: Dict[str, Any] = {"pool_pre_ping": settings.db_pool_pre_ping}
+    connect_args: Dict[str, Any] = {}
+
+    if settings.db_pgbouncer:
+        # PgBouncer owns the pool; holding connections here would just pin server slots
+        options["poolclass"] = TimedNullPool
+        if parsed.get_driver_name() == "asyncpg":
+            # Prepared statements do not survive transaction pooling
+            connect_args.update(
+                statement_cache_size=0,
+                prepared_statement_cache_size=0,
+                prepared_statement_name_func=lambda: f"__asyncpg_{uuid.uuid4()}__",
+            )
+    else:
+        options.update(
+            poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+
+    # PgBouncer rejects unknown startup parameters, so set the timeout on the role there instead
+    if backend == "postgresql" and settings.db_statement_timeout_ms > 0 and not settings.db_pgbouncer:
+        timeout = str(settings.db_statement_timeout_ms)
+        if is_async:
+            connect_args["server_settings"] = {"statement_timeout": timeout}
+        else:
+            connect_args["options"] = f"-c statement_timeout={timeout}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def enable_sqlite_foreign_keys(engine: Engine) -> None:
+    """
+    SQLite leaves FOREIGN KEY constraints unenforced unless each connection
+    turns them on; review inserts rely on them to reject unknown books.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+_engine: Optional[Engine] = None
+_session_local: Optional[sessionmaker] = None
+_async_engine: Optional[AsyncEngine] = None
+_async_session_local: Optional[async_sessionmaker] = None
+_replica_router: Optional[ReplicaRouter] = None
+
+
+def get_engine() -> Engine:
+    """
+    Sync engine, used by Alembic migrations and offline scripts. Built on first
+    use so the API, which only needs the async engine, never loads the sync driver.
+    """
+    global _engine, _session_local
+    if _engine is None:
+        _engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+        _session_local = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+        enable_sqlite_foreign_keys(_engine)
+        instrument_engine(_engine, "primary_sync")
+        instrument_queries(_engine, "primary_sync")
+    return _engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Async engine, used by the API request path so DB I/O never blocks the event
+    loop. Built on first use like the sync engine, and closed by dispose_engines.
+    """
+    global _async_engine, _async_session_local
+    if _async_engine is None:
+        url = settings.async_database_url or to_async_url(settings.database_url)
+        _async_engine = create_async_engine(url, **engine_options(url, is_async=True))
+        _async_session_local = async_sessionmaker(
+            bind=_async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+        enable_sqlite_foreign_keys(_async_engine.sync_engine)
+        instrument_engine(_async_engine.sync_engine, "primary")
+        instrument_queries(_async_engine.sync_engine, "primary")
+    return _async_engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    get_async_engine()
+    return _async_session_local
+
+
+def get_replica_router() -> ReplicaRouter:
+    """Read replicas: only read-only endpoints use them, via app.api.deps.get_read_db."""
+    global _replica_router
+    if _replica_router is None:
+        _replica_router = create_replica_router()
+    return _replica_router
+
+
+async def dispose_engines() -> None:
+    """
+    Close the async engines' pooled connections: aiosqlite runs each connection
+    in a non-daemon thread, which would keep the process from exiting. The
+    engines are built again if used afterwards.
+    """
+    global _async_engine, _async_session_local, _replica_router
+    if _replica_router is not None:
+        await _replica_router.dispose()
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = _async_session_local = _replica_router = None
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from app.core.database import engine, SessionLocal, ...` working lazily
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        get_engine()
+        return _session_local
+    if name == "async_engine":
+        return get_async_engine()
+    if name == "AsyncSessionLocal":
+        return get_async_sessionmaker()
+    if name == "replica_router":
+        return get_replica_router()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def create_replica_router() -> ReplicaRouter:
+    engines = []
+    for url in filter(None, (url.strip() for url in settings.database_replica_urls.split(","))):
+        url = to_async_url(url)
+        replica_engine = create_async_engine(url, **engine_options(url, is_async=True))
+        instrument_engine(replica_engine.sync_engine, f"replica{len(engines)}")
+        instrument_queries(replica_engine.sync_engine, f"replica{len(engines)}")
+        engines.append(replica_engine)
+    return ReplicaRouter(
+        engines,
+        check_interval=settings.replica_health_interval,
+        check_timeout=settings.replica_health_timeout,
+    )
+
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+
+def primary_session(db: AsyncSession) -> AsyncSession:
+    """
+    The primary session behind a replica read session (app.api.deps.get_read_db),
+    or db itself. Used for anything that must not see replication lag: cache
+    fills shared by every client, and responses tagged with a just-bumped version.
+    """
+    if isinstance(db, AsyncSession):
+        return db.info.get("primary", db)
+    return db
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Live occupancy and wait time statistics for the request-path pool."""
+    stats = pool_status(get_async_engine().sync_engine.pool)
+    replica_router = get_replica_router()
+    if replica_router.enabled:
+        stats["replicas"] = [
+            {**status, **pool_status(replica.engine.sync_engine.pool)}
+            for status, replica in zip(replica_router.status(), replica_router.replicas)
+        ]
+    return stats
+
+
+async def ping_database(timeout: float) -> bool:
+    """True if the primary answers SELECT 1 within timeout seconds."""
+    async def select_one():
+        async with get_async_engine().connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    try:
+        await asyncio.wait_for(select_one(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        logger.warning("Database did not answer a ping within %ss", timeout)
+        return False
+    except Exception as e:
+        logger.warning("Database ping failed: %s", e)
+        return False
+
+
 def get_db():
-    db = SessionLocal()
+    get_engine()
+    db = _session_local()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -0,0 +1,201 @@
+# app/core/diagnostics.py
+"""
+Request-scoped diagnostics: per-request query counting with N+1 detection,
+a slow-query log and on-demand request profiles.
+
+Findings go to the "app.diagnostics" logger as structured records (see
+app/core/logger.py) and to small in-memory buffers read by the admin
+endpoints. The buffers are per worker process.
+"""
+import contextvars
+import cProfile
+import io
+import itertools
+import logging
+import pstats
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .config import settings
+
+try:
+    from pyinstrument import Profiler as _PyinstrumentProfiler
+except ImportError:  # optional dependency; cProfile is always available
+    _PyinstrumentProfiler = None
+
+logger = logging.getLogger("app.diagnostics")
+
+# Longest statement/parameter text kept in a log record
+MAX_STATEMENT_CHARS = 2000
+MAX_PARAMETER_CHARS = 500
+
+
+@dataclass
+class RequestStats:
+    method: str
+    path: str
+    query_count: int = 0
+    query_time: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+
+_current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "current_request", default=None
+)
+
+slow_queries: Deque[Dict[str, Any]] = deque(maxlen=settings.diagnostics_buffer_size)
+n_plus_one_events: Deque[Dict[str, Any]] = deque(maxlen=settings.diagnostics_buffer_size)
+profiles: Deque[Dict[str, Any]] = deque(maxlen=settings.diagnostics_buffer_size)
+_profile_ids = itertools.count(1)
+
+
+def _truncate(value: Any, limit: int) -> str:
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def begin_request(method: str, path: str) -> contextvars.Token:
+    return _current_request.set(RequestStats(method=method, path=path))
+
+
+def end_request(token: contextvars.Token) -> Optional[RequestStats]:
+    """Close the request's query accounting and report statements repeated N+1 style."""
+    stats = _current_request.get()
+    _current_request.reset(token)
+    if stats is None:
+        return None
+    threshold = settings.n_plus_one_threshold
+    repeated = [(statement, count) for statement, count in stats.statements.items() if count >= threshold]
+    for statement, count in repeated:
+        record = {
+            "event": "n_plus_one",
+            "method": stats.method,
+            "path": stats.path,
+            "statement": _truncate(statement, MAX_STATEMENT_CHARS),
+            "count": count,
+            "request_query_count": stats.query_count,
+            "timestamp": time.time(),
+        }
+        n_plus_one_events.append(record)
+        logger.warning(
+            "Possible N+1: statement ran %s times in %s %s", count, stats.method, stats.path,
+            extra={"diagnostics": record},
+        )
+    return stats
+
+
+def instrument_queries(engine: Engine, database: str) -> None:
+    """
+    Count statements per request and log the ones slower than slow_query_ms.
+    For an AsyncEngine pass engine.sync_engine; the events run in the
+    awaiting task's context, so the request contextvar is visible.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("diagnostics_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["diagnostics_start_time"].pop()
+        stats = _current_request.get()
+        if stats is not None:
+            stats.query_count += 1
+            stats.query_time += elapsed
+            stats.statements[statement] += 1
+
+        if elapsed * 1000 >= settings.slow_query_ms:
+            record = {
+                "event": "slow_query",
+                "database": database,
+                "duration_ms": round(elapsed * 1000, 3),
+                "statement": _truncate(statement, MAX_STATEMENT_CHARS),
+                "parameters": _truncate(parameters, MAX_PARAMETER_CHARS),
+                "path": stats.path if stats else None,
+                "timestamp": time.time(),
+            }
+            slow_queries.append(record)
+            logger.warning("Slow query (%s ms) on %s", record["duration_ms"], database,
+                           extra={"diagnostics": record})
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        starts = context.connection.info.get("diagnostics_start_time") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+class RequestProfiler:
+    """
+    Profiles one request with pyinstrument when installed (async-aware), else
+    cProfile. cProfile sees everything the worker's thread runs meanwhile, so
+    concurrent requests show up in its output too.
+    """
+
+    # Profilers are per thread and don't nest; only one request is profiled at a time
+    _active = False
+
+    def __init__(self):
+        self.id = next(_profile_ids)
+        if _PyinstrumentProfiler is not None:
+            self._profiler = _PyinstrumentProfiler(async_mode="enabled")
+        else:
+            self._profiler = cProfile.Profile()
+        self._started = time.perf_counter()
+
+    @classmethod
+    def try_start(cls) -> Optional["RequestProfiler"]:
+        if cls._active:
+            return None
+        cls._active = True
+        try:
+            profiler = cls()
+            if isinstance(profiler._profiler, cProfile.Profile):
+                profiler._profiler.enable()
+            else:
+                profiler._profiler.start()
+        except Exception as e:
+            cls._active = False
+            logger.warning("Could not start request profiler: %s", e)
+            return None
+        return profiler
+
+    def stop(self, method: str, path: str, status_code: int) -> Dict[str, Any]:
+        try:
+            if isinstance(self._profiler, cProfile.Profile):
+                self._profiler.disable()
+                output = io.StringIO()
+                pstats.Stats(self._profiler, stream=output).sort_stats("cumulative").print_stats(50)
+                engine, report = "cProfile", output.getvalue()
+            else:
+                self._profiler.stop()
+                engine, report = "pyinstrument", self._profiler.output_text(unicode=False, color=False)
+        finally:
+            RequestProfiler._active = False
+
+        stats = _current_request.get()
+        record = {
+            "id": self.id,
+            "method": method,
+            "path": path,
+            "status": status_code,
+            "duration_ms": round((time.perf_counter() - self._started) * 1000, 3),
+            "query_count": stats.query_count if stats else None,
+            "profiler": engine,
+            "timestamp": time.time(),
+        }
+        profiles.append({**record, "report": report})
+        logger.info("Profiled %s %s as profile %s", method, path, record["id"],
+                    extra={"diagnostics": {"event": "profile", **record}})
+        return record
+
+
+def find_profile(profile_id: int) -> Optional[Dict[str, Any]]:
+    return next((profile for profile in profiles if profile["id"] == profile_id), None)
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    return [{key: value for key, value in profile.items() if key != "report"} for profile in profiles]
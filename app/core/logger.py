@@ -1,22 +1,173 @@
 # app/core/logger.py
+"""
+Logging pipeline: records are put on a bounded in-memory queue by a
+QueueHandler and written out by a QueueListener thread, so the request path
+never formats a message or touches stdout or disk.
+
+- Output is one JSON object per line (LOG_FORMAT=text for a readable console).
+- Records emitted while serving a request carry its correlation id
+  (request_id, set by app/middleware/request_id.py).
+- LOG_SAMPLE_RATE keeps that fraction of requests' INFO/DEBUG records, decided
+  per request so a sampled request keeps all of its lines. Warnings, errors,
+  diagnostics and anything logged outside a request are always kept.
+- If the writer falls behind and the queue fills up, records are dropped and
+  counted rather than blocking the caller.
+"""
+import atexit
+import contextvars
+import json
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import queue
+import zlib
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+from .config import settings
 
-# Logs folder bana lo agar nahi hai toh
 log_dir = "logs"
-os.makedirs(log_dir, exist_ok=True)
 
-log_file_path = os.path.join(log_dir, "app.log")
+logger = logging.getLogger("book-review-service")
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
 
-# Logger Configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-    handlers=[
-        RotatingFileHandler(log_file_path, maxBytes=5*1024*1024, backupCount=5),  # 5 MB max per file
-        logging.StreamHandler()  
-    ]
-)
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(request_id)s | %(message)s"
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, request id and message,
+    plus the record's "diagnostics" payload when it has one."""
+
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", None),
+            "message": record.getMessage(),
+            **getattr(record, "diagnostics", {}),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps records with the current request's correlation id."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps rate of the requests' INFO/DEBUG records; see the module docstring."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if self.rate >= 1.0 or record.levelno > logging.INFO or record.name.startswith("app.diagnostics"):
+            return True
+        request_id = getattr(record, "request_id", None)
+        if request_id is None:
+            return True
+        # Hash the request id so every line of a sampled request is kept together
+        return zlib.crc32(request_id.encode()) / 0xFFFFFFFF < self.rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread without formatting them: the message
+    is only built (record.getMessage()) when the listener writes it out.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        if record.exc_info and not record.exc_text:
+            # Tracebacks hold frames that may be gone by the time the listener runs
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _formatter() -> logging.Formatter:
+    if settings.log_format == "text":
+        return logging.Formatter(TEXT_FORMAT)
+    return JsonFormatter()
+
+
+def configure_logging() -> None:
+    """
+    Install the queue-based pipeline on the root logger. Called from the app's
+    lifespan and the CLI rather than at import time, so importing a module never
+    creates files; later calls are no-ops.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    # Logs folder bana lo agar nahi hai toh
+    os.makedirs(log_dir, exist_ok=True)
+
+    file_handler = RotatingFileHandler(
+        os.path.join(log_dir, "app.log"), maxBytes=5*1024*1024, backupCount=5  # 5 MB max per file
+    )
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(_formatter())
+
+    # Slow queries, N+1 warnings and profiles (app/core/diagnostics.py) also go to
+    # their own JSON lines file so they can be shipped or grepped separately
+    diagnostics_handler = RotatingFileHandler(
+        os.path.join(log_dir, "diagnostics.log"), maxBytes=5*1024*1024, backupCount=5
+    )
+    diagnostics_handler.setFormatter(JsonFormatter())
+    diagnostics_handler.addFilter(logging.Filter("app.diagnostics"))
+
+    _queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+    _queue_handler.addFilter(RequestContextFilter())
+    _queue_handler.addFilter(SamplingFilter(settings.log_sample_rate))
+
+    root = logging.getLogger()
+    root.setLevel(settings.log_level.upper())
+    root.addHandler(_queue_handler)
+
+    _listener = QueueListener(
+        _queue_handler.queue, file_handler, console_handler, diagnostics_handler, respect_handler_level=True
+    )
+    _listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Drain the queue, stop the writer thread and remove the queue handler."""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    logging.getLogger().removeHandler(_queue_handler)
+    for handler in _listener.handlers:
+        handler.close()
+    if _queue_handler.dropped:
+        logging.getLogger(__name__).warning(
+            "%d log records were dropped because the log queue was full", _queue_handler.dropped
+        )
+    _listener = _queue_handler = None
 
-logger = logging.getLogger("book-review-service")
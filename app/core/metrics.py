@@ -0,0 +1,149 @@
+# app/core/metrics.py
+"""
+Prometheus metrics.
+
+With several uvicorn/gunicorn workers set PROMETHEUS_MULTIPROC_DIR to an empty,
+writable directory before starting them: every worker then writes its samples
+there and /metrics aggregates all of them, whichever worker answers the scrape.
+"""
+import os
+import time
+from typing import Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by key family and result (hit, miss, error)",
+    ["family", "result"],
+)
+CACHE_L1_HITS = Counter(
+    "cache_l1_hits_total",
+    "Cache hits answered by the in-process L1 cache without asking Redis",
+    ["family"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time",
+    ["database", "operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total",
+    "SQL statements that raised an error",
+    ["database", "operation"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Configured pool size (steady-state connections)",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ["database"],
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up after pool_timeout",
+    ["database"],
+)
+
+_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+
+def key_family(key: str) -> str:
+    """
+    Low-cardinality label for a cache key: its first two non-numeric segments,
+    e.g. book:12:stats -> book:stats, books:page:50:first -> books:page.
+    """
+    return ":".join([part for part in key.split(":") if not part.isdigit()][:2])
+
+
+def record_cache(key: str, result: str) -> None:
+    CACHE_REQUESTS.labels(key_family(key), result).inc()
+
+
+def record_l1_hit(key: str) -> None:
+    family = key_family(key)
+    CACHE_REQUESTS.labels(family, "hit").inc()
+    CACHE_L1_HITS.labels(family).inc()
+
+
+def _operation(statement: str) -> str:
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return operation if operation in _OPERATIONS else "OTHER"
+
+
+def instrument_engine(engine: Engine, database: str) -> None:
+    """
+    Time every statement and track pool occupancy for a (sync) engine.
+    For an AsyncEngine pass engine.sync_engine.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start_time"].pop()
+        DB_QUERY_DURATION.labels(database, _operation(statement)).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        starts = context.connection.info.get("query_start_time") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        DB_QUERY_ERRORS.labels(database, _operation(context.statement or "")).inc()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.labels(database).inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.labels(database).dec()
+
+    pool = engine.pool
+    if hasattr(pool, "size"):
+        DB_POOL_SIZE.labels(database).set(pool.size())
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        stats.wait_observers.append(DB_POOL_WAIT.labels(database).observe)
+        stats.timeout_observers.append(DB_POOL_TIMEOUTS.labels(database).inc)
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.environ.get("prometheus_multiproc_dir"))
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition body and content type, aggregated across workers in multiprocess mode."""
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges when it exits (multiprocess mode only)."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
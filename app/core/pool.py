@@ -0,0 +1,135 @@
+# app/core/pool.py
+"""
+Connection pool classes that record how long callers wait for a connection.
+
+SQLAlchemy exposes no event for "waiting on the pool", so the timing wraps
+``Pool._do_get``: the time spent blocked on a full QueuePool (or opening a new
+connection) is what shows up as request latency when workers are undersized.
+"""
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, List
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+# Upper bounds of the wait time histogram buckets, in seconds
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class PoolStats:
+    """
+    Checkout counters and a cumulative wait time histogram for one pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bucket_counts = [0] * (len(WAIT_BUCKETS) + 1)
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.checked_out = 0
+        # Extra sinks for the same events, e.g. Prometheus metrics
+        self.wait_observers: List[Callable[[float], None]] = []
+        self.timeout_observers: List[Callable[[], None]] = []
+
+    def observe_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.bucket_counts[bisect.bisect_left(WAIT_BUCKETS, seconds)] += 1
+            self.wait_count += 1
+            self.wait_sum += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.checked_out += 1
+        for observer in self.wait_observers:
+            observer(seconds)
+
+    def observe_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+        for observer in self.timeout_observers:
+            observer()
+
+    def observe_return(self) -> None:
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def histogram(self) -> Dict[str, int]:
+        """Cumulative counts keyed by bucket upper bound, Prometheus style."""
+        with self._lock:
+            counts = list(self.bucket_counts)
+        result, total = {}, 0
+        for bound, count in zip(WAIT_BUCKETS + (float("inf"),), counts):
+            total += count
+            result["+Inf" if bound == float("inf") else str(bound)] = total
+        return result
+
+
+class PoolTimingMixin:
+    """Wraps connection acquisition to feed a PoolStats instance."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the counters across it
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.observe_timeout()
+            raise
+        self.stats.observe_wait(time.perf_counter() - started)
+        return connection
+
+    def _do_return_conn(self, record):
+        self.stats.observe_return()
+        super()._do_return_conn(record)
+
+
+class TimedQueuePool(PoolTimingMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(PoolTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(PoolTimingMixin, NullPool):
+    pass
+
+
+def pool_status(pool) -> Dict[str, Any]:
+    """
+    Snapshot of a pool's occupancy and wait times.
+    """
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    stats = getattr(pool, "stats", None)
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(0, pool.overflow()),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    elif stats is not None:
+        status["checked_out"] = stats.checked_out
+    if stats is not None:
+        status.update(
+            timeouts=stats.timeouts,
+            wait_seconds={
+                "count": stats.wait_count,
+                "sum": round(stats.wait_sum, 6),
+                "max": round(stats.wait_max, 6),
+                "buckets": stats.histogram(),
+            },
+        )
+    return status
@@ -0,0 +1,103 @@
+# app/core/replicas.py
+"""
+Routing of read-only sessions to database replicas.
+
+Replicas are chosen round-robin among those that passed their last health
+check. Checks run in a background task (start), never on the request path; a
+replica is used only once it has passed one, a failed check takes it out of
+rotation until the next, and with no healthy replica every read goes to the
+primary.
+"""
+import asyncio
+import itertools
+import logging
+from typing import Any, Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.sessionmaker = async_sessionmaker(
+            bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+        # Unchecked replicas stay out of rotation until the first check passes
+        self.healthy = False
+        self.last_error: Optional[str] = "not checked yet"
+
+    @property
+    def name(self) -> str:
+        return make_url(str(self.engine.url)).render_as_string(hide_password=True)
+
+
+class ReplicaRouter:
+    """
+    Picks a replica session factory for reads, or None when the primary should be used.
+    """
+
+    def __init__(self, engines: List[AsyncEngine], check_interval: float = 10, check_timeout: float = 2):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._round_robin = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    async def _ping(self, replica: Replica) -> None:
+        async with replica.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def _check(self, replica: Replica) -> None:
+        try:
+            await asyncio.wait_for(self._ping(replica), timeout=self.check_timeout)
+            if not replica.healthy:
+                logger.info("Replica %s is healthy", replica.name)
+            replica.healthy, replica.last_error = True, None
+        except Exception as e:
+            if replica.healthy:
+                logger.warning("Replica %s failed its health check, using primary: %s", replica.name, e)
+            replica.healthy, replica.last_error = False, str(e)
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def run(self) -> None:
+        while True:
+            await self.check_all()
+            await asyncio.sleep(self.check_interval)
+
+    def start(self) -> None:
+        if not self.replicas or self._task is not None:
+            return
+        self._task = asyncio.create_task(self.run())
+
+    async def pick(self) -> Optional[async_sessionmaker]:
+        """Session factory of the next healthy replica, or None to use the primary."""
+        if not self.replicas:
+            return None
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._round_robin)]
+            if replica.healthy:
+                return replica.sessionmaker
+        return None
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {"url": replica.name, "healthy": replica.healthy, "last_error": replica.last_error}
+            for replica in self.replicas
+        ]
+
+    async def dispose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
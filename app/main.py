@@ -1,21 +1,83 @@
 # app/main.py
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import books, reviews
+from app.api.endpoints import admin, books, reviews, export
 from app.core.config import settings
+from app.core.database import (
+    dispose_engines, get_async_sessionmaker, get_pool_stats, get_replica_router, ping_database
+)
+from app.core.logger import configure_logging
+from app.core.metrics import mark_process_dead, render_metrics
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.middleware.request_id import RequestIdMiddleware
 from app.services.cache import cache_service
+from app.services.cache_warmer import cache_warmer
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+async def check_backends() -> None:
+    """
+    Ping Redis and the database concurrently, each bounded by
+    startup_ping_timeout, and report what actually answered.
+    """
+    timeout = settings.startup_ping_timeout
+    redis_ok, database_ok = await asyncio.gather(cache_service.ping(timeout), ping_database(timeout))
+    if redis_ok:
+        logger.info(" Redis connection established successfully.")
+    else:
+        logger.warning(" Redis is not reachable; reads fall back to the database until it is.")
+    if database_ok:
+        logger.info(" Database connection established successfully.")
+    else:
+        logger.warning(" Database is not reachable yet.")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup only configures logging and schedules background work, so a new
+    worker accepts requests within milliseconds instead of waiting on Redis or
+    database DNS and connects.
+
+    The cache warmer also starts in the background; its first run fills the
+    hottest keys, so a deploy or Redis flush doesn't send every request to the
+    database at once. So do replica health checks: reads use the primary until
+    a replica has passed one.
+
+    On shutdown: stops the background tasks, the cache warmer and the L1 cache
+    invalidation listener, closes the primary and replica engines and retires
+    this worker's live metrics.
+    """
+    configure_logging()
+    backend_check = asyncio.create_task(check_backends())
+    cache_service.start_invalidation_listener()
+    cache_warmer.start(get_async_sessionmaker())
+    get_replica_router().start()
+    try:
+        yield
+    finally:
+        backend_check.cancel()
+        await asyncio.gather(backend_check, return_exceptions=True)
+        await cache_warmer.stop()
+        await cache_service.stop_invalidation_listener()
+        await dispose_engines()
+        mark_process_dead()
+
+
 app = FastAPI(
     title=settings.app_name,
     description="A simple book review service with caching support",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -27,20 +89,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=settings.replica_sticky_seconds)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
+app.add_middleware(ProfilingMiddleware)
+# Added late so it is outer and its timings include the other middleware
+app.add_middleware(MetricsMiddleware)
+# Outermost, so every log line of a request, from any layer, carries its id
+app.add_middleware(RequestIdMiddleware)
+
 # Include routers with proper prefixes
 app.include_router(books.router, prefix="/books", tags=["books"])
 app.include_router(reviews.router, prefix="/books", tags=["reviews"])  # ← Added prefix here!
-
-
-@app.on_event("startup")
-async def startup_event():
-    """
-    Runs when the app starts. Checks if Redis cache is connected.
-    """
-    if cache_service.is_available:
-        logger.info(" Redis connection established successfully.")
-    else:
-        logger.warning(" Redis connection failed. Cache will not work.")
+app.include_router(export.router, prefix="/export", tags=["export"])
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
 
 
 @app.get("/")
@@ -50,7 +111,30 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "service": settings.app_name}
+    """
+    Liveness, plus the Redis circuit breaker: "degraded" while the cache is
+    being bypassed (requests are still served, from the database).
+    """
+    cache = {"enabled": cache_service.enabled, **cache_service.breaker.status()}
+    healthy = cache_service.enabled and cache["state"] == "closed"
+    return {"status": "healthy" if healthy else "degraded", "service": settings.app_name, "cache": cache}
+
+
+@app.get("/health/pool")
+def pool_health():
+    """
+    Database connection pool occupancy and checkout wait times, for sizing workers.
+    """
+    return get_pool_stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus scrape endpoint, aggregated across workers in multiprocess mode.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+# app/middleware/profiling.py
+import hmac
+import random
+from app.core import diagnostics
+from app.core.config import settings
+
+PROFILE_HEADER = b"x-profile"
+
+
+class ProfilingMiddleware:
+    """
+    Tracks queries per request (for N+1 detection) and profiles requests that
+    carry "X-Profile: <admin token>" or fall in the profile_sample_rate sample.
+    Profiled responses get an X-Profile-Id header; the report is served by
+    GET /admin/profiles/{id}.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _wants_profile(self, scope) -> bool:
+        if settings.admin_token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, settings.admin_token.encode())
+        return settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profiler = diagnostics.RequestProfiler.try_start() if self._wants_profile(scope) else None
+        token = diagnostics.begin_request(scope["method"], scope["path"])
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if profiler is not None:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile-id", str(profiler.id).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profiler is not None:
+                profiler.stop(scope["method"], scope["path"], status_code)
+            diagnostics.end_request(token)
@@ -0,0 +1,44 @@
+# app/middleware/read_your_writes.py
+import math
+import time
+from http.cookies import SimpleCookie
+from app.api.deps import READ_PRIMARY_COOKIE
+from app.core import database
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class ReadYourWritesMiddleware:
+    """
+    Marks clients that just wrote with a short-lived cookie so their next reads
+    go to the primary instead of a replica that may not have caught up.
+    Does nothing unless read replicas are configured.
+
+    Plain ASGI rather than BaseHTTPMiddleware: it only touches the response
+    headers and must not buffer streamed bodies.
+    """
+
+    def __init__(self, app, sticky_seconds: float):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] not in WRITE_METHODS
+                or not database.replica_router.enabled):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = SimpleCookie()
+                cookie[READ_PRIMARY_COOKIE] = f"{time.time() + self.sticky_seconds:.3f}"
+                cookie[READ_PRIMARY_COOKIE]["max-age"] = math.ceil(self.sticky_seconds)
+                cookie[READ_PRIMARY_COOKIE]["path"] = "/"
+                cookie[READ_PRIMARY_COOKIE]["httponly"] = True
+                cookie[READ_PRIMARY_COOKIE]["samesite"] = "lax"
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie.output(header="").strip().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,39 @@
+# app/middleware/request_id.py
+import re
+import uuid
+from starlette.datastructures import Headers, MutableHeaders
+from app.core.logger import request_id_var
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Ids from clients or proxies are reused only if they can't smuggle anything into logs
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+class RequestIdMiddleware:
+    """
+    Gives every request a correlation id: the incoming X-Request-ID when it
+    looks sane, otherwise a new one. It is exposed to log records through
+    request_id_var and echoed back in the X-Request-ID response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER)
+        if not request_id or not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
@@ -1,5 +1,5 @@
 # app/models/review.py
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -13,8 +13,53 @@ class Review(Base):
     rating = Column(Integer, nullable=False)  # 1-5 stars
     comment = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Stream message id of reviews ingested through the review queue (app/services/review_queue.py)
+    ingest_id = Column(String(64), nullable=True)
     
     book = relationship("Book", back_populates="reviews")
 
 # Add index for optimized fetching reviews by book
-Index('idx_reviews_book_id_created_at', Review.book_id, Review.created_at.desc())
\ No newline at end of file
+Index('idx_reviews_book_id_created_at', Review.book_id, Review.created_at.desc())
+
+# Delivery from the queue is at-least-once: a redelivered message must not insert twice
+Index('uq_reviews_ingest_id', Review.ingest_id, unique=True)
+
+# Full-text search over review comments, see BOOKS_SEARCH_DDL in app/models/book.py
+REVIEWS_SEARCH_DDL = {
+    "postgresql": [
+        """
+        ALTER TABLE reviews ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', coalesce(comment, ''))) STORED
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_reviews_search_vector ON reviews USING GIN (search_vector)",
+    ],
+    "sqlite": [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(
+            comment, content='reviews', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS reviews_fts_ai AFTER INSERT ON reviews BEGIN
+            INSERT INTO reviews_fts(rowid, comment) VALUES (new.id, new.comment);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS reviews_fts_ad AFTER DELETE ON reviews BEGIN
+            INSERT INTO reviews_fts(reviews_fts, rowid, comment) VALUES ('delete', old.id, old.comment);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS reviews_fts_au AFTER UPDATE ON reviews BEGIN
+            INSERT INTO reviews_fts(reviews_fts, rowid, comment) VALUES ('delete', old.id, old.comment);
+            INSERT INTO reviews_fts(rowid, comment) VALUES (new.id, new.comment);
+        END
+        """,
+    ],
+}
+
+for _dialect, _statements in REVIEWS_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Review.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+event.listen(Review.__table__, "before_drop", DDL("DROP TABLE IF EXISTS reviews_fts").execute_if(dialect="sqlite"))
@@ -1,7 +1,7 @@
 # app/schemas/book.py
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class BookBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=255)
@@ -12,10 +12,49 @@ class BookBase(BaseModel):
 class BookCreate(BookBase):
     pass
 
+class BookStatsResponse(BaseModel):
+    book_id: int
+    review_count: int
+    average_rating: Optional[float] = None
+    # Number of reviews per star rating, keyed "1" to "5"
+    histogram: Dict[str, int]
+
 class BookResponse(BookBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class BookWithStatsResponse(BookResponse):
+    stats: BookStatsResponse
+
+class BookPage(BaseModel):
+    items: List[BookResponse]
+    next_cursor: Optional[str] = None
+    limit: int
+
+class BookWithStatsPage(BookPage):
+    items: List[BookWithStatsResponse]
+
+
+class BookSearchResult(BaseModel):
+    query: str
+    items: List[BookResponse]
+    limit: int
+    offset: int
+
+class BookSuggestion(BaseModel):
+    id: int
+    title: str
+    author: str
+
+class BulkItemError(BaseModel):
+    index: int
+    isbn: Optional[str] = None
+    error: str
+
+class BookBulkResult(BaseModel):
+    created: List[BookResponse]
+    errors: List[BulkItemError]
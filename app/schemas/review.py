@@ -1,7 +1,8 @@
 # app/schemas/review.py
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+from app.schemas.book import BulkItemError
 
 class ReviewBase(BaseModel):
     reviewer_name: str = Field(..., min_length=1, max_length=255)
@@ -17,4 +18,20 @@ class ReviewResponse(ReviewBase):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ReviewPage(BaseModel):
+    items: List[ReviewResponse]
+    next_cursor: Optional[str] = None
+    limit: int
+
+
+class ReviewBulkResult(BaseModel):
+    created: List[ReviewResponse]
+    errors: List[BulkItemError]
+
+
+class ReviewQueued(BaseModel):
+    status: str = "queued"
+    message_id: str
+    book_id: int
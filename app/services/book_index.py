@@ -0,0 +1,52 @@
+# app/services/book_index.py
+import logging
+from typing import Iterable
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.book import Book
+from app.services.cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+BOOK_IDS_KEY = "books:ids"
+
+
+class BookIdIndex:
+    """
+    Redis set of known book ids, so existence checks on hot write paths don't
+    need a database round trip.
+
+    It is a positive cache filled as books are created or first looked up: a
+    miss is confirmed against the database, so an id that never reached Redis
+    can't cause a false 404. Books are never deleted, so ids never go stale.
+    """
+
+    async def contains(self, db: AsyncSession, book_id: int) -> bool:
+        if await self._is_member(book_id):
+            return True
+        # SELECT EXISTS(...): one boolean back, no row to load into the ORM
+        found = bool(await db.scalar(select(exists().where(Book.id == book_id))))
+        if found:
+            await self.add([book_id])
+        return found
+
+    async def add(self, book_ids: Iterable[int]) -> None:
+        book_ids = list(book_ids)
+        if not book_ids or not cache_service.is_available:
+            return
+        try:
+            await cache_service.call(cache_service.redis_client.sadd(BOOK_IDS_KEY, *book_ids))
+        except Exception as e:
+            logger.warning("Failed to add books %s to the id index: %s", book_ids[:10], e)
+
+    async def _is_member(self, book_id: int) -> bool:
+        if not cache_service.is_available:
+            return False
+        try:
+            return bool(await cache_service.call(cache_service.redis_client.sismember(BOOK_IDS_KEY, book_id)))
+        except Exception as e:
+            logger.warning("Book id index lookup failed: %s", e)
+            return False
+
+
+book_id_index = BookIdIndex()
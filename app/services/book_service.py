@@ -1,143 +1,636 @@
 # app/services/book_service.py
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, desc, func, or_, select, update
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.dialects import postgresql, sqlite
+from app.core.database import primary_session
 from app.models.book import Book
 from app.models.review import Review
-from app.schemas.book import BookCreate
+from app.models.book_stats import BookStats
+from app.schemas.book import BookCreate, BookPage, BookResponse
 from app.schemas.review import ReviewCreate
-from app.services.cache import cache_service
+from app.services.book_index import book_id_index
+from app.services.cache import cache_service, cached
+from app.services.versions import ALL_REVIEWS, CATALOGUE, book_scope, version_service
+from app.utils import serialization
+from app.utils.compression import PrecompressedPayload
+from app.utils.pagination import encode_cursor, decode_cursor, MAX_PAGE_SIZE
+from app.utils.exceptions import ValidationException
 import logging
 from app.core.logger import logger
 
 
 logger = logging.getLogger(__name__)
 
+BOOKS_PAGE_CACHE_PREFIX = "books:page:"
+BOOK_STATS_TTL = 1800
+RATING_VALUES = (1, 2, 3, 4, 5)
+# Rows per INSERT statement; keeps bound parameters well under SQLite/Postgres limits
+BULK_INSERT_CHUNK_SIZE = 500
+# Largest batch accepted by one bulk API call
+BULK_MAX_ITEMS = 5000
+
+
+def book_stats_cache_key(book_id: int) -> str:
+    return f"book:{book_id}:stats"
+
+
+def reviews_first_page_cache_key(book_id: int) -> str:
+    return f"book:{book_id}:reviews:first"
+
+
+def _review_to_dict(review: Review) -> dict:
+    return {
+        "id": review.id,
+        "book_id": review.book_id,
+        "reviewer_name": review.reviewer_name,
+        "rating": review.rating,
+        "comment": review.comment,
+        "created_at": review.created_at
+    }
+
+
+def _review_cursor(review: dict) -> str:
+    created_at = review["created_at"]
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    return encode_cursor({"created_at": created_at, "id": review["id"]})
+
+
+def _insert_for(db: AsyncSession, table):
+    """
+    Dialect-specific INSERT so bulk loads can use ON CONFLICT DO NOTHING.
+    """
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise ValueError(f"Bulk insert is not supported on {dialect}")
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" for detail in error.errors()
+    )
+
+
+def _comparable_timestamp(db: AsyncSession, value):
+    # SQLite stores CURRENT_TIMESTAMP defaults as text without fractional seconds while
+    # bound datetimes carry microseconds, so text comparison would misorder equal instants
+    if db.bind.dialect.name == "sqlite":
+        return func.julianday(value)
+    return value
+
+
+def _is_foreign_key_violation(error: IntegrityError) -> bool:
+    # SQLSTATE 23503 on PostgreSQL (asyncpg: sqlstate, psycopg2: pgcode); SQLite only has the message
+    code = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+    return code == "23503" or "FOREIGN KEY constraint failed" in str(error)
+
+
+def _stats_to_dict(book_id: int, stats: Optional[BookStats]) -> dict:
+    review_count = stats.review_count if stats else 0
+    rating_sum = stats.rating_sum if stats else 0
+    return {
+        "book_id": book_id,
+        "review_count": review_count,
+        "average_rating": round(rating_sum / review_count, 2) if review_count else None,
+        "histogram": {
+            str(rating): (getattr(stats, f"rating_{rating}") if stats else 0)
+            for rating in RATING_VALUES
+        }
+    }
+
+
+_BOOK_PAGE_ADAPTER = TypeAdapter(BookPage)
+_BOOK_LIST_ADAPTER = TypeAdapter(List[BookResponse])
+
+
+def _serialize(adapter: TypeAdapter, data) -> bytes:
+    # Validated and encoded exactly as the endpoints' response models would do it,
+    # once per cache fill instead of once per request
+    return adapter.dump_json(adapter.validate_python(data), exclude_unset=True)
+
+
+def _book_cursor_id(cursor: Optional[str]) -> int:
+    """The id a book listing cursor points after (0 for the first page)."""
+    position = decode_cursor(cursor)
+    if position is None:
+        return 0
+    after_id = position.get("id")
+    # bool is an int subclass; {"id": true} is as malformed as {"id": "abc"}
+    if not isinstance(after_id, int) or isinstance(after_id, bool) or after_id < 0:
+        raise ValidationException("Invalid pagination cursor")
+    return after_id
+
+
+def _book_to_dict(book: Book) -> dict:
+    return {
+        "id": book.id,
+        "title": book.title,
+        "author": book.author,
+        "isbn": book.isbn,
+        "description": book.description,
+        "created_at": book.created_at,
+        "updated_at": book.updated_at
+    }
+
+
 class BookService:
     
     @staticmethod
-    async def get_all_books(db: Session) -> List[Book]:
-        cache_key = "books:all"
-        
-        # Try to get from cache first
-        try:
-            cached_books = await cache_service.get(cache_key)
-            if cached_books:
-                logger.info("Books retrieved from cache")
-                return cached_books
-        except Exception as e:
-            logger.warning(f"Cache retrieval failed: {e}")
-        
-        # Fallback to database
+    async def get_all_books(db: AsyncSession) -> List[dict]:
+        """
+        Legacy, unpaginated listing of the whole catalogue. Kept for old clients only;
+        new callers should use get_books_page.
+        """
+        return serialization.loads(await BookService.get_all_books_json(db))
+
+    @staticmethod
+    async def get_all_books_json(db: AsyncSession) -> bytes:
+        """
+        get_all_books as the exact JSON body of List[BookResponse], cached as bytes.
+        """
+        return (await BookService.get_all_books_payload(db)).identity
+
+    @staticmethod
+    async def get_all_books_payload(db: AsyncSession) -> PrecompressedPayload:
+        """
+        The get_all_books_json body together with its compressed variants, all
+        produced once per cache fill.
+        """
         try:
-            books = db.query(Book).all()
-            books_data = [
-                {
-                    "id": book.id,
-                    "title": book.title,
-                    "author": book.author,
-                    "isbn": book.isbn,
-                    "description": book.description,
-                    "created_at": book.created_at,
-                    "updated_at": book.updated_at
-                } for book in books
-            ]
-            
-            # Cache the result (with error handling)
-            try:
-                await cache_service.set(cache_key, books_data, ttl=1800)  # 30 minutes
-                logger.info("Books retrieved from database and cached")
-            except Exception as e:
-                logger.warning(f"Caching failed: {e}")
-                
-            return books_data
-            
+            return await BookService._load_all_books(db)
         except SQLAlchemyError as e:
-            logger.error(f"Database error while fetching books: {e}")
+            logger.error("Database error while fetching books: %s", e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error while fetching books: {e}")
+            logger.error("Unexpected error while fetching books: %s", e)
+            raise
+
+    @staticmethod
+    # Concurrent misses are coalesced so only one caller hits the database
+    # Stored in Redis as bytes, held in L1 as the decoded payload (body included)
+    @cached(lambda: "books:all", namespace=lambda: CATALOGUE, ttl=1800, raw=True,  # 30 minutes
+            decode=PrecompressedPayload.from_bytes)
+    async def _load_all_books(db: AsyncSession) -> bytes:
+        result = await db.execute(select(Book))
+        books = result.scalars().all()
+        logger.info("Books retrieved from database")
+        body = _serialize(_BOOK_LIST_ADAPTER, [_book_to_dict(book) for book in books])
+        return PrecompressedPayload.build(body).to_bytes()
+
+    @staticmethod
+    async def get_books_page(db: AsyncSession, limit: int, cursor: Optional[str] = None) -> dict:
+        """
+        Keyset-paginated listing ordered by id. Each page is cached under its own key,
+        so cost depends on the page size rather than on the size of the catalogue.
+        """
+        return serialization.loads(await BookService.get_books_page_json(db, limit, cursor))
+
+    @staticmethod
+    async def get_books_page_json(db: AsyncSession, limit: int, cursor: Optional[str] = None) -> bytes:
+        """
+        get_books_page as the exact JSON body of BookPage, cached as bytes so cache
+        hits are served without decoding, validating or re-encoding anything.
+        """
+        return (await BookService.get_books_page_payload(db, limit, cursor)).identity
+
+    @staticmethod
+    async def get_books_page_payload(db: AsyncSession, limit: int,
+                                     cursor: Optional[str] = None) -> PrecompressedPayload:
+        """
+        The get_books_page_json body together with its compressed variants.
+        """
+        # Validated and normalized up front: a bad cursor never reaches the cache,
+        # and only real positions (not arbitrary client strings) become cache keys
+        after_id = _book_cursor_id(cursor)
+        try:
+            return await BookService._load_books_page(db, limit, after_id)
+        except SQLAlchemyError as e:
+            logger.error("Database error while fetching books page: %s", e)
             raise
 
     @staticmethod
-    async def create_book(db: Session, book_data: BookCreate) -> Book:
+    @cached(lambda limit, after_id: f"{BOOKS_PAGE_CACHE_PREFIX}{limit}:{after_id or 'first'}",
+            namespace=lambda limit, after_id: CATALOGUE, ttl=1800, raw=True, decode=PrecompressedPayload.from_bytes)
+    async def _load_books_page(db: AsyncSession, limit: int, after_id: int) -> bytes:
+        # Fetch one extra row to know whether another page exists
+        result = await db.execute(
+            select(Book).where(Book.id > after_id).order_by(Book.id).limit(limit + 1)
+        )
+        books = result.scalars().all()
+        has_more = len(books) > limit
+        books = books[:limit]
+        body = _serialize(_BOOK_PAGE_ADAPTER, {
+            "items": [_book_to_dict(book) for book in books],
+            "next_cursor": encode_cursor({"id": books[-1].id}) if has_more else None,
+            "limit": limit
+        })
+        return PrecompressedPayload.build(body).to_bytes()
+
+    @staticmethod
+    async def create_book(db: AsyncSession, book_data: BookCreate) -> Book:
         try:
             # Use model_dump instead of deprecated dict()
             db_book = Book(**book_data.model_dump())
             db.add(db_book)
-            db.commit()
-            db.refresh(db_book)
+            await db.flush()
+            # Start every book with an empty aggregate row so reviews only ever UPDATE it
+            db.add(BookStats(book_id=db_book.id))
+            await db.commit()
+            await db.refresh(db_book)
             
-            # Invalidate cache (with error handling)
-            try:
-                await cache_service.delete("books:all")
-            except Exception as e:
-                logger.warning(f"Cache invalidation failed: {e}")
+            await book_id_index.add([db_book.id])
+            await BookService._invalidate_catalogue(created=[db_book.id])
                 
-            logger.info(f"Book created with ID: {db_book.id}")
+            logger.info("Book created with ID: %s", db_book.id)
             return db_book
             
         except IntegrityError as e:
-            db.rollback()
-            logger.error(f"Integrity constraint violation: {e}")
+            await db.rollback()
+            logger.error("Integrity constraint violation: %s", e)
             # Re-raise as a more specific error for API layer
             if "UNIQUE constraint failed: books.isbn" in str(e):
                 raise ValueError(f"Book with ISBN {book_data.isbn} already exists")
             raise ValueError(f"Data integrity error: {str(e)}")
             
         except SQLAlchemyError as e:
-            db.rollback()
-            logger.error(f"Database error creating book: {e}")
+            await db.rollback()
+            logger.error("Database error creating book: %s", e)
             raise ValueError(f"Database error: {str(e)}")
             
         except Exception as e:
-            db.rollback()
-            logger.error(f"Unexpected error creating book: {e}")
+            await db.rollback()
+            logger.error("Unexpected error creating book: %s", e)
             raise ValueError(f"Failed to create book: {str(e)}")
 
     @staticmethod
-    def get_book_by_id(db: Session, book_id: int) -> Optional[Book]:
+    async def bulk_create_books(db: AsyncSession, rows: List[Dict[str, Any]]) -> dict:
+        """
+        Validate and insert many books with multi-row INSERT ... ON CONFLICT DO NOTHING
+        RETURNING, committing and invalidating the catalogue cache once per call.
+
+        Invalid rows and ISBN conflicts are reported per row in "errors" (with their
+        index in rows) instead of aborting the batch.
+        """
+        errors: List[dict] = []
+        pending: Dict[str, tuple] = {}
+        for index, row in enumerate(rows):
+            isbn = row.get("isbn") if isinstance(row, dict) else None
+            try:
+                book = BookCreate.model_validate(row)
+            except ValidationError as e:
+                errors.append({"index": index, "isbn": isbn, "error": _validation_message(e)})
+                continue
+            if book.isbn in pending:
+                errors.append({"index": index, "isbn": book.isbn, "error": "Duplicate ISBN in batch"})
+                continue
+            pending[book.isbn] = (index, book)
+
+        created: List[dict] = []
+        if pending:
+            try:
+                values = [book.model_dump() for _, book in pending.values()]
+                for start in range(0, len(values), BULK_INSERT_CHUNK_SIZE):
+                    chunk = values[start:start + BULK_INSERT_CHUNK_SIZE]
+                    result = await db.execute(
+                        _insert_for(db, Book.__table__).values(chunk)
+                        .on_conflict_do_nothing(index_elements=[Book.isbn])
+                        .returning(*Book.__table__.c)
+                    )
+                    inserted = [dict(row) for row in result.mappings().all()]
+                    if inserted:
+                        await db.execute(
+                            _insert_for(db, BookStats.__table__)
+                            .values([{"book_id": book["id"]} for book in inserted])
+                        )
+                    created.extend(inserted)
+                await db.commit()
+            except SQLAlchemyError as e:
+                await db.rollback()
+                logger.error("Database error bulk creating books: %s", e)
+                raise
+
+            inserted_isbns = {book["isbn"] for book in created}
+            for isbn, (index, _) in pending.items():
+                if isbn not in inserted_isbns:
+                    errors.append({"index": index, "isbn": isbn, "error": f"Book with ISBN {isbn} already exists"})
+
+        if created:
+            await book_id_index.add(book["id"] for book in created)
+            await BookService._invalidate_catalogue(created=[book["id"] for book in created])
+        created.sort(key=lambda book: book["id"])
+        errors.sort(key=lambda error: error["index"])
+        logger.info("Bulk created %s books (%s rejected)", len(created), len(errors))
+        return {"created": created, "errors": errors}
+
+    @staticmethod
+    async def bulk_create_reviews(db: AsyncSession, rows: List[Dict[str, Any]],
+                                  book_id: Optional[int] = None,
+                                  ingest_ids: Optional[List[str]] = None) -> dict:
+        """
+        Validate and insert many reviews in one transaction. Rows carry their own
+        book_id unless book_id is given. Rows for unknown books or failing validation
+        are reported per row in "errors"; stats and caches are updated once per book.
+
+        ingest_ids (one per row) makes the insert idempotent: a row whose id was
+        already inserted is skipped, appearing in neither "created" nor "errors".
+        """
+        errors: List[dict] = []
+        valid: List[tuple] = []
+        for index, row in enumerate(rows):
+            try:
+                review = ReviewCreate.model_validate(row)
+                target_book_id = book_id if book_id is not None else int(row["book_id"])
+            except ValidationError as e:
+                errors.append({"index": index, "error": _validation_message(e)})
+                continue
+            except (KeyError, TypeError, ValueError):
+                errors.append({"index": index, "error": "book_id: a valid integer is required"})
+                continue
+            valid.append((index, target_book_id, review))
+
+        created: List[dict] = []
+        if valid:
+            try:
+                book_ids = {target_book_id for _, target_book_id, _ in valid}
+                result = await db.execute(select(Book.id).where(Book.id.in_(book_ids)))
+                existing_ids = set(result.scalars().all())
+                values = []
+                for index, target_book_id, review in valid:
+                    if target_book_id in existing_ids:
+                        value = {"book_id": target_book_id, **review.model_dump()}
+                        if ingest_ids is not None:
+                            value["ingest_id"] = ingest_ids[index]
+                        values.append(value)
+                    else:
+                        errors.append({"index": index, "error": f"Book with ID {target_book_id} does not exist"})
+
+                for start in range(0, len(values), BULK_INSERT_CHUNK_SIZE):
+                    statement = _insert_for(db, Review.__table__).values(values[start:start + BULK_INSERT_CHUNK_SIZE])
+                    if ingest_ids is not None:
+                        statement = statement.on_conflict_do_nothing(index_elements=[Review.ingest_id])
+                    # Only rows actually inserted come back, so duplicates never reach the stats
+                    result = await db.execute(statement.returning(*Review.__table__.c))
+                    created.extend(dict(row) for row in result.mappings().all())
+
+                ratings_by_book: Dict[int, List[int]] = {}
+                for review in created:
+                    ratings_by_book.setdefault(review["book_id"], []).append(review["rating"])
+                for target_book_id, ratings in ratings_by_book.items():
+                    await BookService._apply_ratings_to_stats(db, target_book_id, ratings)
+                await db.commit()
+            except SQLAlchemyError as e:
+                await db.rollback()
+                logger.error("Database error bulk creating reviews: %s", e)
+                raise
+
+            for target_book_id in {review["book_id"] for review in created}:
+                await BookService._invalidate_book_reviews(target_book_id)
+
+        created.sort(key=lambda review: review["id"])
+        errors.sort(key=lambda error: error["index"])
+        logger.info("Bulk created %s reviews (%s rejected)", len(created), len(errors))
+        return {"created": created, "errors": errors}
+
+    @staticmethod
+    async def _invalidate_catalogue(created: Iterable[int] = ()) -> None:
+        try:
+            # Every list and page key lives in the catalogue namespace: one bump drops them all
+            await cache_service.bump_namespace(CATALOGUE)
+            # New books also start their own version counter (reads never create one),
+            # and their stats now appear in pages with embedded stats
+            new_scopes = [book_scope(book_id) for book_id in created]
+            await version_service.bump(CATALOGUE, *([ALL_REVIEWS, *new_scopes] if new_scopes else []))
+        except Exception as e:
+            logger.warning("Cache invalidation failed: %s", e)
+
+    @staticmethod
+    async def _invalidate_book_reviews(book_id: int) -> None:
+        try:
+            await cache_service.bump_namespace(book_scope(book_id))
+            await version_service.bump(book_scope(book_id), ALL_REVIEWS)
+        except Exception as e:
+            logger.warning("Cache invalidation failed: %s", e)
+
+    @staticmethod
+    async def book_exists(db: AsyncSession, book_id: int) -> bool:
+        """
+        Existence check without loading the book: the Redis id index first,
+        then a SELECT EXISTS on a miss.
+        """
+        try:
+            return await book_id_index.contains(db, book_id)
+        except SQLAlchemyError as e:
+            logger.error("Database error checking book %s: %s", book_id, e)
+            raise
+
+    @staticmethod
+    async def get_book_by_id(db: AsyncSession, book_id: int) -> Optional[Book]:
+        try:
+            return await db.get(Book, book_id)
+        except SQLAlchemyError as e:
+            logger.error("Database error fetching book %s: %s", book_id, e)
+            raise
+
+    @staticmethod
+    async def get_reviews_by_book_id(db: AsyncSession, book_id: int) -> List[Review]:
+        try:
+            result = await db.execute(
+                select(Review).where(Review.book_id == book_id).order_by(desc(Review.created_at))
+            )
+            return result.scalars().all()
+        except SQLAlchemyError as e:
+            logger.error("Database error fetching reviews for book %s: %s", book_id, e)
+            raise
+
+    @staticmethod
+    async def get_reviews_page(db: AsyncSession, book_id: int, limit: int,
+                               cursor: Optional[str] = None) -> Optional[dict]:
+        """
+        Keyset-paginated reviews for a book, newest first, walking the
+        (book_id, created_at DESC) index with a (created_at, id) cursor.
+
+        The first page is cached once per book at the maximum page size and sliced
+        for smaller limits, so create_review only has one key to invalidate.
+        Returns None if the book does not exist.
+        """
+        position = decode_cursor(cursor)
+        try:
+            if position is None:
+                chunk = await BookService._load_reviews_first_page(db, book_id)
+            elif not await BookService.book_exists(db, book_id):
+                # Same 404 as the first page instead of an empty page for an unknown book
+                return None
+            else:
+                chunk = await BookService._load_reviews(db, book_id, limit, position)
+        except LookupError:
+            return None
+        except SQLAlchemyError as e:
+            logger.error("Database error fetching reviews page for book %s: %s", book_id, e)
+            raise
+
+        items = chunk["items"][:limit]
+        has_more = chunk["has_more"] or len(chunk["items"]) > limit
+        return {
+            "items": items,
+            "next_cursor": _review_cursor(items[-1]) if has_more and items else None,
+            "limit": limit
+        }
+
+    @staticmethod
+    @cached(reviews_first_page_cache_key, namespace=book_scope, ttl=600)
+    async def _load_reviews_first_page(db: AsyncSession, book_id: int) -> dict:
+        if not await BookService.book_exists(db, book_id):
+            # Raised rather than returned so a missing book is never cached
+            raise LookupError(book_id)
+        return await BookService._load_reviews(db, book_id, MAX_PAGE_SIZE)
+
+    @staticmethod
+    async def _load_reviews(db: AsyncSession, book_id: int, size: int,
+                            position: Optional[dict] = None) -> dict:
+        query = select(Review).where(Review.book_id == book_id)
+        if position is not None:
+            try:
+                after_created_at = datetime.fromisoformat(position["created_at"])
+                after_id = int(position["id"])
+            except (KeyError, TypeError, ValueError):
+                raise ValidationException("Invalid pagination cursor")
+            created_at = _comparable_timestamp(db, Review.created_at)
+            after = _comparable_timestamp(db, after_created_at)
+            query = query.where(or_(
+                created_at < after,
+                and_(created_at == after, Review.id < after_id)
+            ))
+        # Fetch one extra row to know whether another page exists
+        result = await db.execute(
+            query.order_by(desc(Review.created_at), desc(Review.id)).limit(size + 1)
+        )
+        reviews = [_review_to_dict(review) for review in result.scalars().all()]
+        return {"items": reviews[:size], "has_more": len(reviews) > size}
+
+    @staticmethod
+    async def get_book_stats(db: AsyncSession, book_id: int) -> Optional[dict]:
+        """
+        Review count, mean rating and star histogram for a book, read from the
+        precomputed book_stats row (O(1) regardless of the number of reviews).
+        Returns None if the book does not exist.
+        """
         try:
-            return db.query(Book).filter(Book.id == book_id).first()
+            return await BookService._load_book_stats(db, book_id)
+        except LookupError:
+            return None
         except SQLAlchemyError as e:
-            logger.error(f"Database error fetching book {book_id}: {e}")
+            logger.error("Database error fetching stats for book %s: %s", book_id, e)
             raise
 
     @staticmethod
-    def get_reviews_by_book_id(db: Session, book_id: int) -> List[Review]:
+    @cached(book_stats_cache_key, namespace=book_scope, ttl=BOOK_STATS_TTL)
+    async def _load_book_stats(db: AsyncSession, book_id: int) -> dict:
+        stats = await db.get(BookStats, book_id)
+        if stats is None and not await BookService.book_exists(db, book_id):
+            # Raised rather than returned so a missing book is never cached
+            raise LookupError(book_id)
+        return _stats_to_dict(book_id, stats)
+
+    @staticmethod
+    async def get_stats_for_books(db: AsyncSession, book_ids: List[int]) -> Dict[int, dict]:
+        """
+        Stats for a page of books: cached entries (shared with get_book_stats) in
+        one MGET, the rest in one primary-key lookup query, written back in one pipeline.
+        """
+        if not book_ids:
+            return {}
+        keys = await cache_service.namespaced_keys(
+            [(book_scope(book_id), book_stats_cache_key(book_id)) for book_id in book_ids]
+        )
+        cached_stats = await cache_service.get_many(filter(None, keys), envelope=True)
+        stats = {book_id: cached_stats[key] for book_id, key in zip(book_ids, keys) if key in cached_stats}
+        missing = [book_id for book_id in book_ids if book_id not in stats]
+        if not missing:
+            return stats
         try:
-            return db.query(Review).filter(Review.book_id == book_id)\
-                     .order_by(desc(Review.created_at)).all()
+            # Written back to the shared cache, so read from the primary
+            result = await primary_session(db).execute(select(BookStats).where(BookStats.book_id.in_(missing)))
+            rows = {row.book_id: row for row in result.scalars().all()}
         except SQLAlchemyError as e:
-            logger.error(f"Database error fetching reviews for book {book_id}: {e}")
+            logger.error("Database error fetching stats for books: %s", e)
             raise
 
+        loaded = {book_id: _stats_to_dict(book_id, rows.get(book_id)) for book_id in missing}
+        await cache_service.set_many(
+            {key: loaded[book_id] for book_id, key in zip(book_ids, keys) if key and book_id in loaded},
+            ttl=BOOK_STATS_TTL, envelope=True
+        )
+        stats.update(loaded)
+        return {book_id: stats[book_id] for book_id in book_ids}
+
     @staticmethod
-    async def create_review(db: Session, book_id: int, review_data: ReviewCreate) -> Review:
+    async def _apply_ratings_to_stats(db: AsyncSession, book_id: int, ratings: Iterable[int]) -> None:
+        """
+        Fold new ratings into the book's aggregate row with a single atomic UPDATE.
+        """
+        ratings = list(ratings)
+        if not ratings:
+            return
+        increments = {
+            BookStats.review_count: BookStats.review_count + len(ratings),
+            BookStats.rating_sum: BookStats.rating_sum + sum(ratings),
+        }
+        for rating in RATING_VALUES:
+            count = ratings.count(rating)
+            if count:
+                column = getattr(BookStats, f"rating_{rating}")
+                increments[column] = column + count
+
+        result = await db.execute(
+            update(BookStats).where(BookStats.book_id == book_id).values(increments)
+        )
+        if result.rowcount == 0:
+            # Book predates the stats table's per-book row; create it on first review
+            db.add(BookStats(
+                book_id=book_id,
+                review_count=len(ratings),
+                rating_sum=sum(ratings),
+                **{f"rating_{rating}": ratings.count(rating) for rating in RATING_VALUES}
+            ))
+
+    @staticmethod
+    async def create_review(db: AsyncSession, book_id: int, review_data: ReviewCreate) -> Review:
         try:
             # Use model_dump instead of deprecated dict()
             db_review = Review(book_id=book_id, **review_data.model_dump())
             db.add(db_review)
-            db.commit()
-            db.refresh(db_review)
+            # Aggregates are updated in the same transaction as the review itself
+            await BookService._apply_ratings_to_stats(db, book_id, [db_review.rating])
+            await db.commit()
+            await db.refresh(db_review)
+
+            await BookService._invalidate_book_reviews(book_id)
             
-            logger.info(f"Review created for book {book_id}")
+            logger.info("Review created for book %s", book_id)
             return db_review
             
         except IntegrityError as e:
-            db.rollback()
-            logger.error(f"Integrity constraint violation creating review: {e}")
-            if "FOREIGN KEY constraint failed" in str(e):
-                raise ValueError(f"Book with ID {book_id} does not exist")
+            await db.rollback()
+            if _is_foreign_key_violation(e):
+                # Callers skip the existence check and rely on the constraint instead
+                logger.info("Review rejected, book %s does not exist", book_id)
+                raise LookupError(book_id)
+            logger.error("Integrity constraint violation creating review: %s", e)
             raise ValueError(f"Data integrity error: {str(e)}")
             
         except SQLAlchemyError as e:
-            db.rollback()
-            logger.error(f"Database error creating review: {e}")
+            await db.rollback()
+            logger.error("Database error creating review: %s", e)
             raise ValueError(f"Database error: {str(e)}")
             
         except Exception as e:
-            db.rollback()
-            logger.error(f"Unexpected error creating review: {e}")
+            await db.rollback()
+            logger.error("Unexpected error creating review: %s", e)
             raise ValueError(f"Failed to create review: {str(e)}")
\ No newline at end of file
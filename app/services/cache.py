@@ -1,53 +1,765 @@
 # app/services/cache.py
-import redis
+import asyncio
+import contextlib
+import contextvars
+import fnmatch
+import functools
+import inspect
 import json
 import logging
-from typing import Optional, Any
+import math
+import random
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Any, Awaitable, Callable, Dict, Iterable, List, Tuple
 from app.core.config import settings
+from app.core import metrics
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.database import primary_session
+from app.utils import cache_codec, serialization
 from app.core.logger import logger
 
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+# Set by CacheService.refreshing_ahead: read-through entries expiring within this
+# many seconds are rebuilt now rather than by a request after they expire
+_refresh_ahead: contextvars.ContextVar[float] = contextvars.ContextVar("cache_refresh_ahead", default=0.0)
+
+
+class LocalCache:
+    """
+    In-process L1 cache: LRU eviction, per-key TTL, bounded by entry count and by
+    the serialized size of the stored values.
+
+    Values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, default_ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.total_bytes = 0
+        # Bumped on every invalidation so in-flight L2 reads can't repopulate stale data
+        self.generation = 0
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self._pop(key)
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[float] = None) -> None:
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        ttl = self.default_ttl if ttl is None else min(ttl, self.default_ttl)
+        self._pop(key)
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self.total_bytes += size
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._pop(oldest_key)
+
+    def delete(self, key: str) -> None:
+        self.generation += 1
+        self._pop(key)
+
+    def delete_matching(self, pattern: str) -> None:
+        self.generation += 1
+        for key in [k for k in self._entries if fnmatch.fnmatchcase(k, pattern)]:
+            self._pop(key)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def encode_envelope(payload: bytes, expires_at: float, delta: float) -> bytes:
+    """
+    Read-through entries are a one-line JSON header (soft expiry, rebuild time)
+    followed by the payload: a cache_codec entry, so raw payloads are stored
+    without re-encoding (only compressed if that pays off).
+    """
+    return serialization.dumps({"expires_at": expires_at, "delta": delta}) + b"\n" + payload
+
+
+def decode_envelope(data: bytes, raw: bool = False, decode: Optional[Callable[[bytes], Any]] = None) -> dict:
+    header, _, payload = data.partition(b"\n")
+    envelope = serialization.loads(header)
+    envelope["value"] = cache_codec.decode_bytes(payload) if raw else cache_codec.decode(payload)
+    if decode is not None:
+        envelope["value"] = decode(envelope["value"])
+    return envelope
+
+
+def _decoded_size(data: bytes) -> int:
+    # L1 holds decoded values, so it is bounded by their size rather than the compressed one
+    if cache_codec.is_framed(data):
+        return cache_codec.decoded_size(data)
+    header, newline, payload = data.partition(b"\n")
+    if newline and cache_codec.is_framed(payload):
+        return len(header) + 1 + cache_codec.decoded_size(payload)
+    return len(data)
+
+
+def _local_size(data: bytes, value: Any) -> int:
+    # A value built by a get_or_load decode function may hold more than its entry
+    # (a PrecompressedPayload keeps its uncompressed body); it reports that as nbytes
+    if _is_envelope(value):
+        value = value["value"]
+    return max(_decoded_size(data), getattr(value, "nbytes", 0))
+
+
+def _is_envelope(value: Any) -> bool:
+    return isinstance(value, dict) and "value" in value and "expires_at" in value
+
+
+def _namespace_key(namespace: str) -> str:
+    return f"ns:{namespace}"
+
+
+def _is_server_reply(error: Exception) -> bool:
+    # An error reply (WRONGTYPE, BUSYGROUP, ...) means Redis is up and answering
+    from redis.exceptions import ResponseError
+    return isinstance(error, ResponseError)
+
+
 class CacheService:
     def __init__(self):
+        self.local_cache = LocalCache(
+            max_entries=settings.l1_cache_max_entries,
+            max_bytes=settings.l1_cache_max_bytes,
+            default_ttl=settings.l1_cache_ttl,
+        )
+        self._listener_task: Optional[asyncio.Task] = None
+        # L1 is only trusted while we are subscribed to invalidation messages
+        self.local_cache_active = False
+        # Per-process single-flight: one in-flight load per key
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Cleared if the client can't be created; redis_client itself is built on first use
+        self.enabled = True
+        self.breaker = CircuitBreaker(
+            "redis",
+            failure_threshold=settings.cache_breaker_failures,
+            reset_timeout=settings.cache_breaker_reset_seconds,
+            latency_budget=settings.cache_latency_budget_ms / 1000,
+        )
+
+    @property
+    def is_available(self) -> bool:
+        """
+        Whether callers should try Redis at all: a client exists and the circuit
+        breaker would let a call through, so a degraded Redis is skipped outright.
+        """
+        return self.enabled and self.breaker.available
+
+    @is_available.setter
+    def is_available(self, value: bool) -> None:
+        self.enabled = value
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached while redis_client is unset: importing the app never loads
+        # the redis package or touches the network
+        if name != "redis_client":
+            raise AttributeError(name)
+        self.redis_client = self._create_client()
+        return self.redis_client
+
+    def _create_client(self):
         try:
-            self.redis_client = redis.from_url(settings.redis_url, decode_responses=True)
-            self.is_available = True
+            import redis.asyncio as redis
+            # Raw bytes so pre-serialized payloads can be stored and served untouched
+            client = redis.from_url(settings.redis_url, decode_responses=False)
             logger.info("Redis client created")
+            return client
+        except Exception as e:
+            logger.warning("Failed to create Redis client: %s", e)
+            self.enabled = False
+            return None
+
+    async def call(self, awaitable: Awaitable[Any], timeout: Optional[float] = None,
+                   force: bool = False) -> Any:
+        """
+        Run one Redis operation under the circuit breaker and a timeout
+        (cache_op_timeout by default). A slow Redis costs each caller at most the
+        timeout, and nothing once enough failures have opened the breaker.
+        Raises CircuitOpenError without running the operation while it is open.
+
+        force=True runs it even then (still with the timeout): invalidations must
+        not be skipped, or stale entries would outlive the outage.
+        """
+        try:
+            if not force:
+                self.breaker.before_call()
+        except CircuitOpenError:
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+            raise
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(awaitable, settings.cache_op_timeout if timeout is None else timeout)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
         except Exception as e:
-            logger.warning(f"Failed to create Redis client: {e}")
-            self.redis_client = None
-            self.is_available = False
+            if _is_server_reply(e):
+                self.breaker.record_success(time.monotonic() - started)
+            else:
+                self.breaker.record_failure(f"{type(e).__name__}: {e}")
+            raise
+        self.breaker.record_success(time.monotonic() - started)
+        return result
+
+    async def ping(self, timeout: float) -> bool:
+        """True if Redis answers a PING within timeout seconds."""
+        if not self.enabled:
+            return False
+        try:
+            return bool(await self.call(self.redis_client.ping(), timeout))
+        except CircuitOpenError:
+            return False
+        except asyncio.TimeoutError:
+            logger.warning("Redis did not answer a ping within %ss", timeout)
+            return False
+        except Exception as e:
+            logger.warning("Redis ping failed: %s", e)
+            return False
 
     async def get(self, key: str) -> Optional[Any]:
+        return await self._read_through(key, cache_codec.decode)
+
+    async def set(self, key: str, value: Any, ttl: int = 3600) -> bool:
+        data = cache_codec.encode(value)
+        # Store the decoded form of what Redis holds so L1 and L2 hits look the same
+        return await self._write(key, data, ttl, cache_codec.decode(data))
+
+    async def get_raw(self, key: str) -> Optional[bytes]:
+        """
+        Bytes stored with set_raw, returned without any decoding (they are
+        stored verbatim, outside the cache_codec format).
+        """
+        return await self._read_through(key, lambda data: data)
+
+    async def set_raw(self, key: str, data: bytes, ttl: int = 3600) -> bool:
+        return await self._write(key, data, ttl, data)
+
+    async def _read_through(self, key: str, decode: Callable[[bytes], Any], record: bool = True) -> Optional[Any]:
+        """
+        L1 lookup, then Redis. A key must always be read with the same decode
+        function, since L1 keeps the decoded value.
+        record=False keeps polling reads out of the hit/miss metrics.
+        """
         if not self.is_available:
+            if record:
+                metrics.record_cache(key, "error")
             return None
+
+        if self.local_cache_active:
+            value = self.local_cache.get(key)
+            if value is not _MISSING:
+                if record:
+                    metrics.record_l1_hit(key)
+                return value
+
+        generation = self.local_cache.generation
         try:
-            data = self.redis_client.get(key)
-            return json.loads(data) if data else None
+            data = await self.call(self.redis_client.get(key))
+            if not data:
+                if record:
+                    metrics.record_cache(key, "miss")
+                return None
+            value = decode(data)
+            # Skip L1 if an invalidation arrived while we were talking to Redis
+            if self.local_cache_active and generation == self.local_cache.generation:
+                self.local_cache.set(key, value, size=_local_size(data, value))
+            if record:
+                metrics.record_cache(key, "hit")
+            return value
         except Exception as e:
-            logger.error(f"Cache get error: {e}")
+            logger.error("Cache get error: %s", e)
+            if record:
+                metrics.record_cache(key, "error")
             return None
 
-    async def set(self, key: str, value: Any, ttl: int = 3600) -> bool:
+    async def _write(self, key: str, data: bytes, ttl: int, local_value: Any) -> bool:
         if not self.is_available:
             return False
         try:
-            self.redis_client.setex(key, ttl, json.dumps(value, default=str))
+            await self.call(self.redis_client.setex(key, ttl, data))
+            if self.local_cache_active:
+                self.local_cache.set(key, local_value, size=_local_size(data, local_value), ttl=ttl)
             return True
         except Exception as e:
-            logger.error(f"Cache set error: {e}")
+            logger.error("Cache set error: %s", e)
             return False
 
     async def delete(self, key: str) -> bool:
+        self.local_cache.delete(key)
+        if not self.enabled:
+            return False
+        try:
+            await self.call(self.redis_client.delete(key), force=True)
+            await self._publish_invalidation({"key": key})
+            return True
+        except Exception as e:
+            logger.error("Cache delete error: %s", e)
+            return False
+
+    async def delete_pattern(self, pattern: str) -> int:
+        """
+        Delete every key matching a glob pattern. Uses SCAN so Redis is never
+        blocked the way KEYS would block it.
+        """
+        self.local_cache.delete_matching(pattern)
+        if not self.enabled:
+            return 0
+        try:
+            deleted = 0
+            batch = []
+            async for key in self.redis_client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    deleted += await self.call(self.redis_client.delete(*batch), force=True)
+                    batch = []
+            if batch:
+                deleted += await self.call(self.redis_client.delete(*batch), force=True)
+            await self._publish_invalidation({"pattern": pattern})
+            return deleted
+        except Exception as e:
+            logger.error("Cache delete pattern error: %s", e)
+            return 0
+
+    async def get_many(self, keys: Iterable[str], envelope: bool = False) -> Dict[str, Any]:
+        """
+        Values of several keys in one MGET (after L1); keys that miss are left
+        out of the result. envelope=True reads entries written by get_or_load or
+        set_many(envelope=True), returning their values even when soft-expired.
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
         if not self.is_available:
+            for key in keys:
+                metrics.record_cache(key, "error")
+            return found
+
+        pending = []
+        for key in keys:
+            value = self.local_cache.get(key) if self.local_cache_active else _MISSING
+            if value is _MISSING:
+                pending.append(key)
+                continue
+            metrics.record_l1_hit(key)
+            found[key] = value["value"] if envelope else value
+        if not pending:
+            return found
+
+        generation = self.local_cache.generation
+        try:
+            values = await self.call(self.redis_client.mget(pending))
+        except Exception as e:
+            logger.error("Cache get_many error: %s", e)
+            for key in pending:
+                metrics.record_cache(key, "error")
+            return found
+        for key, data in zip(pending, values):
+            if not data:
+                metrics.record_cache(key, "miss")
+                continue
+            try:
+                value = decode_envelope(data) if envelope else cache_codec.decode(data)
+            except ValueError as e:
+                logger.error("Cache get_many decode error for %s: %s", key, e)
+                metrics.record_cache(key, "error")
+                continue
+            if self.local_cache_active and generation == self.local_cache.generation:
+                self.local_cache.set(key, value, size=_decoded_size(data))
+            metrics.record_cache(key, "hit")
+            found[key] = value["value"] if envelope else value
+        return found
+
+    async def set_many(self, items: Dict[str, Any], ttl: int = 3600, envelope: bool = False,
+                       stale_ttl: Optional[int] = None) -> bool:
+        """
+        Store several values in one pipelined round trip. envelope=True writes
+        them in the get_or_load format, so either path can read them back.
+        """
+        if not items or not self.is_available:
+            return False
+        stale_ttl = settings.cache_stale_ttl if stale_ttl is None else stale_ttl
+        entries = []
+        for key, value in items.items():
+            payload = cache_codec.encode(value)
+            if envelope:
+                expires_at = time.time() + ttl
+                data = encode_envelope(payload, expires_at, 0.0)
+                local_value = {"value": cache_codec.decode(payload), "expires_at": expires_at, "delta": 0.0}
+                entries.append((key, data, ttl + stale_ttl, local_value))
+            else:
+                entries.append((key, payload, ttl, cache_codec.decode(payload)))
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, data, key_ttl, _ in entries:
+                    pipe.setex(key, key_ttl, data)
+                await self.call(pipe.execute())
+        except Exception as e:
+            logger.error("Cache set_many error: %s", e)
+            return False
+        if self.local_cache_active:
+            for key, data, key_ttl, local_value in entries:
+                self.local_cache.set(key, local_value, size=_decoded_size(data), ttl=key_ttl)
+        return True
+
+    async def namespaced_key(self, namespace: str, key: str) -> Optional[str]:
+        """
+        key qualified with the current version of its namespace, e.g.
+        book:12:stats -> book:12:stats:v1700000000000001. None if the version
+        can't be read, in which case the caller should bypass the cache.
+        """
+        return (await self.namespaced_keys([(namespace, key)]))[0]
+
+    async def namespaced_keys(self, pairs: List[Tuple[str, str]]) -> List[Optional[str]]:
+        """namespaced_key for many (namespace, key) pairs, with one round trip for unknown versions."""
+        versions = await self._namespace_versions({namespace for namespace, _ in pairs})
+        return [
+            f"{key}:v{versions[namespace]}" if namespace in versions else None
+            for namespace, key in pairs
+        ]
+
+    async def bump_namespace(self, namespace: str) -> bool:
+        """
+        Invalidate every key of a namespace in O(1): readers move on to keys
+        under the new version and the old entries simply expire.
+        """
+        key = _namespace_key(namespace)
+        self.local_cache.delete(key)
+        if not self.enabled:
             return False
         try:
-            self.redis_client.delete(key)
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.set(key, self._initial_namespace_version(), nx=True)
+                pipe.incr(key)
+                pipe.expire(key, settings.cache_namespace_ttl)
+                await self.call(pipe.execute(), force=True)
+            await self._publish_invalidation({"key": key})
             return True
         except Exception as e:
-            logger.error(f"Cache delete error: {e}")
+            logger.error("Cache namespace bump error for %s: %s", namespace, e)
             return False
 
+    @staticmethod
+    def _initial_namespace_version() -> int:
+        # A counter that expired restarts from the clock, so it never reuses an old version
+        return int(time.time() * 1_000_000)
+
+    async def _namespace_versions(self, namespaces: Iterable[str]) -> Dict[str, int]:
+        versions: Dict[str, int] = {}
+        pending = []
+        for namespace in namespaces:
+            value = self.local_cache.get(_namespace_key(namespace)) if self.local_cache_active else _MISSING
+            if value is _MISSING:
+                pending.append(namespace)
+            else:
+                versions[namespace] = value
+        if not pending or not self.is_available:
+            return versions
+
+        generation = self.local_cache.generation
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for namespace in pending:
+                    pipe.set(_namespace_key(namespace), self._initial_namespace_version(),
+                             nx=True, ex=settings.cache_namespace_ttl)
+                    pipe.get(_namespace_key(namespace))
+                replies = await self.call(pipe.execute())
+        except Exception as e:
+            logger.error("Cache namespace lookup error: %s", e)
+            return versions
+        for i, namespace in enumerate(pending):
+            version = int(replies[i * 2 + 1])
+            versions[namespace] = version
+            if self.local_cache_active and generation == self.local_cache.generation:
+                self.local_cache.set(_namespace_key(namespace), version, size=8)
+        return versions
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = 3600,
+        stale_ttl: Optional[int] = None,
+        raw: bool = False,
+        decode: Optional[Callable[[bytes], Any]] = None,
+    ) -> Any:
+        """
+        Read-through cache with stampede protection.
+
+        - Concurrent misses in this process share a single loader call.
+        - Across processes, a Redis lock lets only one caller rebuild the key; the
+          others wait briefly for its result instead of hitting the database.
+        - Entries are refreshed early with probability rising towards expiry
+          (XFetch), and may be served for stale_ttl seconds after expiry while
+          one caller rebuilds them.
+
+        With raw=True the loader returns bytes that are returned as-is (and stored
+        as-is, apart from cache_codec compression). decode, if given, turns those
+        bytes into the value returned; L1 keeps the decoded value, so its hits
+        skip decoding.
+        """
+        stale_ttl = settings.cache_stale_ttl if stale_ttl is None else stale_ttl
+
+        try:
+            envelope = await self._read_envelope(key, raw, decode=decode)
+        except Exception as e:
+            logger.warning("Cache retrieval failed: %s", e)
+            envelope = None
+
+        if _is_envelope(envelope):
+            if not self._should_refresh(envelope) or key in self._inflight:
+                return envelope["value"]
+            # Early or stale refresh: only one caller rebuilds, everyone else keeps
+            # getting the value we already have
+            return await self._rebuild(key, loader, ttl, stale_ttl, raw, current=envelope, decode=decode)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        return await self._rebuild(key, loader, ttl, stale_ttl, raw, decode=decode)
+
+    async def _read_envelope(self, key: str, raw: bool, record: bool = True,
+                             decode: Optional[Callable[[bytes], Any]] = None) -> Optional[dict]:
+        return await self._read_through(key, lambda data: decode_envelope(data, raw, decode), record)
+
+    @contextlib.contextmanager
+    def refreshing_ahead(self, seconds: float):
+        """
+        Within the block, get_or_load rebuilds entries that expire within seconds
+        (used by the cache warmer, so hot keys are renewed before they lapse).
+        """
+        token = _refresh_ahead.set(seconds)
+        try:
+            yield
+        finally:
+            _refresh_ahead.reset(token)
+
+    def _should_refresh(self, envelope: dict) -> bool:
+        delta = max(float(envelope.get("delta", 0.0)), 0.0)
+        # -log(U) for U in (0, 1] is an Exp(1) sample; slow loaders start refreshing earlier
+        jitter = -delta * settings.cache_early_refresh_beta * math.log(1.0 - random.random())
+        return time.time() + jitter + _refresh_ahead.get() >= float(envelope["expires_at"])
+
+    async def _rebuild(self, key: str, loader, ttl: int, stale_ttl: int, raw: bool,
+                       current: Optional[dict] = None, decode: Optional[Callable[[bytes], Any]] = None) -> Any:
+        # Register before the first await so concurrent callers in this process join us
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        acquired, token = False, None
+        try:
+            acquired, token = await self._acquire_lock(key)
+            if acquired:
+                value = await self._load_and_store(key, loader, ttl, stale_ttl, raw, decode)
+            elif current is not None:
+                # Another process is already refreshing; keep serving what we have
+                value = current["value"]
+            else:
+                envelope = await self._wait_for_value(key, raw, decode)
+                if _is_envelope(envelope):
+                    value = envelope["value"]
+                else:
+                    value = await self._load_and_store(key, loader, ttl, stale_ttl, raw, decode)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise the error; don't warn about it being unretrieved
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            if token is not None:
+                await self._release_lock(key, token)
+
+    async def _load_and_store(self, key: str, loader, ttl: int, stale_ttl: int, raw: bool,
+                              decode: Optional[Callable[[bytes], Any]] = None) -> Any:
+        started = time.monotonic()
+        value = await loader()
+        payload = cache_codec.encode_bytes(value) if raw else cache_codec.encode(value)
+        expires_at = time.time() + ttl
+        delta = time.monotonic() - started
+        data = encode_envelope(payload, expires_at, delta)
+        if not raw:
+            value = cache_codec.decode(payload)
+        elif decode is not None:
+            value = decode(value)
+        # L1 keeps the decoded envelope, matching what _read_envelope produces
+        local_value = {"value": value, "expires_at": expires_at, "delta": delta}
+        await self._write(key, data, ttl + stale_ttl, local_value)
+        return value
+
+    async def _acquire_lock(self, key: str) -> Tuple[bool, Optional[str]]:
+        """
+        Try to become the cross-process rebuilder of key. Returns (acquired, token).
+        If Redis can't be reached we can't coordinate, so the caller just loads.
+        """
+        if not self.is_available:
+            return True, None
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.call(self.redis_client.set(
+                f"lock:{key}", token, nx=True, px=int(settings.cache_lock_ttl * 1000)
+            ))
+        except Exception as e:
+            logger.warning("Cache lock error for %s: %s", key, e)
+            return True, None
+        return (True, token) if acquired else (False, None)
+
+    async def _release_lock(self, key: str, token: str) -> None:
+        # Already imported along with the client
+        from redis.exceptions import WatchError
+        lock_key = f"lock:{key}"
+
+        async def compare_and_delete():
+            # Compare-and-delete in a WATCH transaction so we never drop a lock
+            # that expired and was taken over by someone else
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                await pipe.watch(lock_key)
+                if await pipe.get(lock_key) == token.encode():
+                    pipe.multi()
+                    pipe.delete(lock_key)
+                    await pipe.execute()
+                else:
+                    await pipe.unwatch()
+
+        try:
+            await self.call(compare_and_delete())
+        except WatchError:
+            pass
+        except Exception as e:
+            logger.warning("Cache lock release error for %s: %s", key, e)
+
+    async def _wait_for_value(self, key: str, raw: bool,
+                              decode: Optional[Callable[[bytes], Any]] = None) -> Optional[Any]:
+        deadline = time.monotonic() + settings.cache_lock_wait
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            envelope = await self._read_envelope(key, raw, record=False, decode=decode)
+            if envelope is not None:
+                return envelope
+        return None
+
+    async def _publish_invalidation(self, message: dict) -> None:
+        try:
+            await self.call(
+                self.redis_client.publish(settings.cache_invalidation_channel, json.dumps(message)), force=True
+            )
+        except Exception as e:
+            logger.error("Cache invalidation publish error: %s", e)
+
+    def _apply_invalidation(self, raw_message: str) -> None:
+        try:
+            message = json.loads(raw_message)
+        except ValueError:
+            logger.warning("Ignoring malformed cache invalidation message: %r", raw_message)
+            return
+        if "key" in message:
+            self.local_cache.delete(message["key"])
+        elif "pattern" in message:
+            self.local_cache.delete_matching(message["pattern"])
+
+    async def _listen_for_invalidations(self) -> None:
+        """
+        Evict L1 entries whenever any worker deletes a key. While the subscription
+        is down we may have missed messages, so L1 is cleared on every (re)connect.
+        """
+        backoff = 1.0
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(settings.cache_invalidation_channel)
+                self.local_cache.clear()
+                self.local_cache_active = True
+                backoff = 1.0
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._apply_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Cache invalidation listener error, retrying in %.0fs: %s", backoff, e)
+            finally:
+                self.local_cache_active = False
+                self.local_cache.clear()
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def start_invalidation_listener(self) -> None:
+        if not self.enabled or self._listener_task is not None:
+            return
+        self._listener_task = asyncio.create_task(self._listen_for_invalidations())
+
+    async def stop_invalidation_listener(self) -> None:
+        if self._listener_task is None:
+            return
+        self._listener_task.cancel()
+        try:
+            await self._listener_task
+        except asyncio.CancelledError:
+            pass
+        self._listener_task = None
+
+
 cache_service = CacheService()
+
+
+def cached(key: Callable[..., str], ttl: int = 3600, namespace: Optional[Callable[..., str]] = None,
+           stale_ttl: Optional[int] = None, raw: bool = False,
+           decode: Optional[Callable[[bytes], Any]] = None):
+    """
+    Read-through caching for service methods taking (db, *args). key and
+    namespace are called with the remaining arguments; with a namespace the
+    entry is dropped by cache_service.bump_namespace. Entries are shared by
+    every client, so they are loaded from the primary, never a replica.
+    raw and decode are passed to cache_service.get_or_load.
+
+        @staticmethod
+        @cached(lambda book_id: f"book:{book_id}:stats", namespace=lambda book_id: f"book:{book_id}")
+        async def load_stats(db, book_id): ...
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        @functools.wraps(func)
+        async def wrapper(db, *args, **kwargs):
+            cache_key = key(*args, **kwargs)
+            if namespace is not None:
+                cache_key = await cache_service.namespaced_key(namespace(*args, **kwargs), cache_key)
+                if cache_key is None:
+                    value = await func(db, *args, **kwargs)
+                    return decode(value) if decode is not None else value
+            # Without Redis nothing is shared, so replicas can serve the load
+            source = primary_session(db) if cache_service.is_available else db
+            return await cache_service.get_or_load(
+                cache_key, lambda: func(source, *args, **kwargs), ttl=ttl, stale_ttl=stale_ttl,
+                raw=raw, decode=decode
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,194 @@
+# app/services/cache_warmer.py
+"""
+Cache warm-up and refresh-ahead for the hottest keys.
+
+Every worker counts reads of individual books (record_hit) and adds the counts
+to five-minute sorted sets in Redis, so the most-read books are known across all
+workers. Every cache_warm_interval seconds one worker, holding a lease in Redis,
+builds:
+
+- the legacy full list and the first cache_warm_pages catalogue pages,
+- stats and the first review page of the cache_warm_top_n most-read books,
+
+and rebuilds any of them that would otherwise expire before its next run, so
+hot keys never lapse under traffic. The first run happens as soon as a worker
+starts, which fills the cache after a deploy or a Redis flush; it can also be
+run by hand with python -m app.cli warm-cache.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.services.book_service import BookService
+from app.services.cache import cache_service
+from app.utils.pagination import DEFAULT_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+LEADER_KEY = "cache-warmer:leader"
+TRAFFIC_KEY_PREFIX = "traffic:books:"
+TOP_BOOKS_KEY = "traffic:books:top"
+BUCKET_SECONDS = 300
+
+
+def _traffic_key(bucket: int) -> str:
+    return f"{TRAFFIC_KEY_PREFIX}{bucket}"
+
+
+class CacheWarmer:
+
+    def __init__(self):
+        # Reads since the last flush to Redis, by book id
+        self._hits: Counter = Counter()
+        self._token = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+
+    def record_hit(self, book_id: int) -> None:
+        """Count a read of a book; only touches memory, flushed by the background loop."""
+        self._hits[book_id] += 1
+
+    async def flush_hits(self) -> None:
+        if not self._hits or not cache_service.is_available:
+            return
+        hits, self._hits = self._hits, Counter()
+        key = _traffic_key(int(time.time() // BUCKET_SECONDS))
+        try:
+            async with cache_service.redis_client.pipeline(transaction=False) as pipe:
+                for book_id, count in hits.items():
+                    pipe.zincrby(key, count, book_id)
+                pipe.expire(key, settings.cache_warm_traffic_window + BUCKET_SECONDS)
+                await cache_service.call(pipe.execute())
+        except Exception as e:
+            logger.warning("Could not record book traffic: %s", e)
+
+    async def top_books(self, count: int) -> List[int]:
+        """Ids of the count most-read books over the traffic window, busiest first."""
+        if count <= 0 or not cache_service.is_available:
+            return []
+        newest = int(time.time() // BUCKET_SECONDS)
+        buckets = max(1, settings.cache_warm_traffic_window // BUCKET_SECONDS)
+        keys = [_traffic_key(bucket) for bucket in range(newest - buckets + 1, newest + 1)]
+        try:
+            async with cache_service.redis_client.pipeline(transaction=True) as pipe:
+                pipe.zunionstore(TOP_BOOKS_KEY, keys)
+                pipe.zrevrange(TOP_BOOKS_KEY, 0, count - 1)
+                pipe.delete(TOP_BOOKS_KEY)
+                _, book_ids, _ = await cache_service.call(pipe.execute())
+        except Exception as e:
+            logger.warning("Could not read book traffic: %s", e)
+            return []
+        return [int(book_id) for book_id in book_ids]
+
+    async def acquire_leadership(self) -> bool:
+        """
+        Take or renew the warmer lease. It outlives a few intervals, so another
+        worker takes over if the leader dies without releasing it.
+        """
+        if not cache_service.is_available:
+            return False
+        lease_ms = int(settings.cache_warm_interval * 3 * 1000)
+        redis_client = cache_service.redis_client
+        try:
+            if await cache_service.call(redis_client.set(LEADER_KEY, self._token, nx=True, px=lease_ms)):
+                return True
+            if await cache_service.call(redis_client.get(LEADER_KEY)) != self._token.encode():
+                return False
+            # If the lease lapsed between the GET and here, this extends the new
+            # holder's lease instead, which is harmless
+            await cache_service.call(redis_client.pexpire(LEADER_KEY, lease_ms))
+            return True
+        except Exception as e:
+            logger.warning("Cache warmer lease error: %s", e)
+            return False
+
+    async def release_leadership(self) -> None:
+        """Drop the lease if we hold it, so the next deploy's workers warm at once."""
+        from redis.exceptions import WatchError
+
+        async def compare_and_delete():
+            async with cache_service.redis_client.pipeline(transaction=True) as pipe:
+                await pipe.watch(LEADER_KEY)
+                if await pipe.get(LEADER_KEY) == self._token.encode():
+                    pipe.multi()
+                    pipe.delete(LEADER_KEY)
+                    await pipe.execute()
+                else:
+                    await pipe.unwatch()
+
+        try:
+            await cache_service.call(compare_and_delete(), force=True)
+        except WatchError:
+            pass
+        except Exception as e:
+            logger.warning("Cache warmer lease release error: %s", e)
+
+    async def warm(self, session_factory, top_n: Optional[int] = None) -> Dict[str, int]:
+        """
+        Fill (or renew ahead of expiry) the hot keys. Goes through the normal
+        BookService reads, so keys, TTLs and stampede locks are the same as for
+        requests.
+        """
+        top_n = settings.cache_warm_top_n if top_n is None else top_n
+        totals = {"pages": 0, "books": 0}
+        if not cache_service.is_available:
+            logger.warning("Redis is unavailable, skipping cache warm-up")
+            return totals
+        started = time.monotonic()
+        # Renew anything that would expire before the run after next
+        with cache_service.refreshing_ahead(settings.cache_warm_interval * 2):
+            async with session_factory() as db:
+                if settings.cache_warm_legacy_list:
+                    await BookService.get_all_books_payload(db)
+                cursor = None
+                for _ in range(settings.cache_warm_pages):
+                    page = await BookService.get_books_page(db, DEFAULT_PAGE_SIZE, cursor)
+                    totals["pages"] += 1
+                    cursor = page["next_cursor"]
+                    if cursor is None:
+                        break
+                for book_id in await self.top_books(top_n):
+                    # Books deleted since they were read just come back as None
+                    await BookService.get_book_stats(db, book_id)
+                    await BookService.get_reviews_page(db, book_id, DEFAULT_PAGE_SIZE)
+                    totals["books"] += 1
+        logger.info(
+            "Cache warmed: %s catalogue pages, %s books in %.0f ms",
+            totals["pages"], totals["books"], (time.monotonic() - started) * 1000
+        )
+        return totals
+
+    async def run(self, session_factory) -> None:
+        """Flush traffic counts and, while holding the lease, warm; every cache_warm_interval."""
+        while True:
+            try:
+                await self.flush_hits()
+                if await self.acquire_leadership():
+                    await self.warm(session_factory)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Cache warm-up failed: %s", e)
+            await asyncio.sleep(settings.cache_warm_interval)
+
+    def start(self, session_factory) -> None:
+        if not settings.cache_warm_enabled or not cache_service.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self.run(session_factory))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush_hits()
+        await self.release_leadership()
+
+
+cache_warmer = CacheWarmer()
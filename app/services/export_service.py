@@ -0,0 +1,96 @@
+# app/services/export_service.py
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import AsyncIterator, Iterable, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.book import Book
+from app.models.review import Review
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXPORT_TABLES = {
+    "books": Book.__table__,
+    "reviews": Review.__table__,
+}
+EXPORT_FORMATS = ("ndjson", "csv")
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class ExportService:
+
+    @staticmethod
+    def media_type(file_format: str, gzip: bool) -> str:
+        if gzip:
+            return "application/gzip"
+        return "text/csv" if file_format == "csv" else "application/x-ndjson"
+
+    @staticmethod
+    def filename(table_name: str, file_format: str, gzip: bool) -> str:
+        return f"{table_name}.{file_format}" + (".gz" if gzip else "")
+
+    @staticmethod
+    async def stream_table(db: AsyncSession, table_name: str, file_format: str = "ndjson",
+                           gzip: bool = False) -> AsyncIterator[bytes]:
+        """
+        Stream a whole table as NDJSON or CSV (optionally gzipped) in id order.
+
+        Rows come from a server-side cursor in batches of EXPORT_BATCH_SIZE as plain
+        Core rows (no ORM identity map), so memory stays flat regardless of table size.
+        """
+        table = EXPORT_TABLES[table_name]
+        columns = [column.name for column in table.columns]
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+
+        def encode(rows: Iterable[dict], header: bool = False) -> bytes:
+            if file_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                if header:
+                    writer.writerow(columns)
+                writer.writerows([_csv_value(row[column]) for column in columns] for row in rows)
+                data = buffer.getvalue().encode("utf-8")
+            else:
+                data = "".join(
+                    json.dumps(dict(row), default=_json_default) + "\n" for row in rows
+                ).encode("utf-8")
+            return compressor.compress(data) if compressor else data
+
+        result = await db.stream(
+            select(table).order_by(table.c.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        exported = 0
+        first = True
+        async for partition in result.mappings().partitions():
+            chunk = encode(partition, header=first)
+            first = False
+            exported += len(partition)
+            if chunk:
+                yield chunk
+        if first and file_format == "csv":
+            # Empty table: still emit the header row
+            chunk = encode([], header=True)
+            if chunk:
+                yield chunk
+        if compressor:
+            yield compressor.flush()
+        logger.info("Exported %s %s rows as %s", exported, table_name, file_format)
@@ -0,0 +1,164 @@
+# app/services/review_queue.py
+"""
+Write-behind ingestion of reviews through a Redis Stream.
+
+POST /books/{id}/reviews enqueues the validated review and answers 202; a
+worker (python -m app.cli review-worker) drains the stream in batches, each
+inserted by BookService.bulk_create_reviews in a single transaction, so stats
+updates and cache invalidations happen once per book per batch.
+
+Delivery is at-least-once: messages are acknowledged only after their batch
+committed, and messages left pending by a crashed worker are claimed by
+another one after review_claim_idle_ms. Each review is stored with its message
+id (reviews.ingest_id, unique), so a message delivered twice is inserted and
+counted in the book's stats once.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.schemas.review import ReviewCreate
+from app.services.book_service import BookService
+from app.services.cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+Message = Tuple[str, Dict[bytes, bytes]]
+
+
+class ReviewQueue:
+
+    @property
+    def stream(self) -> str:
+        return settings.review_stream
+
+    @property
+    def dead_letter_stream(self) -> str:
+        return f"{settings.review_stream}:dead"
+
+    @property
+    def available(self) -> bool:
+        return cache_service.is_available
+
+    async def enqueue(self, book_id: int, review: ReviewCreate) -> str:
+        """Append a review to the stream; returns the stream message id."""
+        message_id = await cache_service.call(cache_service.redis_client.xadd(
+            self.stream,
+            {
+                "book_id": book_id,
+                "review": json.dumps(review.model_dump()),
+                "submitted_at": time.time(),
+            },
+            maxlen=settings.review_stream_maxlen,
+            approximate=True,
+        ))
+        return message_id.decode() if isinstance(message_id, bytes) else message_id
+
+    async def ensure_group(self) -> None:
+        try:
+            await cache_service.redis_client.xgroup_create(
+                self.stream, settings.review_stream_group, id="0", mkstream=True
+            )
+        except Exception as e:
+            # BUSYGROUP: another worker created it first
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read_batch(self, consumer: str, batch_size: int, block_ms: int) -> List[Message]:
+        """
+        Messages abandoned by dead consumers first, then new ones (blocking up to block_ms).
+        """
+        redis_client = cache_service.redis_client
+        group = settings.review_stream_group
+        _, claimed, *_ = await redis_client.xautoclaim(
+            self.stream, group, consumer,
+            min_idle_time=settings.review_claim_idle_ms, start_id="0-0", count=batch_size,
+        )
+        messages = [(message_id, fields) for message_id, fields in claimed if fields]
+        if len(messages) < batch_size:
+            response = await redis_client.xreadgroup(
+                group, consumer, {self.stream: ">"},
+                # BLOCK 0 would wait forever; None returns at once
+                count=batch_size - len(messages), block=None if messages else (block_ms or None),
+            )
+            for _, stream_messages in response or []:
+                messages.extend(stream_messages)
+        return [
+            (message_id.decode() if isinstance(message_id, bytes) else message_id, fields)
+            for message_id, fields in messages
+        ]
+
+    @staticmethod
+    def _to_row(fields: Dict[bytes, bytes]) -> Dict[str, Any]:
+        try:
+            row = json.loads(fields[b"review"])
+            row["book_id"] = int(fields[b"book_id"])
+            return row
+        except (KeyError, TypeError, ValueError):
+            # bulk_create_reviews reports it as an invalid row
+            return {}
+
+    async def process_batch(self, session_factory, messages: List[Message]) -> Dict[str, int]:
+        """
+        Insert one batch in one transaction, dead-letter rejected rows and ack
+        everything. A database error leaves the whole batch pending for a retry.
+        """
+        if not messages:
+            return {"created": 0, "rejected": 0}
+        rows = [self._to_row(fields) for _, fields in messages]
+        message_ids = [message_id for message_id, _ in messages]
+        async with session_factory() as db:
+            result = await BookService.bulk_create_reviews(db, rows, ingest_ids=message_ids)
+        duplicates = len(messages) - len(result["created"]) - len(result["errors"])
+        if duplicates:
+            logger.info("Skipped %s queued reviews that were already inserted", duplicates)
+
+        async with cache_service.redis_client.pipeline(transaction=False) as pipe:
+            for error in result["errors"]:
+                message_id, fields = messages[error["index"]]
+                logger.warning("Rejected queued review %s: %s", message_id, error["error"])
+                pipe.xadd(
+                    self.dead_letter_stream,
+                    {**fields, b"message_id": message_id, b"error": error["error"]},
+                    maxlen=settings.review_stream_maxlen,
+                    approximate=True,
+                )
+            pipe.xack(self.stream, settings.review_stream_group, *message_ids)
+            pipe.xdel(self.stream, *message_ids)
+            await cache_service.call(pipe.execute())
+        return {"created": len(result["created"]), "rejected": len(result["errors"])}
+
+    async def run_worker(self, session_factory, consumer: str, batch_size: Optional[int] = None,
+                         block_ms: Optional[int] = None, stop_when_empty: bool = False) -> Dict[str, int]:
+        """
+        Drain the stream until cancelled (or, with stop_when_empty, until a read comes back empty).
+        """
+        batch_size = batch_size or settings.review_batch_size
+        block_ms = settings.review_batch_wait_ms if block_ms is None else block_ms
+        totals = {"created": 0, "rejected": 0}
+        await self.ensure_group()
+        while True:
+            try:
+                messages = await self.read_batch(consumer, batch_size, block_ms)
+                if not messages:
+                    if stop_when_empty:
+                        return totals
+                    continue
+                counts = await self.process_batch(session_factory, messages)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The batch stays pending and is re-claimed after review_claim_idle_ms
+                logger.error("Review worker %s failed a batch: %s", consumer, e)
+                if stop_when_empty:
+                    raise
+                await asyncio.sleep(1)
+                continue
+            totals["created"] += counts["created"]
+            totals["rejected"] += counts["rejected"]
+            logger.info("Review worker %s: %s created, %s rejected", consumer, counts["created"], counts["rejected"])
+
+
+review_queue = ReviewQueue()
@@ -0,0 +1,153 @@
+# app/services/search_service.py
+import re
+from typing import List
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from app.models.book import Book
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Only word characters reach the query engines, so user input can never form
+# FTS5/tsquery syntax errors or operators
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MAX_QUERY_TOKENS = 8
+
+BOOK_COLUMNS = "b.id, b.title, b.author, b.isbn, b.description, b.created_at, b.updated_at"
+
+_SQLITE_BOOKS_SQL = f"""
+    SELECT {BOOK_COLUMNS}
+    FROM (
+        SELECT rowid AS id, bm25(books_fts, 10.0, 5.0, 1.0) AS rank
+        FROM books_fts
+        WHERE books_fts MATCH :query
+        ORDER BY rank, rowid
+        LIMIT :limit OFFSET :offset
+    ) AS matches
+    JOIN books b ON b.id = matches.id
+    ORDER BY matches.rank, b.id
+"""
+# bm25() only works in a query directly over the FTS table (the LIMIT keeps SQLite
+# from flattening the subquery), so rank there and join outside. Reviews of the same
+# book may repeat; callers de-duplicate.
+_SQLITE_REVIEW_BOOK_IDS_SQL = """
+    SELECT r.book_id
+    FROM (
+        SELECT rowid AS id, bm25(reviews_fts) AS rank
+        FROM reviews_fts
+        WHERE reviews_fts MATCH :query
+        ORDER BY rank, rowid
+        LIMIT :limit
+    ) AS matches
+    JOIN reviews r ON r.id = matches.id
+    ORDER BY matches.rank, r.id
+"""
+_POSTGRES_BOOKS_SQL = f"""
+    SELECT {BOOK_COLUMNS}
+    FROM books b, {{tsquery}} AS query
+    WHERE b.search_vector @@ query
+    ORDER BY ts_rank_cd(b.search_vector, query) DESC, b.id
+    LIMIT :limit OFFSET :offset
+"""
+_POSTGRES_REVIEW_BOOK_IDS_SQL = """
+    SELECT r.book_id
+    FROM reviews r, {tsquery} AS query
+    WHERE r.search_vector @@ query
+    GROUP BY r.book_id
+    ORDER BY MAX(ts_rank_cd(r.search_vector, query)) DESC, r.book_id
+    LIMIT :limit
+"""
+
+
+def tokenize(query: str) -> List[str]:
+    return _TOKEN_RE.findall(query.lower())[:MAX_QUERY_TOKENS]
+
+
+def _sqlite_match(tokens: List[str], prefix: bool) -> str:
+    terms = [f'"{token}"' for token in tokens]
+    if prefix:
+        # Autocomplete: the word being typed may be incomplete
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _postgres_tsquery(tokens: List[str], prefix: bool) -> tuple:
+    if not prefix:
+        return "websearch_to_tsquery('english', :query)", " ".join(tokens)
+    terms = list(tokens)
+    terms[-1] += ":*"
+    return "to_tsquery('english', :query)", " & ".join(terms)
+
+
+class SearchService:
+
+    @staticmethod
+    async def search_books(db: AsyncSession, query: str, limit: int = 20, offset: int = 0,
+                           prefix: bool = False, include_reviews: bool = False) -> List[dict]:
+        """
+        Ranked full-text search over title (highest weight), author and description.
+
+        Backed by a GIN-indexed tsvector on Postgres and an FTS5 table on SQLite.
+        With prefix=True the last word matches as a prefix (autocomplete). With
+        include_reviews=True books whose review comments match are appended after
+        direct matches.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        dialect = db.bind.dialect.name
+        try:
+            if dialect == "postgresql":
+                tsquery, query_text = _postgres_tsquery(tokens, prefix)
+                books_sql = _POSTGRES_BOOKS_SQL.format(tsquery=tsquery)
+                reviews_sql = _POSTGRES_REVIEW_BOOK_IDS_SQL.format(tsquery=tsquery)
+            elif dialect == "sqlite":
+                query_text = _sqlite_match(tokens, prefix)
+                books_sql = _SQLITE_BOOKS_SQL
+                reviews_sql = _SQLITE_REVIEW_BOOK_IDS_SQL
+            else:
+                raise ValueError(f"Full-text search is not supported on {dialect}")
+
+            # Typed result columns so timestamps come back as datetimes on every backend
+            result = await db.execute(
+                text(books_sql).columns(*Book.__table__.c),
+                {"query": query_text, "limit": limit, "offset": offset}
+            )
+            books = [dict(row) for row in result.mappings().all()]
+
+            if include_reviews and len(books) < limit:
+                books.extend(await SearchService._books_matched_by_reviews(
+                    db, reviews_sql, query_text, {book["id"] for book in books}, limit - len(books)
+                ))
+            return books
+        except SQLAlchemyError as e:
+            logger.error("Database error searching books for %r: %s", query, e)
+            raise
+
+    @staticmethod
+    async def suggest_titles(db: AsyncSession, query: str, limit: int = 10) -> List[dict]:
+        """
+        Lightweight autocomplete: id, title and author of the best prefix matches.
+        """
+        books = await SearchService.search_books(db, query, limit=limit, prefix=True)
+        return [{"id": book["id"], "title": book["title"], "author": book["author"]} for book in books]
+
+    @staticmethod
+    async def _books_matched_by_reviews(db: AsyncSession, sql: str, query_text: str,
+                                        exclude_ids: set, limit: int) -> List[dict]:
+        # Over-fetch since several matching reviews can belong to the same book
+        result = await db.execute(
+            text(sql), {"query": query_text, "limit": (limit + len(exclude_ids)) * 5}
+        )
+        book_ids = []
+        for book_id in result.scalars().all():
+            if book_id not in exclude_ids and book_id not in book_ids:
+                book_ids.append(book_id)
+        book_ids = book_ids[:limit]
+        if not book_ids:
+            return []
+        rows = await db.execute(select(Book.__table__).where(Book.id.in_(book_ids)))
+        by_id = {row["id"]: dict(row) for row in rows.mappings().all()}
+        return [by_id[book_id] for book_id in book_ids if book_id in by_id]
@@ -0,0 +1,116 @@
+# app/services/versions.py
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, replace
+from typing import Optional
+from app.core.config import settings
+from app.services.cache import cache_service
+
+logger = logging.getLogger(__name__)
+
+# Version scopes: the book list, every review (for embedded stats), and one book's reviews/stats
+CATALOGUE = "catalogue"
+ALL_REVIEWS = "reviews"
+
+
+def book_scope(book_id: int) -> str:
+    return f"book:{book_id}"
+
+
+def _key(scope: str) -> str:
+    return f"version:{scope}"
+
+
+@dataclass(frozen=True)
+class Version:
+    """Validators for a response: an opaque tag and the time of the last change."""
+    tag: str
+    modified: float
+
+    @property
+    def etag(self) -> str:
+        # Weak: the same version may be sent with different Content-Encodings
+        return f'W/"{self.tag}"'
+
+    def varied(self, **params) -> "Version":
+        """
+        This version for one variant of a resource, identified by its (parsed, so
+        normalized) query parameters: different pages or shapes of the same data
+        must not share a tag, or a client could get a 304 for a body it never had.
+        """
+        variant = "&".join(f"{name}={params[name]}" for name in sorted(params))
+        digest = hashlib.blake2b(variant.encode(), digest_size=6).hexdigest()
+        return replace(self, tag=f"{self.tag}.{digest}")
+
+
+class VersionService:
+    """
+    Change counters kept in Redis, bumped by writes and read by conditional GETs,
+    so a 304 can be answered without touching the database.
+
+    Each scope is a hash {v, mtime}. Reads of an existing counter don't write; a
+    missing one (never written, expired after version_ttl or flushed) is created
+    by the read that finds it. A new counter starts at the current time in
+    microseconds rather than at 0, so a counter that expired or was evicted
+    never repeats a tag a client may still hold.
+    """
+
+    @staticmethod
+    def _initial_value() -> int:
+        return int(time.time() * 1_000_000)
+
+    async def get(self, *scopes: str) -> Optional[Version]:
+        """
+        Combined version of one or more scopes, or None when Redis can't answer
+        (callers then skip conditional handling).
+        """
+        if not cache_service.is_available:
+            return None
+        try:
+            async with cache_service.redis_client.pipeline(transaction=False) as pipe:
+                for scope in scopes:
+                    pipe.hgetall(_key(scope))
+                replies = await cache_service.call(pipe.execute())
+
+            missing = [i for i, values in enumerate(replies) if not values]
+            if missing:
+                # HSETNX keeps whichever counter a concurrent read or bump created first
+                now = time.time()
+                async with cache_service.redis_client.pipeline(transaction=False) as pipe:
+                    for i in missing:
+                        pipe.hsetnx(_key(scopes[i]), "v", self._initial_value())
+                        pipe.hsetnx(_key(scopes[i]), "mtime", now)
+                        pipe.expire(_key(scopes[i]), settings.version_ttl)
+                        pipe.hgetall(_key(scopes[i]))
+                    created = await cache_service.call(pipe.execute())
+                for n, i in enumerate(missing):
+                    replies[i] = created[n * 4 + 3]
+
+            tags, modified = [], 0.0
+            for values in replies:
+                tags.append(values[b"v"].decode())
+                modified = max(modified, float(values[b"mtime"]))
+            return Version(tag="-".join(tags), modified=modified)
+        except Exception as e:
+            logger.warning("Version lookup failed for %s: %s", scopes, e)
+            return None
+
+    async def bump(self, *scopes: str) -> None:
+        if not cache_service.enabled:
+            return
+        try:
+            now = time.time()
+            async with cache_service.redis_client.pipeline(transaction=True) as pipe:
+                for scope in scopes:
+                    pipe.hsetnx(_key(scope), "v", self._initial_value())
+                    pipe.hincrby(_key(scope), "v", 1)
+                    pipe.hset(_key(scope), "mtime", now)
+                    pipe.expire(_key(scope), settings.version_ttl)
+                # Forced through an open breaker: a skipped bump would leave clients a stale ETag
+                await cache_service.call(pipe.execute(), force=True)
+        except Exception as e:
+            logger.warning("Version bump failed for %s: %s", scopes, e)
+
+
+version_service = VersionService()
@@ -1,15 +1,39 @@
 # tests/conftest.py
+import os
+import shutil
+import tempfile
+import fakeredis
 import pytest
+from unittest.mock import patch
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 from app.main import app
-from app.core.database import get_db, Base
+from app.core import logger as app_logger
+from app.core.database import get_db, get_async_db, Base, enable_sqlite_foreign_keys
+from app.core.diagnostics import instrument_queries
+from app.core.config import settings
+from app.services.cache import cache_service
+
+# The test database and the log files the app writes live outside the source tree
+TEST_DIR = tempfile.mkdtemp(prefix="book-review-tests-")
+app_logger.log_dir = os.path.join(TEST_DIR, "logs")
 
 # Test database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{os.path.join(TEST_DIR, 'test.db')}"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# NullPool: every TestClient runs its own event loop, so connections must not be shared
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+AsyncTestingSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+enable_sqlite_foreign_keys(engine)
+enable_sqlite_foreign_keys(async_engine.sync_engine)
+instrument_queries(async_engine.sync_engine, "test")
 
 def override_get_db():
     try:
@@ -18,7 +42,14 @@ def override_get_db():
     finally:
         db.close()
 
+async def override_get_async_db():
+    async with AsyncTestingSessionLocal() as db:
+        yield db
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+# The warmer would read the application database; tests drive it explicitly
+settings.cache_warm_enabled = False
 
 @pytest.fixture(scope="session")
 def setup_database():
@@ -26,6 +57,8 @@ def setup_database():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
 
 @pytest.fixture
 def client(setup_database):
@@ -36,9 +69,22 @@ def client(setup_database):
             conn.execute(table.delete())
         conn.commit()
     
+    # Earlier tests may have tripped the Redis circuit breaker
+    cache_service.breaker.reset()
     with TestClient(app) as test_client:
         yield test_client
 
+@pytest.fixture
+def redis_server():
+    """
+    Route the app's Redis calls to a fresh in-memory server and yield it; code
+    running on another event loop opens its own FakeAsyncRedis(server=...).
+    """
+    server = fakeredis.FakeServer()
+    with patch.object(cache_service, "redis_client", fakeredis.FakeAsyncRedis(server=server)), \
+         patch.object(cache_service, "enabled", True):
+        yield server
+
 @pytest.fixture
 def sample_book():
     return {
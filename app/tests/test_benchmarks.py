@@ -0,0 +1,26 @@
+# tests/test_benchmarks.py
+import json
+from benchmarks import run
+
+
+def test_benchmark_suite_smoke(tmp_path, capsys):
+    """A tiny run of the whole suite: it must complete without errors and compare against itself."""
+    output = tmp_path / "results.json"
+    args = ["--books", "20", "--reviews", "50", "--requests", "10", "--concurrency", "2",
+            "--iterations", "5", "--output", str(output)]
+    assert run.main(args) == 0
+
+    report = json.loads(output.read_text())
+    names = {(row["name"], row.get("cache")) for row in report["results"]}
+    assert ("GET /books/", True) in names
+    assert ("POST /books/{id}/reviews", False) in names
+    assert ("CacheService.get_or_load", None) in names
+    for row in report["results"]:
+        assert row["errors"] == 0
+        assert row["p50_ms"] <= row["p95_ms"] <= row["p99_ms"]
+
+    baseline = json.loads(output.read_text())
+    for row in baseline["results"]:
+        row["p95_ms"] /= 10
+    assert run.compare(baseline, report, max_regression=0.2)
+    assert not run.compare(report, report, max_regression=0.2)
@@ -1,6 +1,7 @@
 # tests/test_books.py
 import pytest
 from fastapi.testclient import TestClient
+from app.utils.pagination import encode_cursor
 
 def test_create_book(client: TestClient, sample_book):
     response = client.post("/books/", json=sample_book)
@@ -14,13 +15,54 @@ def test_get_all_books(client: TestClient, sample_book):
     # First create a book
     client.post("/books/", json=sample_book)
     
-    # Then fetch all books
+    # Then fetch the first page of books
     response = client.get("/books/")
     assert response.status_code == 200
     data = response.json()
-    assert len(data) >= 1
+    assert len(data["items"]) >= 1
+    assert data["items"][0]["title"] == sample_book["title"]
+    assert data["next_cursor"] is None
+
+def test_get_all_books_legacy(client: TestClient, sample_book):
+    client.post("/books/", json=sample_book)
+
+    response = client.get("/books/?legacy=true")
+    assert response.status_code == 200
+    data = response.json()
+    assert isinstance(data, list)
     assert data[0]["title"] == sample_book["title"]
 
+def test_get_books_pagination(client: TestClient, unique_sample_book):
+    created_ids = []
+    for i in range(5):
+        book = dict(unique_sample_book, isbn=f"{9000000000000 + i}", title=f"Book {i}")
+        created_ids.append(client.post("/books/", json=book).json()["id"])
+
+    seen_ids = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/books/", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen_ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen_ids == sorted(created_ids)
+
+def test_get_books_invalid_cursor(client: TestClient):
+    response = client.get("/books/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 422
+    # Well-formed cursors whose id is not a book id
+    for position in ({"id": "abc"}, {"id": None}, {"id": -1}, {}):
+        response = client.get("/books/", params={"cursor": encode_cursor(position)})
+        assert response.status_code == 422
+
 def test_create_book_invalid_data(client: TestClient):
     invalid_book = {"title": "", "author": "Test Author"}  # Missing required fields
     response = client.post("/books/", json=invalid_book)
@@ -29,6 +71,25 @@ def test_create_book_invalid_data(client: TestClient):
 def test_get_book_reviews_not_found(client: TestClient):
     response = client.get("/books/99999/reviews")
     assert response.status_code == 404
+    cursor = encode_cursor({"created_at": "2024-01-01T00:00:00", "id": 5})
+    response = client.get("/books/99999/reviews", params={"cursor": cursor})
+    assert response.status_code == 404
+
+def test_review_endpoints_do_not_load_the_book(client: TestClient, sample_book, sample_review, monkeypatch):
+    from app.services.book_service import BookService
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("review endpoints should not load the Book row")
+    monkeypatch.setattr(BookService, "get_book_by_id", fail)
+
+    book_id = client.post("/books/", json=sample_book).json()["id"]
+    assert client.post(f"/books/{book_id}/reviews", json=sample_review).status_code == 201
+    assert client.get(f"/books/{book_id}/reviews", params={"legacy": True}).status_code == 200
+
+    # An unknown book is rejected by the foreign key, with nothing written
+    assert client.post("/books/99999/reviews", json=sample_review).status_code == 404
+    assert client.get("/books/99999/reviews", params={"legacy": True}).status_code == 404
+    assert client.get("/books/99999/stats").status_code == 404
 
 def test_create_and_get_reviews(client: TestClient, sample_book, sample_review):
     # Create a book first
@@ -45,6 +106,138 @@ def test_create_and_get_reviews(client: TestClient, sample_book, sample_review):
     # Get reviews
     reviews_response = client.get(f"/books/{book_id}/reviews")
     assert reviews_response.status_code == 200
-    reviews = reviews_response.json()
+    reviews = reviews_response.json()["items"]
     assert len(reviews) == 1
-    assert reviews[0]["rating"] == sample_review["rating"]
\ No newline at end of file
+    assert reviews[0]["rating"] == sample_review["rating"]
+
+    # Old clients still get the plain list
+    legacy_reviews = client.get(f"/books/{book_id}/reviews", params={"legacy": True}).json()
+    assert legacy_reviews == reviews
+
+def test_get_reviews_pagination(client: TestClient, sample_book, sample_review):
+    book_id = client.post("/books/", json=sample_book).json()["id"]
+    created_ids = [
+        client.post(f"/books/{book_id}/reviews", json=dict(sample_review, reviewer_name=f"R{i}")).json()["id"]
+        for i in range(5)
+    ]
+
+    seen_ids = []
+    params = {"limit": 2}
+    while True:
+        page = client.get(f"/books/{book_id}/reviews", params=params).json()
+        seen_ids.extend(item["id"] for item in page["items"])
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+
+    # Reviews created within the same second are ordered newest id first
+    assert seen_ids == sorted(created_ids, reverse=True)
+def test_get_book_stats(client: TestClient, sample_book, sample_review):
+    book_id = client.post("/books/", json=sample_book).json()["id"]
+
+    response = client.get(f"/books/{book_id}/stats")
+    assert response.status_code == 200
+    assert response.json()["review_count"] == 0
+    assert response.json()["average_rating"] is None
+
+    for rating in (5, 4, 4):
+        client.post(f"/books/{book_id}/reviews", json=dict(sample_review, rating=rating))
+
+    stats = client.get(f"/books/{book_id}/stats").json()
+    assert stats["review_count"] == 3
+    assert stats["average_rating"] == 4.33
+    assert stats["histogram"] == {"1": 0, "2": 0, "3": 0, "4": 2, "5": 1}
+
+    page = client.get("/books/", params={"include_stats": True}).json()
+    assert page["items"][0]["stats"]["review_count"] == 3
+
+def test_only_include_stats_pages_carry_stats(client: TestClient, sample_book):
+    book_fields = {"id", "title", "author", "isbn", "description", "created_at", "updated_at"}
+    assert set(client.post("/books/", json=sample_book).json()) == book_fields
+    bulk = client.post("/books/bulk", json=[dict(sample_book, isbn="4444444444444")]).json()
+    assert set(bulk["created"][0]) == book_fields
+    assert set(client.get("/books/search", params={"q": "test"}).json()["items"][0]) == book_fields
+    assert set(client.get("/books/").json()["items"][0]) == book_fields
+    assert set(client.get("/books/", params={"include_stats": True}).json()["items"][0]) == book_fields | {"stats"}
+
+def test_get_book_stats_not_found(client: TestClient):
+    response = client.get("/books/99999/stats")
+    assert response.status_code == 404
+
+def test_bulk_create_books(client: TestClient, sample_book):
+    client.post("/books/", json=sample_book)
+    rows = [
+        {"title": "Bulk A", "author": "Author", "isbn": "1111111111111"},
+        {"title": "Bulk B", "author": "Author", "isbn": sample_book["isbn"]},  # already exists
+        {"title": "", "author": "Author", "isbn": "2222222222222"},  # invalid
+        {"title": "Bulk C", "author": "Author", "isbn": "1111111111111"},  # duplicate in batch
+        {"title": "Bulk D", "author": "Author", "isbn": "3333333333333"},
+    ]
+
+    response = client.post("/books/bulk", json=rows)
+    assert response.status_code == 200
+    result = response.json()
+    assert [book["isbn"] for book in result["created"]] == ["1111111111111", "3333333333333"]
+    assert [error["index"] for error in result["errors"]] == [1, 2, 3]
+    assert "already exists" in result["errors"][0]["error"]
+
+    book_id = result["created"][0]["id"]
+    assert client.get(f"/books/{book_id}/stats").json()["review_count"] == 0
+
+def test_bulk_create_reviews(client: TestClient, sample_book, sample_review):
+    book_id = client.post("/books/", json=sample_book).json()["id"]
+    rows = [dict(sample_review, rating=5), dict(sample_review, rating=0), dict(sample_review, rating=3)]
+
+    response = client.post(f"/books/{book_id}/reviews/bulk", json=rows)
+    assert response.status_code == 200
+    result = response.json()
+    assert len(result["created"]) == 2
+    assert [error["index"] for error in result["errors"]] == [1]
+
+    stats = client.get(f"/books/{book_id}/stats").json()
+    assert stats["review_count"] == 2
+    assert stats["histogram"]["5"] == 1 and stats["histogram"]["3"] == 1
+
+    assert client.post("/books/99999/reviews/bulk", json=rows).status_code == 404
+
+def test_export_books_ndjson_and_csv(client: TestClient, sample_book):
+    import csv
+    import gzip
+    import io
+    import json
+
+    client.post("/books/", json=sample_book)
+
+    response = client.get("/export/books")
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["isbn"] for row in rows] == [sample_book["isbn"]]
+
+    response = client.get("/export/books", params={"format": "csv", "gzip": True})
+    assert response.status_code == 200
+    text = gzip.decompress(response.content).decode("utf-8")
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert rows[0]["title"] == sample_book["title"]
+
+def test_search_books(client: TestClient, sample_review):
+    rows = [
+        {"title": "The Hobbit", "author": "J. R. R. Tolkien", "isbn": "9780007458424",
+         "description": "A dragon and a burglar"},
+        {"title": "Dragon Rider", "author": "Cornelia Funke", "isbn": "9780439456951"},
+        {"title": "Dune", "author": "Frank Herbert", "isbn": "9780441172719", "description": "Spice"},
+    ]
+    created = client.post("/books/bulk", json=rows).json()["created"]
+    dune_id = next(book["id"] for book in created if book["title"] == "Dune")
+    client.post(f"/books/{dune_id}/reviews", json=dict(sample_review, comment="Better than any dragon story"))
+
+    results = client.get("/books/search", params={"q": "dragon"}).json()["items"]
+    # Title match ranks above description match
+    assert [book["title"] for book in results] == ["Dragon Rider", "The Hobbit"]
+
+    results = client.get("/books/search", params={"q": "dragon", "include_reviews": True}).json()["items"]
+    assert [book["title"] for book in results][-1] == "Dune"
+
+    suggestions = client.get("/books/search/suggest", params={"q": "tolk"}).json()
+    assert [s["title"] for s in suggestions] == ["The Hobbit"]
+
+    assert client.get("/books/search", params={"q": "\"*)("}).json()["items"] == []
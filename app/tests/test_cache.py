@@ -0,0 +1,244 @@
+# tests/test_cache.py
+import asyncio
+import fakeredis
+import pytest
+import time
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.config import settings
+from app.services import cache as cache_module
+from app.services.cache import CacheService, LocalCache, _MISSING, cached, encode_envelope
+
+
+async def start_listeners(*workers):
+    for worker in workers:
+        worker.start_invalidation_listener()
+    for _ in range(50):
+        if all(worker.local_cache_active for worker in workers):
+            break
+        await asyncio.sleep(0.01)
+
+
+def make_cache_service(server):
+    service = CacheService()
+    service.redis_client = fakeredis.FakeAsyncRedis(server=server)
+    service.enabled = True
+    return service
+
+
+def test_local_cache_lru_eviction():
+    cache = LocalCache(max_entries=2, max_bytes=1024, default_ttl=60)
+    cache.set("a", 1, size=1)
+    cache.set("b", 2, size=1)
+    cache.get("a")  # "a" becomes most recently used
+    cache.set("c", 3, size=1)
+
+    assert cache.get("b") is _MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+def test_local_cache_byte_bound_and_ttl():
+    cache = LocalCache(max_entries=10, max_bytes=10, default_ttl=60)
+    cache.set("a", "x", size=6)
+    cache.set("b", "y", size=6)
+    assert cache.get("a") is _MISSING
+    assert cache.total_bytes == 6
+
+    cache.set("c", "z", size=1, ttl=0)
+    assert cache.get("c") is _MISSING
+
+def test_delete_invalidates_other_workers_l1():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        worker_a = make_cache_service(server)
+        worker_b = make_cache_service(server)
+        await start_listeners(worker_a, worker_b)
+
+        await worker_a.set("books:all", [{"id": 1}])
+        assert await worker_b.get("books:all") == [{"id": 1}]
+        assert "books:all" in worker_b.local_cache._entries
+
+        await worker_a.delete("books:all")
+        for _ in range(50):
+            if "books:all" not in worker_b.local_cache._entries:
+                break
+            await asyncio.sleep(0.01)
+
+        assert await worker_b.get("books:all") is None
+        await worker_a.stop_invalidation_listener()
+        await worker_b.stop_invalidation_listener()
+
+    asyncio.run(scenario())
+
+def test_get_or_load_coalesces_concurrent_misses():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        worker_a = make_cache_service(server)
+        worker_b = make_cache_service(server)
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.1)
+            return [{"id": 1}]
+
+        results = await asyncio.gather(
+            *(worker_a.get_or_load("books:all", loader, ttl=60) for _ in range(10)),
+            *(worker_b.get_or_load("books:all", loader, ttl=60) for _ in range(10)),
+        )
+        assert all(result == [{"id": 1}] for result in results)
+        assert calls == 1
+
+    asyncio.run(scenario())
+
+def test_get_or_load_serves_stale_while_another_worker_refreshes():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        worker = make_cache_service(server)
+        await worker.set_raw("books:all", encode_envelope(b'"old"', time.time() - 1, 0.0), ttl=60)
+        # Another process holds the rebuild lock
+        await worker.redis_client.set("lock:books:all", "someone-else")
+
+        async def loader():
+            return "new"
+
+        assert await worker.get_or_load("books:all", loader, ttl=60, stale_ttl=60) == "old"
+
+        await worker.redis_client.delete("lock:books:all")
+        assert await worker.get_or_load("books:all", loader, ttl=60, stale_ttl=60) == "new"
+
+    asyncio.run(scenario())
+
+def test_namespace_bump_invalidates_every_key_across_workers():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        worker_a = make_cache_service(server)
+        worker_b = make_cache_service(server)
+        await start_listeners(worker_a, worker_b)
+
+        stats_key = await worker_a.namespaced_key("book:1", "book:1:stats")
+        page_key = await worker_a.namespaced_key("book:1", "book:1:reviews:first")
+        await worker_a.set(stats_key, {"review_count": 1})
+        await worker_a.set(page_key, {"items": []})
+        # worker_b resolves the same version, now held in its L1
+        assert await worker_b.namespaced_key("book:1", "book:1:stats") == stats_key
+        assert await worker_b.get(stats_key) == {"review_count": 1}
+
+        await worker_a.bump_namespace("book:1")
+        for _ in range(50):
+            if "ns:book:1" not in worker_b.local_cache._entries:
+                break
+            await asyncio.sleep(0.01)
+
+        new_stats_key = await worker_b.namespaced_key("book:1", "book:1:stats")
+        assert new_stats_key != stats_key
+        assert await worker_b.get(new_stats_key) is None
+        assert await worker_b.get(await worker_b.namespaced_key("book:1", "book:1:reviews:first")) is None
+        # Other namespaces are untouched
+        assert await worker_b.namespaced_key("book:2", "book:2:stats") == await worker_a.namespaced_key("book:2", "book:2:stats")
+        await worker_a.stop_invalidation_listener()
+        await worker_b.stop_invalidation_listener()
+
+    asyncio.run(scenario())
+
+def test_get_many_and_set_many():
+    async def scenario():
+        worker = make_cache_service(fakeredis.FakeServer())
+        assert await worker.set_many({"a": 1, "b": [2, 3]}, ttl=60)
+        assert await worker.get_many(["a", "b", "missing"]) == {"a": 1, "b": [2, 3]}
+
+        # Envelope entries are interchangeable with get_or_load's
+        assert await worker.set_many({"book:1:stats": {"review_count": 4}}, ttl=60, envelope=True)
+
+        async def loader():
+            raise AssertionError("should be served from the cache")
+        assert await worker.get_or_load("book:1:stats", loader, ttl=60) == {"review_count": 4}
+        await worker.get_or_load("book:2:stats", lambda: asyncio.sleep(0, {"review_count": 0}), ttl=60)
+        assert await worker.get_many(["book:1:stats", "book:2:stats"], envelope=True) == {
+            "book:1:stats": {"review_count": 4},
+            "book:2:stats": {"review_count": 0},
+        }
+
+    asyncio.run(scenario())
+
+def test_cached_decorator_is_dropped_by_namespace_bump(monkeypatch):
+    worker = make_cache_service(fakeredis.FakeServer())
+    monkeypatch.setattr(cache_module, "cache_service", worker)
+    calls = []
+
+    @cached(lambda book_id: f"book:{book_id}:stats", namespace=lambda book_id: f"book:{book_id}", ttl=60)
+    async def load_stats(db, book_id):
+        calls.append(book_id)
+        return {"book_id": book_id, "review_count": len(calls)}
+
+    async def scenario():
+        assert await load_stats(None, 1) == {"book_id": 1, "review_count": 1}
+        assert await load_stats(None, 1) == {"book_id": 1, "review_count": 1}
+        await worker.bump_namespace("book:1")
+        assert await load_stats(None, 1) == {"book_id": 1, "review_count": 2}
+
+    asyncio.run(scenario())
+    assert calls == [1, 1]
+
+def test_circuit_breaker_opens_half_opens_and_closes():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05, latency_budget=0.1)
+    breaker.record_failure("boom")
+    assert breaker.state == "closed"
+    # Slower than the budget counts as a failure too
+    breaker.record_success(0.2)
+    assert breaker.state == "open" and not breaker.available
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    breaker.before_call()  # the single trial call
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure("still down")
+    assert breaker.state == "open" and breaker.trips == 2
+
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_success(0.001)
+    assert breaker.state == "closed" and breaker.consecutive_failures == 0
+
+
+class SlowRedis:
+    def __init__(self):
+        self.calls = 0
+
+    async def get(self, key):
+        self.calls += 1
+        await asyncio.sleep(10)
+
+
+def test_slow_redis_opens_the_breaker_and_reads_fall_through(monkeypatch):
+    monkeypatch.setattr(settings, "cache_op_timeout", 0.05)
+    worker = CacheService()
+    worker.redis_client = SlowRedis()
+    worker.breaker = CircuitBreaker("redis", failure_threshold=2, reset_timeout=60, latency_budget=0.1)
+
+    async def scenario():
+        started = time.monotonic()
+        assert await worker.get("book:1:stats") is None
+        assert await worker.get("book:1:stats") is None
+        # Open now: the database is used without waiting on Redis at all
+        assert not worker.is_available
+        assert await worker.get_or_load("book:1:stats", lambda: asyncio.sleep(0, {"review_count": 0})) == {"review_count": 0}
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) < 0.5
+    assert worker.redis_client.calls == 2
+    assert worker.breaker.status()["state"] == "open"
+
+
+def test_health_reports_breaker_state(client):
+    assert client.get("/health").json()["cache"]["state"] == "closed"
+    for _ in range(cache_module.cache_service.breaker.failure_threshold):
+        cache_module.cache_service.breaker.record_failure("timeout")
+    health = client.get("/health").json()
+    assert health["status"] == "degraded"
+    assert health["cache"]["state"] == "open"
+    assert health["cache"]["last_error"] == "timeout"
+    cache_module.cache_service.breaker.reset()
@@ -0,0 +1,89 @@
+# tests/test_cache_codec.py
+import asyncio
+import json
+from datetime import datetime
+import fakeredis
+from app.core.config import settings
+from app.tests.test_cache import make_cache_service
+from app.utils import cache_codec
+from app.utils.compression import PrecompressedPayload
+
+
+def catalogue_body(count: int) -> bytes:
+    return json.dumps([
+        {
+            "id": i,
+            "title": f"Book {i}: a story about caching",
+            "author": f"Author {i % 40}",
+            "isbn": str(9780000000000 + i),
+            "description": "A long description of the book that repeats quite a lot of words. " * 2,
+            "created_at": datetime(2024, 1, 1, 12, 0, i % 60).isoformat(),
+        }
+        for i in range(count)
+    ]).encode()
+
+
+def test_entries_from_every_codec_are_readable(monkeypatch):
+    value = {"id": 1, "tags": ["a", "b"], "published": datetime(2024, 5, 1), "text": "x" * 4000}
+
+    async def scenario():
+        server = fakeredis.FakeServer()
+        writer = make_cache_service(server)
+        # An entry written before the codec layer existed
+        await writer.set_raw("legacy", b'{"id": 1}')
+        monkeypatch.setattr(settings, "cache_codec", "msgpack")
+        await writer.set("msgpack", value)
+        monkeypatch.setattr(settings, "cache_codec", "json")
+        await writer.set("json", value)
+
+        reader = make_cache_service(server)
+        return [await reader.get(key) for key in ("legacy", "msgpack", "json")]
+
+    legacy, from_msgpack, from_json = asyncio.run(scenario())
+    assert legacy == {"id": 1}
+    # Both codecs decode to the same JSON-compatible value
+    assert from_msgpack == from_json == {**value, "published": "2024-05-01T00:00:00"}
+
+    # Large bodies are compressed; L1 accounts for their decoded size
+    data = cache_codec.encode(value)
+    assert cache_codec.is_framed(data) and len(data) < 1000
+    assert cache_codec.decoded_size(data) > 4000
+
+
+def test_missing_optional_packages_fall_back(monkeypatch):
+    value = {"text": "x" * 4000}
+    # As on an install without msgpack and lz4
+    monkeypatch.setitem(cache_codec._INSTALLED, cache_codec.MSGPACK, False)
+    monkeypatch.setitem(cache_codec._INSTALLED, cache_codec.LZ4, False)
+    monkeypatch.setattr(settings, "cache_codec", "msgpack")
+    monkeypatch.setattr(settings, "cache_compression", "lz4")
+
+    data = cache_codec.encode(value)
+    # Written as uncompressed JSON, which every reader can decode
+    assert cache_codec._HEADER.unpack_from(data)[2:4] == (cache_codec.JSON, cache_codec.NONE)
+    assert cache_codec.decode(data) == value
+
+
+def test_catalogue_entries_shrink():
+    body = catalogue_body(500)
+    payload = PrecompressedPayload.build(body)
+    # What storing the body next to its variants would take
+    with_identity = len(body) + sum(len(variant) for variant in payload.variants.values())
+
+    async def scenario():
+        server = fakeredis.FakeServer()
+        service = make_cache_service(server)
+
+        async def loader():
+            return payload.to_bytes()
+
+        await service.get_or_load("books:page", loader, raw=True)
+        reread = await make_cache_service(server).get_or_load("books:page", loader, raw=True)
+        return reread, fakeredis.FakeRedis(server=server).strlen("books:page")
+
+    reread, size = asyncio.run(scenario())
+    restored = PrecompressedPayload.from_bytes(reread)
+    assert restored.identity == body
+    assert restored.variants == payload.variants
+    print(f"catalogue entry: {with_identity} -> {size} bytes ({with_identity / size:.1f}x)")
+    assert with_identity / size >= 3
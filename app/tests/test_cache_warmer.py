@@ -0,0 +1,62 @@
+# tests/test_cache_warmer.py
+import asyncio
+import fakeredis
+from unittest.mock import patch
+from app.services.cache import cache_service
+from app.services.cache_warmer import LEADER_KEY, CacheWarmer, cache_warmer
+from app.tests.conftest import AsyncTestingSessionLocal
+from app.tests.test_cache import make_cache_service
+
+
+def test_refreshing_ahead_rebuilds_entries_close_to_expiry():
+    worker = make_cache_service(fakeredis.FakeServer())
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        assert await worker.get_or_load("hot", loader, ttl=60) == 1
+        assert await worker.get_or_load("hot", loader, ttl=60) == 1
+        with worker.refreshing_ahead(120):
+            assert await worker.get_or_load("hot", loader, ttl=600) == 2
+            # Renewed for 600s, so no longer within the horizon
+            assert await worker.get_or_load("hot", loader, ttl=600) == 2
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_warmer_fills_catalogue_and_most_read_books(client, redis_server):
+    rows = [{"title": f"Warm Book {i}", "author": "Author", "isbn": f"{9782000000000 + i}"} for i in range(3)]
+    book_ids = [book["id"] for book in client.post("/books/bulk", json=rows).json()["created"]]
+    cache_warmer._hits.clear()
+    for _ in range(3):
+        client.get(f"/books/{book_ids[2]}/stats")
+    client.get(f"/books/{book_ids[0]}/reviews")
+
+    async def scenario():
+        # A fresh client per event loop, as the worker would have
+        with patch.object(cache_service, "redis_client", fakeredis.FakeAsyncRedis(server=redis_server)):
+            await cache_warmer.flush_hits()
+            assert await cache_warmer.top_books(10) == [book_ids[2], book_ids[0]]
+
+            other_worker = CacheWarmer()
+            assert await cache_warmer.acquire_leadership()
+            assert not await other_worker.acquire_leadership()
+            # The leader renews its lease
+            assert await cache_warmer.acquire_leadership()
+
+            totals = await cache_warmer.warm(AsyncTestingSessionLocal, top_n=1)
+            await cache_warmer.release_leadership()
+            return totals
+
+    redis = fakeredis.FakeRedis(server=redis_server)
+    # As after a deploy or a Redis flush: nothing is cached yet
+    redis.flushall()
+    assert asyncio.run(scenario()) == {"pages": 1, "books": 1}
+    assert redis.get(LEADER_KEY) is None
+    keys = {key.decode().rsplit(":v", 1)[0] for key in redis.keys("*")}
+    assert {"books:all", "books:page:50:first", f"book:{book_ids[2]}:stats",
+            f"book:{book_ids[2]}:reviews:first"} <= keys
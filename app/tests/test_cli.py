@@ -0,0 +1,32 @@
+# tests/test_cli.py
+import gzip
+import os
+import subprocess
+import sys
+from app.cli import read_rows
+from app.tests.test_startup import PROJECT_ROOT
+
+
+def test_read_rows_opens_gzipped_files(tmp_path):
+    ndjson = tmp_path / "books.ndjson.gz"
+    with gzip.open(ndjson, "wt", encoding="utf-8") as handle:
+        handle.write('{"title": "A"}\n\n{"title": "B"}\n')
+    csv_path = tmp_path / "reviews.csv.gz"
+    with gzip.open(csv_path, "wt", encoding="utf-8", newline="") as handle:
+        handle.write("book_id,rating,comment\n1,5,\n")
+
+    assert list(read_rows(str(ndjson), "ndjson")) == [{"title": "A"}, {"title": "B"}]
+    assert list(read_rows(str(csv_path), "csv")) == [{"book_id": "1", "rating": "5"}]
+
+
+def test_export_command_exits_when_done(tmp_path):
+    # aiosqlite connections left in the pool used to keep the process alive
+    env = {**os.environ, "PYTHONPATH": PROJECT_ROOT, "DATABASE_URL": "sqlite:///./app.db"}
+    create = "from app.core.database import Base, get_engine; import app.models.book, app.models.review, app.models.book_stats; Base.metadata.create_all(get_engine())"
+    subprocess.run([sys.executable, "-c", create], cwd=tmp_path, env=env, check=True, timeout=60)
+    result = subprocess.run(
+        [sys.executable, "-m", "app.cli", "export-books", "books.ndjson"],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert (tmp_path / "books.ndjson").exists()
@@ -0,0 +1,106 @@
+# tests/test_compression.py
+import asyncio
+import gzip
+import fakeredis
+import pytest
+import zstandard
+from unittest.mock import patch
+from app.services.cache import cache_service, decode_envelope
+from app.tests.test_cache import make_cache_service
+from app.utils import compression
+from app.utils.compression import PAYLOAD_MAGIC, PrecompressedPayload, choose_encoding
+
+
+@pytest.fixture
+def many_books(client):
+    rows = [
+        {"title": f"Compressible Book {i}", "author": "Author", "isbn": f"{9781000000000 + i}",
+         "description": "A fairly long and repetitive description. " * 3}
+        for i in range(40)
+    ]
+    assert client.post("/books/bulk", json=rows).status_code == 200
+
+
+def test_choose_encoding():
+    offered = ["br", "zstd", "gzip"]
+    assert choose_encoding("gzip, deflate", offered) == "gzip"
+    assert choose_encoding("gzip;q=0.5, zstd", offered) == "zstd"
+    assert choose_encoding("br;q=0, gzip", offered) == "gzip"
+    assert choose_encoding("*", offered) == "br"
+    assert choose_encoding("identity", offered) is None
+    assert choose_encoding(None, offered) is None
+
+
+def test_payload_round_trip():
+    payload = PrecompressedPayload.build(b'{"items": []}' * 200)
+    assert "gzip" in payload.variants
+    restored = PrecompressedPayload.from_bytes(payload.to_bytes())
+    assert restored.identity == payload.identity
+    assert gzip.decompress(restored.variants["gzip"]) == payload.identity
+    # Entries written before compression existed are plain bodies
+    assert PrecompressedPayload.from_bytes(b'{"items": []}').variants == {}
+
+
+def test_small_responses_are_not_compressed(client):
+    response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_book_list_is_served_from_precompressed_cache(client, many_books, redis_server):
+    plain = client.get("/books/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+    # Cached once with every variant
+    sync_redis = fakeredis.FakeRedis(server=redis_server)
+    stored = sync_redis.get(f"books:page:50:first:v{int(sync_redis.get('ns:catalogue'))}")
+    assert decode_envelope(stored, raw=True)["value"].startswith(PAYLOAD_MAGIC)
+
+    # Hits send a stored variant: nothing is compressed per request
+    with patch("app.middleware.compression.compress", side_effect=AssertionError("compressed per request")):
+        gzipped = client.get("/books/", headers={"Accept-Encoding": "gzip"})
+        zstd = client.get("/books/", headers={"Accept-Encoding": "zstd"})
+
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.content == plain.content  # httpx decodes gzip
+    assert zstd.headers["content-encoding"] == "zstd"
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(zstd.content) == plain.content
+    assert int(zstd.headers["content-length"]) < len(plain.content)
+
+
+def test_uncached_and_streamed_responses_are_compressed(client, many_books):
+    with patch.object(cache_service, "enabled", False):
+        page = client.get("/books/?include_stats=true", headers={"Accept-Encoding": "gzip"})
+        assert page.headers["content-encoding"] == "gzip"
+        assert len(page.json()["items"]) == 40
+
+        export = client.get("/export/books", headers={"Accept-Encoding": "gzip"})
+        assert export.headers["content-encoding"] == "gzip"
+        assert "content-length" not in export.headers
+        assert len(export.text.splitlines()) == 40
+
+        # Already-compressed dumps are passed through
+        archive = client.get("/export/books?gzip=true", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in archive.headers
+
+
+def test_l1_hits_do_not_decompress_the_body():
+    body = b'{"items": [' + b'{"title": "Compressible"},' * 200 + b'{}]}'
+    service = make_cache_service(fakeredis.FakeServer())
+    service.local_cache_active = True
+    decompress = patch.object(compression, "decompress", wraps=compression.decompress)
+
+    async def loader():
+        return PrecompressedPayload.build(body).to_bytes()
+
+    async def scenario():
+        with decompress as spy:
+            for _ in range(3):
+                payload = await service.get_or_load(
+                    "books:page", loader, raw=True, decode=PrecompressedPayload.from_bytes
+                )
+                assert payload.identity == body
+            return spy.call_count
+
+    # Rebuilt once, when the entry went into L1; Redis still holds only the variants
+    assert asyncio.run(scenario()) == 1
@@ -0,0 +1,88 @@
+# tests/test_conditional.py
+import fakeredis
+from unittest.mock import AsyncMock, patch
+from redis.asyncio.client import Pipeline
+from app.services.book_service import BookService
+from app.services.cache import cache_service
+
+
+def test_books_etag_and_304(client, sample_book, redis_server):
+    client.post("/books/", json=sample_book)
+
+    response = client.get("/books/")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert "last-modified" in response.headers
+    assert "s-maxage=" in response.headers["cache-control"]
+
+    # The 304 is answered from the version counter alone
+    with patch.object(BookService, "get_books_page_json", AsyncMock(side_effect=AssertionError("DB read"))):
+        not_modified = client.get("/books/", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert not_modified.headers["etag"] == etag
+
+        since = client.get("/books/", headers={"If-Modified-Since": response.headers["last-modified"]})
+        assert since.status_code == 304
+
+    # A new book changes the catalogue version
+    client.post("/books/", json=dict(sample_book, isbn="9999999999999"))
+    changed = client.get("/books/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()["items"]) == 2
+
+
+def test_reviews_and_stats_etag_follow_book_version(client, sample_book, sample_review, redis_server):
+    book_id = client.post("/books/", json=sample_book).json()["id"]
+    books_etag = client.get("/books/").headers["etag"]
+    reviews_etag = client.get(f"/books/{book_id}/reviews").headers["etag"]
+    stats_etag = client.get(f"/books/{book_id}/stats").headers["etag"]
+    assert client.get(f"/books/{book_id}/reviews", headers={"If-None-Match": reviews_etag}).status_code == 304
+
+    client.post(f"/books/{book_id}/reviews", json=sample_review)
+
+    assert client.get(f"/books/{book_id}/reviews", headers={"If-None-Match": reviews_etag}).status_code == 200
+    assert client.get(f"/books/{book_id}/stats", headers={"If-None-Match": stats_etag}).status_code == 200
+    # Plain book pages don't embed reviews, so their tag is unaffected
+    assert client.get("/books/", headers={"If-None-Match": books_etag}).status_code == 304
+
+
+def test_no_validators_without_redis(client, sample_book):
+    with patch.object(cache_service, "enabled", False):
+        client.post("/books/", json=sample_book)
+        response = client.get("/books/", headers={"If-None-Match": "*"})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert "cache-control" in response.headers
+
+
+def test_query_variants_have_their_own_etag(client, sample_book, redis_server):
+    client.post("/books/", json=sample_book)
+    first = client.get("/books/?limit=10").headers["etag"]
+    assert client.get("/books/?limit=10", headers={"If-None-Match": first}).status_code == 304
+    for other in ("/books/?limit=20", "/books/?limit=10&include_stats=true", "/books/?legacy=true"):
+        response = client.get(other, headers={"If-None-Match": first})
+        assert response.status_code == 200
+        assert response.headers["etag"] != first
+
+
+def test_reads_of_existing_counters_do_not_write(client, sample_book, redis_server):
+    book_id = client.post("/books/", json=sample_book).json()["id"]
+    with patch.object(Pipeline, "hsetnx", side_effect=AssertionError("write on read")), \
+         patch.object(Pipeline, "expire", side_effect=AssertionError("write on read")):
+        assert "etag" in client.get(f"/books/{book_id}/stats").headers
+        assert "etag" in client.get(f"/books/{book_id}/reviews").headers
+
+
+def test_unwritten_scopes_still_get_validators(client, sample_book, redis_server):
+    book_id = client.post("/books/", json=sample_book).json()["id"]
+    # As after a deploy, a Redis flush or a week without writes: no counters at all
+    fakeredis.FakeRedis(server=redis_server).flushall()
+
+    for url in ("/books/", f"/books/{book_id}/stats", f"/books/{book_id}/reviews"):
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
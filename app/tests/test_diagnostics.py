@@ -0,0 +1,73 @@
+# tests/test_diagnostics.py
+import pytest
+from sqlalchemy import create_engine, text
+from app.core import diagnostics
+from app.core.config import settings
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "secret")
+
+
+def test_admin_endpoints_require_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "")
+    assert client.get("/admin/profiles", headers=ADMIN).status_code == 403
+
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get("/admin/profiles", headers=ADMIN).status_code == 200
+
+
+def test_profile_requested_by_header(client, admin_token):
+    assert "x-profile-id" not in client.get("/books/").headers
+    assert "x-profile-id" not in client.get("/books/", headers={"X-Profile": "wrong"}).headers
+
+    response = client.get("/books/", headers={"X-Profile": "secret"})
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+
+    listed = {str(profile["id"]): profile for profile in client.get("/admin/profiles", headers=ADMIN).json()}
+    assert listed[profile_id]["path"] == "/books/"
+    assert listed[profile_id]["status"] == 200
+
+    report = client.get(f"/admin/profiles/{profile_id}", headers=ADMIN)
+    assert report.status_code == 200
+    # Only the top entries are kept and coroutine time is split across resumes,
+    # so which app functions make the cut varies from run to run
+    assert "function calls" in report.text
+    assert client.get("/admin/profiles/999999", headers=ADMIN).status_code == 404
+
+
+def test_slow_query_log(client, admin_token, monkeypatch):
+    monkeypatch.setattr(settings, "slow_query_ms", 0)
+    diagnostics.slow_queries.clear()
+    client.get("/books/")
+
+    entries = client.get("/admin/slow-queries", headers=ADMIN).json()
+    assert any("FROM books" in entry["statement"] and entry["path"] == "/books/" for entry in entries)
+    assert all(entry["duration_ms"] >= 0 for entry in entries)
+
+
+def test_n_plus_one_detection(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "n_plus_one_threshold", 3)
+    engine = create_engine(f"sqlite:///{tmp_path / 'n1.db'}")
+    diagnostics.instrument_queries(engine, "test_n1")
+    diagnostics.n_plus_one_events.clear()
+
+    token = diagnostics.begin_request("GET", "/books/")
+    with engine.connect() as conn:
+        for book_id in range(3):
+            conn.execute(text("SELECT :id AS book_id"), {"id": book_id})
+        conn.execute(text("SELECT 1"))
+    stats = diagnostics.end_request(token)
+
+    assert stats.query_count == 4
+    assert len(diagnostics.n_plus_one_events) == 1
+    event = diagnostics.n_plus_one_events[0]
+    assert event["count"] == 3
+    assert event["statement"] == "SELECT ? AS book_id"
+    engine.dispose()
@@ -1,57 +1,99 @@
 # tests/test_integration.py
 import pytest
+import json
+import time
+import fakeredis
 from unittest.mock import patch, MagicMock, AsyncMock
 from fastapi.testclient import TestClient
+from app.services.cache import cache_service, encode_envelope
 
 def test_cache_miss_integration(client: TestClient, sample_book):
-    """Test the cache-miss path when Redis is unavailable."""
+    """Test the cache-miss path: data comes from the DB and the page gets cached."""
     
-    # Mock the cache service properly for async calls
-    with patch('app.services.book_service.cache_service') as mock_cache:
-        # Create async mock for get method
-        mock_cache.get = AsyncMock(return_value=None)
-        mock_cache.is_available = False
+    server = fakeredis.FakeServer()
+    fake_redis = fakeredis.FakeAsyncRedis(server=server)
+    real_get = fake_redis.get
+    reads = []
+
+    # Spy on Redis reads, awaiting the real call so misses are genuine misses
+    async def spy_get(key):
+        value = await real_get(key)
+        reads.append((key.decode() if isinstance(key, bytes) else key, value))
+        return value
+
+    with patch.object(cache_service, "redis_client", fake_redis), \
+         patch.object(fake_redis, "get", spy_get):
         
         # Create a book first  
         response = client.post("/books/", json=sample_book)
         assert response.status_code == 201
         
-        # Test GET /books when cache is unavailable
+        # Test GET /books on a cold cache
         response = client.get("/books/")
         assert response.status_code == 200
         data = response.json()
-        assert len(data) >= 1
-        assert data[0]["title"] == sample_book["title"]
+        assert len(data["items"]) >= 1
+        assert data["items"][0]["title"] == sample_book["title"]
         
-        # Verify cache.get was called (attempting to read from cache)
-        mock_cache.get.assert_called_with("books:all")
+        # Verify the cache was read first and missed, then filled, under the catalogue's current version
+        sync_redis = fakeredis.FakeRedis(server=server)
+        page_key = f"books:page:50:first:v{int(sync_redis.get('ns:catalogue'))}"
+        assert (page_key, None) in reads
+        assert sync_redis.exists(page_key)
+
+        # The next request is served from what was cached
+        reads.clear()
+        assert client.get("/books/").json() == data
+        assert any(key == page_key and value for key, value in reads)
+
+def test_cache_unavailable_integration(client: TestClient, sample_book):
+    """Test the cache-miss path when Redis is unavailable: Redis is never called."""
+
+    redis_client = MagicMock()
+    redis_client.get = AsyncMock(side_effect=AssertionError("Redis should not be called"))
+    with patch.object(cache_service, "redis_client", redis_client), \
+         patch.object(cache_service, "enabled", False):
+
+        response = client.post("/books/", json=sample_book)
+        assert response.status_code == 201
+
+        response = client.get("/books/")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) >= 1
+        assert data["items"][0]["title"] == sample_book["title"]
+        redis_client.get.assert_not_called()
 
 def test_cache_hit_integration(client: TestClient, sample_book):
     """Test successful cache retrieval."""
     
-    cached_books = [{
-        "id": 1,
-        "title": "Cached Book", 
-        "author": "Cached Author",
-        "isbn": "9876543210987",
-        "description": "From cache",
-        "created_at": "2024-01-01T00:00:00",
-        "updated_at": None
-    }]
+    cached_books = {
+        "items": [{
+            "id": 1,
+            "title": "Cached Book", 
+            "author": "Cached Author",
+            "isbn": "9876543210987",
+            "description": "From cache",
+            "created_at": "2024-01-01T00:00:00",
+            "updated_at": None
+        }],
+        "next_cursor": None,
+        "limit": 50
+    }
     
-    # Mock the cache service in the service layer
-    with patch('app.services.book_service.cache_service') as mock_cache:
-        # Create async mock that returns cached data
-        mock_cache.get = AsyncMock(return_value=cached_books)
-        mock_cache.is_available = True
-        
+    server = fakeredis.FakeServer()
+    # Read-through entries are stored with their soft expiry and rebuild time
+    fakeredis.FakeRedis(server=server).set("ns:catalogue", 7)
+    fakeredis.FakeRedis(server=server).set(
+        "books:page:50:first:v7",
+        encode_envelope(json.dumps(cached_books).encode(), time.time() + 3600, 0.01)
+    )
+
+    with patch.object(cache_service, "redis_client", fakeredis.FakeAsyncRedis(server=server)):
         response = client.get("/books/")
         assert response.status_code == 200
         data = response.json()
         assert data == cached_books
-        
-        # Verify cache.get was called with correct key
-        mock_cache.get.assert_called_with("books:all")
 
 def test_cache_failure_fallback(client: TestClient, sample_book):
     """Test that app works even when cache service fails."""
@@ -60,14 +102,49 @@ def test_cache_failure_fallback(client: TestClient, sample_book):
     response = client.post("/books/", json=sample_book)
     assert response.status_code == 201
     
-    # Mock cache service to raise exception
-    with patch('app.services.book_service.cache_service') as mock_cache:
-        mock_cache.get = AsyncMock(side_effect=Exception("Cache service down"))
-        mock_cache.is_available = False
+    # Mock cache reads to raise exception
+    with patch.object(cache_service.redis_client, "get", AsyncMock(side_effect=Exception("Cache service down"))):
         
         # Should still work by falling back to database
         response = client.get("/books/")
         assert response.status_code == 200
         data = response.json()
-        assert len(data) >= 1
-        assert data[0]["title"] == sample_book["title"]
\ No newline at end of file
+        assert len(data["items"]) >= 1
+        assert data["items"][0]["title"] == sample_book["title"]
+
+def test_fast_path_matches_response_model(client: TestClient, sample_book):
+    """Pre-serialized cache bodies are byte-identical to FastAPI's response_model output."""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+    from typing import List
+    from app.schemas.book import BookPage, BookResponse
+
+    client.post("/books/", json=dict(sample_book, description="Ünïcode — and \"quotes\""))
+    client.post("/books/", json=dict(sample_book, isbn="9999999999999", description=None))
+
+    for params, schema in (({}, BookPage), ({"legacy": True}, List[BookResponse])):
+        response = client.get("/books/", params=params)
+        adapter = TypeAdapter(schema)
+        model = adapter.validate_python(response.json())
+        expected = JSONResponse(
+            jsonable_encoder(adapter.dump_python(model, mode="json", exclude_unset=True))
+        ).body
+        assert response.content == expected
+        assert response.headers["content-type"] == "application/json"
+
+def test_concurrent_requests_share_event_loop(client: TestClient, sample_book):
+    """Requests run concurrently on one loop through the async DB/cache stack."""
+    import asyncio
+    import httpx
+    from app.main import app
+
+    client.post("/books/", json=sample_book)
+
+    async def fetch_many():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as async_client:
+            return await asyncio.gather(*(async_client.get("/books/") for _ in range(10)))
+
+    responses = asyncio.run(fetch_many())
+    assert all(r.status_code == 200 for r in responses)
+    assert all(r.json()["items"][0]["title"] == sample_book["title"] for r in responses)
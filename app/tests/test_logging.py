@@ -0,0 +1,87 @@
+# tests/test_logging.py
+import json
+import logging
+import queue
+import sys
+from app.core.logger import (
+    JsonFormatter, NonBlockingQueueHandler, RequestContextFilter, SamplingFilter, request_id_var
+)
+
+
+def make_record(level=logging.INFO, msg="Review created for book %s", args=(1,), name="app.services.book_service"):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_request_records_carry_the_correlation_id(client, sample_book):
+    records = queue.Queue()
+    handler = NonBlockingQueueHandler(records)
+    handler.addFilter(RequestContextFilter())
+    book_logger = logging.getLogger("app.services.book_service")
+    book_logger.addHandler(handler)
+    try:
+        response = client.post("/books/", json=sample_book, headers={"X-Request-ID": "req-123"})
+        generated = client.get("/health").headers["x-request-id"]
+    finally:
+        book_logger.removeHandler(handler)
+
+    assert response.headers["x-request-id"] == "req-123"
+    assert len(generated) == 32 and generated != "req-123"
+    record = records.get_nowait()
+    assert record.request_id == "req-123"
+    # Queued unformatted: the message is only built by the listener thread
+    assert record.msg == "Book created with ID: %s" and record.args == (response.json()["id"],)
+
+
+def test_unsafe_request_ids_are_replaced(client):
+    response = client.get("/health", headers={"X-Request-ID": "bad id\nforged: line"})
+    assert response.headers["x-request-id"] != "bad id\nforged: line"
+
+
+def test_sampling_keeps_whole_requests_and_never_drops_warnings():
+    keep_none = SamplingFilter(0.0)
+    record = make_record()
+    record.request_id = "req-1"
+    assert not keep_none.filter(record)
+    warning = make_record(level=logging.WARNING)
+    warning.request_id = "req-1"
+    assert keep_none.filter(warning)
+    outside_request = make_record()
+    outside_request.request_id = None
+    assert keep_none.filter(outside_request)
+
+    half = SamplingFilter(0.5)
+    decisions = set()
+    for _ in range(5):
+        record = make_record()
+        record.request_id = "req-2"
+        decisions.add(half.filter(record))
+    assert len(decisions) == 1
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    for _ in range(3):
+        handler.handle(make_record())
+    assert handler.dropped == 2
+
+
+def test_json_output():
+    records = queue.Queue()
+    handler = NonBlockingQueueHandler(records)
+    handler.addFilter(RequestContextFilter())
+    token = request_id_var.set("req-9")
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = make_record(level=logging.ERROR, msg="Cache get error: %s", args=("boom",))
+            record.exc_info = sys.exc_info()
+            handler.handle(record)
+    finally:
+        request_id_var.reset(token)
+
+    line = json.loads(JsonFormatter().format(records.get_nowait()))
+    assert line["message"] == "Cache get error: boom"
+    assert line["request_id"] == "req-9"
+    assert line["level"] == "ERROR"
+    assert "ValueError: boom" in line["exc_info"]
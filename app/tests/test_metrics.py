@@ -0,0 +1,81 @@
+# tests/test_metrics.py
+import asyncio
+import os
+import subprocess
+import sys
+import fakeredis
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from app.core.metrics import instrument_engine, key_family
+from app.tests.test_cache import make_cache_service
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_key_family():
+    assert key_family("books:all") == "books:all"
+    assert key_family("books:page:50:first") == "books:page"
+    assert key_family("book:12:stats") == "book:stats"
+    assert key_family("book:12:reviews:first") == "book:reviews"
+
+
+def test_cache_hit_miss_error_counters():
+    async def scenario():
+        cache = make_cache_service(fakeredis.FakeServer())
+        await cache.get("book:1:stats")
+        await cache.set("book:1:stats", {"review_count": 0})
+        await cache.get("book:1:stats")
+        cache.enabled = False
+        await cache.get("book:1:stats")
+
+    before = {result: sample("cache_requests_total", family="book:stats", result=result)
+              for result in ("hit", "miss", "error")}
+    asyncio.run(scenario())
+    for result in ("hit", "miss", "error"):
+        assert sample("cache_requests_total", family="book:stats", result=result) == before[result] + 1
+
+
+def test_sql_and_pool_metrics(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+    instrument_engine(engine, "test")
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("select 2"))
+        assert sample("db_pool_checked_out_connections", database="test") == 1
+        try:
+            conn.execute(text("SELECT * FROM missing_table"))
+        except Exception:
+            pass
+
+    assert sample("db_query_duration_seconds_count", database="test", operation="SELECT") == 2
+    assert sample("db_query_errors_total", database="test", operation="SELECT") == 1
+    assert sample("db_pool_checked_out_connections", database="test") == 0
+    engine.dispose()
+
+
+def test_metrics_endpoint_reports_route_latency(client):
+    client.get("/books/")
+    client.get("/books/999/stats")
+
+    body = client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/books/",status="200"}' in body
+    assert 'route="/books/{book_id}/stats",status="404"' in body
+    assert "cache_requests_total" in body
+
+
+def test_metrics_aggregate_across_worker_processes(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = (
+        "from app.core.metrics import CACHE_REQUESTS; "
+        "CACHE_REQUESTS.labels('books:page', 'hit').inc(3)"
+    )
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], env=env, check=True)
+
+    scrape = "from app.core.metrics import render_metrics; print(render_metrics()[0].decode())"
+    output = subprocess.run(
+        [sys.executable, "-c", scrape], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    assert 'cache_requests_total{family="books:page",result="hit"} 6.0' in output
@@ -0,0 +1,97 @@
+# tests/test_pool.py
+import threading
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from fastapi.testclient import TestClient
+from app.core import database
+from app.core.config import settings
+from app.core.pool import TimedNullPool, TimedQueuePool, pool_status
+from app.main import app
+
+
+@pytest.fixture
+def pooled_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_pool_stats_track_checkouts_and_waits(pooled_engine):
+    with pooled_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        status = pool_status(pooled_engine.pool)
+        assert status["checked_out"] == 1
+
+    status = pool_status(pooled_engine.pool)
+    assert status["pool_class"] == "TimedQueuePool"
+    assert status["checked_out"] == 0
+    assert status["wait_seconds"]["count"] == 1
+    assert status["wait_seconds"]["buckets"]["+Inf"] == 1
+
+
+def test_pool_timeout_is_counted(pooled_engine):
+    with pooled_engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            pooled_engine.connect()
+
+    status = pool_status(pooled_engine.pool)
+    assert status["timeouts"] == 1
+
+    # Counters survive engine.dispose(), which swaps in a new pool
+    pooled_engine.dispose()
+    assert pool_status(pooled_engine.pool)["timeouts"] == 1
+
+
+def test_waiting_checkout_lands_in_slower_bucket(pooled_engine):
+    pooled_engine.pool._timeout = 2
+    held = pooled_engine.connect()
+    timer = threading.Timer(0.1, held.close)
+    timer.start()
+    with pooled_engine.connect():
+        pass
+    timer.join()
+
+    buckets = pool_status(pooled_engine.pool)["wait_seconds"]["buckets"]
+    # The first checkout was immediate, the second waited ~100ms for the held connection
+    assert buckets["0.05"] == 1
+    assert buckets["+Inf"] == 2
+
+
+def test_engine_options(monkeypatch):
+    url = "postgresql+asyncpg://user:pw@db/app"
+    monkeypatch.setattr(settings, "db_statement_timeout_ms", 5000)
+    options = database.engine_options(url, is_async=True)
+    assert options["pool_size"] == settings.db_pool_size
+    assert options["pool_pre_ping"] == settings.db_pool_pre_ping
+    assert options["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+
+    sync_options = database.engine_options("postgresql+psycopg2://user:pw@db/app")
+    assert sync_options["poolclass"] is TimedQueuePool
+    assert sync_options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+    assert database.engine_options("sqlite://") == {}
+
+
+def test_engine_options_pgbouncer(monkeypatch):
+    monkeypatch.setattr(settings, "db_pgbouncer", True)
+    options = database.engine_options("postgresql+asyncpg://user:pw@db/app", is_async=True)
+    assert options["poolclass"] is TimedNullPool
+    assert "pool_size" not in options
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+
+
+def test_pool_health_endpoint():
+    with TestClient(app) as client:
+        response = client.get("/health/pool")
+    assert response.status_code == 200
+    data = response.json()
+    assert "checked_out" in data
+    assert "+Inf" in data["wait_seconds"]["buckets"]
@@ -0,0 +1,97 @@
+# tests/test_replicas.py
+import asyncio
+import pytest
+from unittest.mock import patch
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from app.api.deps import READ_PRIMARY_COOKIE
+from app.core import database
+from app.core.database import Base
+from app.core.replicas import ReplicaRouter
+from app.models.book import Book
+from app.services.cache import cache_service
+
+
+@pytest.fixture
+def replica_url(tmp_path):
+    """A second SQLite file standing in for a replica that has only seen some of the writes."""
+    path = tmp_path / "replica.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Book).values(title="Replica Book", author="Replica Author", isbn="5555555555555"))
+    engine.dispose()
+    return f"sqlite+aiosqlite:///{path}"
+
+
+def use_replicas(*urls):
+    router = ReplicaRouter([create_async_engine(url, poolclass=NullPool) for url in urls])
+    # What the background task started by the lifespan does every check interval
+    asyncio.run(router.check_all())
+    return patch.object(database, "replica_router", router), router
+
+
+def titles(response):
+    assert response.status_code == 200
+    return [book["title"] for book in response.json()["items"]]
+
+
+def test_reads_go_to_replica_and_writes_to_primary(client, sample_book, replica_url):
+    patcher, _ = use_replicas(replica_url)
+    with patcher, patch.object(cache_service, "enabled", False):
+        response = client.post("/books/", json=sample_book)
+        assert response.status_code == 201
+        assert READ_PRIMARY_COOKIE in response.cookies
+
+        # Read-your-writes: the writer keeps reading from the primary
+        assert titles(client.get("/books/")) == [sample_book["title"]]
+
+        # Everyone else (or the writer once the window is over) reads the replica
+        client.cookies.clear()
+        assert titles(client.get("/books/")) == ["Replica Book"]
+
+
+def test_unhealthy_replica_falls_back_to_primary(client, sample_book, tmp_path):
+    patcher, router = use_replicas(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    with patcher, patch.object(cache_service, "enabled", False):
+        client.post("/books/", json=sample_book)
+        client.cookies.clear()
+
+        assert router.status()[0]["healthy"] is False
+        assert titles(client.get("/books/")) == [sample_book["title"]]
+
+        # Stays out of rotation until the next health check
+        assert titles(client.get("/books/")) == [sample_book["title"]]
+
+
+def test_no_cookie_without_replicas(client, sample_book):
+    response = client.post("/books/", json=sample_book)
+    assert response.status_code == 201
+    assert READ_PRIMARY_COOKIE not in response.cookies
+
+
+def test_unchecked_replica_is_not_used(client, sample_book, replica_url):
+    router = ReplicaRouter([create_async_engine(replica_url, poolclass=NullPool)])
+    with patch.object(database, "replica_router", router), patch.object(cache_service, "enabled", False):
+        client.post("/books/", json=sample_book)
+        client.cookies.clear()
+        assert titles(client.get("/books/")) == [sample_book["title"]]
+
+
+def test_replica_reads_never_fill_the_shared_cache(client, sample_book, replica_url, redis_server):
+    patcher, _ = use_replicas(replica_url)
+    with patcher:
+        client.post("/books/", json=sample_book)
+        client.cookies.clear()
+
+        # Just written: the page and its ETag come from the primary, and so does the cached entry
+        response = client.get("/books/")
+        assert titles(response) == [sample_book["title"]]
+        etag = response.headers["etag"]
+        with patch("app.core.config.settings.replica_sticky_seconds", 0):
+            # Past the lag window: a cache hit, still the primary's page
+            assert titles(client.get("/books/")) == [sample_book["title"]]
+            assert client.get("/books/", headers={"If-None-Match": etag}).status_code == 304
+            # A page nobody cached yet is loaded from the primary too
+            assert titles(client.get("/books/?limit=10")) == [sample_book["title"]]
@@ -0,0 +1,93 @@
+# tests/test_review_queue.py
+import asyncio
+import fakeredis
+import pytest
+from unittest.mock import patch
+from app.core.config import settings
+from app.services.cache import cache_service
+from app.services.review_queue import review_queue
+from app.tests.conftest import AsyncTestingSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def queue_mode(monkeypatch):
+    monkeypatch.setattr(settings, "review_ingest_mode", "queue")
+
+
+def drain(server, **kwargs):
+    """Run a worker on its own event loop (and Redis connection) until the stream is empty."""
+    async def run():
+        with patch.object(cache_service, "redis_client", fakeredis.FakeAsyncRedis(server=server)):
+            return await review_queue.run_worker(
+                AsyncTestingSessionLocal, "test-worker", block_ms=0, stop_when_empty=True, **kwargs
+            )
+    return asyncio.run(run())
+
+
+def test_queued_review_is_inserted_by_worker(client, sample_book, sample_review, redis_server):
+    book_id = client.post("/books/", json=sample_book).json()["id"]
+
+    response = client.post(f"/books/{book_id}/reviews", json=sample_review)
+    assert response.status_code == 202
+    assert response.json()["book_id"] == book_id
+    assert response.json()["message_id"]
+    assert client.get(f"/books/{book_id}/reviews").json()["items"] == []
+
+    client.post(f"/books/{book_id}/reviews", json=dict(sample_review, rating=1))
+    assert drain(redis_server) == {"created": 2, "rejected": 0}
+
+    reviews = client.get(f"/books/{book_id}/reviews").json()["items"]
+    assert sorted(review["rating"] for review in reviews) == sorted([sample_review["rating"], 1])
+    assert client.get(f"/books/{book_id}/stats").json()["review_count"] == 2
+    assert fakeredis.FakeRedis(server=redis_server).xlen(settings.review_stream) == 0
+
+
+def test_queue_mode_validates_before_enqueueing(client, sample_book, sample_review, redis_server):
+    assert client.post("/books/999/reviews", json=sample_review).status_code == 404
+    book_id = client.post("/books/", json=sample_book).json()["id"]
+    assert client.post(f"/books/{book_id}/reviews", json=dict(sample_review, rating=9)).status_code == 422
+    assert fakeredis.FakeRedis(server=redis_server).xlen(settings.review_stream) == 0
+
+
+def test_bad_messages_are_dead_lettered(client, sample_book, redis_server):
+    book_id = client.post("/books/", json=sample_book).json()["id"]
+    redis = fakeredis.FakeRedis(server=redis_server)
+    redis.xadd(settings.review_stream, {"book_id": book_id, "review": '{"reviewer_name": "A", "rating": 4}'})
+    redis.xadd(settings.review_stream, {"book_id": 424242, "review": '{"reviewer_name": "B", "rating": 4}'})
+    redis.xadd(settings.review_stream, {"book_id": book_id, "review": "not json"})
+
+    assert drain(redis_server) == {"created": 1, "rejected": 2}
+    assert redis.xlen(f"{settings.review_stream}:dead") == 2
+    assert redis.xlen(settings.review_stream) == 0
+
+
+def test_messages_of_a_dead_worker_are_reclaimed(client, sample_book, sample_review, redis_server, monkeypatch):
+    book_id = client.post("/books/", json=sample_book).json()["id"]
+    client.post(f"/books/{book_id}/reviews", json=sample_review)
+
+    async def read_and_crash():
+        with patch.object(cache_service, "redis_client", fakeredis.FakeAsyncRedis(server=redis_server)):
+            await review_queue.ensure_group()
+            return await review_queue.read_batch("crashed-worker", 10, 0)
+    assert len(asyncio.run(read_and_crash())) == 1
+
+    monkeypatch.setattr(settings, "review_claim_idle_ms", 0)
+    assert drain(redis_server) == {"created": 1, "rejected": 0}
+
+
+def test_redelivered_messages_are_inserted_once(client, sample_book, sample_review, redis_server):
+    book_id = client.post("/books/", json=sample_book).json()["id"]
+    client.post(f"/books/{book_id}/reviews", json=sample_review)
+
+    async def deliver_twice():
+        with patch.object(cache_service, "redis_client", fakeredis.FakeAsyncRedis(server=redis_server)):
+            await review_queue.ensure_group()
+            messages = await review_queue.read_batch("test-worker", 10, 0)
+            # As if the first worker committed but died before acknowledging
+            first = await review_queue.process_batch(AsyncTestingSessionLocal, messages)
+            second = await review_queue.process_batch(AsyncTestingSessionLocal, messages)
+            return first, second
+
+    assert asyncio.run(deliver_twice()) == ({"created": 1, "rejected": 0}, {"created": 0, "rejected": 0})
+    assert len(client.get(f"/books/{book_id}/reviews").json()["items"]) == 1
+    assert client.get(f"/books/{book_id}/stats").json()["review_count"] == 1
@@ -0,0 +1,99 @@
+# tests/test_startup.py
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.cache import cache_service
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COLD_IMPORT = """
+import sys, time
+started = time.perf_counter()
+import app.main
+print(time.perf_counter() - started)
+print(",".join(name for name in ("redis", "psycopg2") if name in sys.modules))
+from app.core import database
+print(database._async_engine is None and database._replica_router is None)
+"""
+
+SERVE_AND_STOP = """
+import time
+from fastapi.testclient import TestClient
+from app.main import app
+with TestClient(app) as client:
+    # Long enough for the startup ping to open a pooled connection
+    time.sleep(0.5)
+"""
+
+
+class HangingRedis:
+    """A Redis whose DNS lookup or connect never completes."""
+
+    async def ping(self):
+        await asyncio.sleep(60)
+
+    def pubsub(self):
+        return self
+
+    async def subscribe(self, channel):
+        await asyncio.sleep(60)
+
+    async def aclose(self):
+        pass
+
+
+def test_cold_import_is_fast_and_side_effect_free(tmp_path, record_property):
+    env = {
+        **os.environ,
+        "PYTHONPATH": PROJECT_ROOT,
+        "REDIS_URL": "redis://redis.invalid:6379",
+        "DATABASE_URL": "postgresql+psycopg2://postgres@db.invalid:5432/bookreviews",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_IMPORT], cwd=tmp_path, env=env,
+        capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    seconds, loaded, no_engines = result.stdout.split("\n")[:3]
+    record_property("cold_import_seconds", float(seconds))
+    print(f"cold import of app.main: {float(seconds) * 1000:.0f} ms")
+
+    # No Redis client, no engines, no log files until the app actually starts
+    assert loaded == ""
+    assert no_engines == "True"
+    assert not (tmp_path / "logs").exists()
+
+
+def test_process_exits_after_shutdown(tmp_path):
+    # aiosqlite connections left in the pool would keep the interpreter alive
+    env = {**os.environ, "PYTHONPATH": PROJECT_ROOT, "DATABASE_URL": "sqlite:///./app.db"}
+    result = subprocess.run(
+        [sys.executable, "-c", SERVE_AND_STOP], cwd=tmp_path, env=env,
+        capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_startup_does_not_wait_for_backends(record_property):
+    with patch.object(cache_service, "redis_client", HangingRedis()):
+        started = time.perf_counter()
+        with TestClient(app) as client:
+            elapsed = time.perf_counter() - started
+            assert client.get("/health").status_code == 200
+    record_property("startup_seconds", elapsed)
+    assert elapsed < 1.0
+
+
+def test_ping_times_out():
+    async def scenario():
+        with patch.object(cache_service, "redis_client", HangingRedis()):
+            started = time.perf_counter()
+            assert await cache_service.ping(timeout=0.05) is False
+            return time.perf_counter() - started
+
+    assert asyncio.run(scenario()) < 1.0
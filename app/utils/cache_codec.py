@@ -0,0 +1,162 @@
+# app/utils/cache_codec.py
+"""
+Encoding of the values CacheService writes to Redis.
+
+Every entry written here starts with a small binary header:
+
+    magic (b"\\x00CC") | format version | codec | compression | decoded length
+
+followed by the body. The codec (CACHE_CODEC) is json or msgpack for values, or
+raw for bytes the caller already serialized; bodies of at least
+CACHE_COMPRESS_MIN_SIZE bytes are compressed with CACHE_COMPRESSION (zstd or lz4)
+when that saves space. Readers go by the header, not the settings, so entries
+written with any codec can be read while a new one is rolled out; data without
+the header is an entry from before this format (plain JSON, or raw bytes).
+
+msgpack needs the msgpack package, zstd needs zstandard and lz4 needs lz4.
+A codec or compression whose package is missing (or whose name is unknown)
+falls back to json / uncompressed when writing; an entry that needs a missing
+package to be read is an error (ValueError), which CacheService treats as a miss.
+"""
+import struct
+from typing import Any, Tuple
+from app.core.config import settings
+from app.utils import serialization
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional codec
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional compressor
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - optional compressor
+    lz4_frame = None
+
+MAGIC = b"\x00CC"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct(">3sBBBI")
+
+RAW, JSON, MSGPACK = 0, 1, 2
+NONE, ZSTD, LZ4 = 0, 1, 2
+
+_CODECS = {"json": JSON, "msgpack": MSGPACK}
+_COMPRESSIONS = {"none": NONE, "zstd": ZSTD, "lz4": LZ4}
+_INSTALLED = {JSON: True, MSGPACK: msgpack is not None, NONE: True,
+              ZSTD: zstandard is not None, LZ4: lz4_frame is not None}
+
+# Compressed bodies are kept only if they save at least this fraction, so
+# already-compressed payloads aren't stored with a pointless extra layer
+_MIN_SAVING = 0.125
+
+
+def _configured(names: dict, name: str, fallback: int) -> int:
+    # Unknown names are treated like packages that aren't installed
+    value = names.get(name.strip().lower())
+    return value if value is not None and _INSTALLED[value] else fallback
+
+
+def _serialize(value: Any, codec: int) -> bytes:
+    if codec == MSGPACK:
+        return msgpack.packb(value, default=serialization.to_jsonable, use_bin_type=True)
+    return serialization.dumps(value)
+
+
+def _deserialize(body: bytes, codec: int) -> Any:
+    if codec == JSON:
+        return serialization.loads(body)
+    if codec == MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack-encoded cache entry but msgpack is not installed")
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    raise ValueError(f"Unknown cache codec {codec}")
+
+
+def _compress(body: bytes) -> Tuple[int, bytes]:
+    if len(body) < settings.cache_compress_min_size:
+        return NONE, body
+    compression = _configured(_COMPRESSIONS, settings.cache_compression, NONE)
+    if compression == ZSTD:
+        compressed = zstandard.ZstdCompressor(level=settings.cache_compression_level).compress(body)
+    elif compression == LZ4:
+        compressed = lz4_frame.compress(body)
+    else:
+        return NONE, body
+    if len(compressed) > len(body) * (1 - _MIN_SAVING):
+        return NONE, body
+    return compression, compressed
+
+
+def _decompress(body: bytes, compression: int, size: int) -> bytes:
+    if compression == NONE:
+        return body
+    try:
+        if compression == ZSTD and zstandard is not None:
+            return zstandard.ZstdDecompressor().decompress(body, max_output_size=size)
+        if compression == LZ4 and lz4_frame is not None:
+            return lz4_frame.decompress(body)
+    except Exception as e:
+        raise ValueError(f"Corrupt compressed cache entry: {e}") from e
+    raise ValueError(f"Cache entry compressed with unsupported compression {compression}")
+
+
+def _frame(body: bytes, codec: int) -> bytes:
+    compression, stored = _compress(body)
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, codec, compression, len(body)) + stored
+
+
+def _unframe(data: bytes) -> Tuple[int, bytes]:
+    """(codec, decompressed body) of a framed entry."""
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated cache entry")
+    _, version, codec, compression, size = _HEADER.unpack_from(data)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Cache entry has unsupported format version {version}")
+    return codec, _decompress(data[_HEADER.size:], compression, size)
+
+
+def is_framed(data: bytes) -> bool:
+    return data[:len(MAGIC)] == MAGIC
+
+
+def decoded_size(data: bytes) -> int:
+    """Size of the entry's body once decompressed (what L1 will hold)."""
+    if is_framed(data) and len(data) >= _HEADER.size:
+        return _HEADER.unpack_from(data)[4]
+    return len(data)
+
+
+def encode(value: Any) -> bytes:
+    """Serialize a value with the configured codec (and compression)."""
+    codec = _configured(_CODECS, settings.cache_codec, JSON)
+    return _frame(_serialize(value, codec), codec)
+
+
+def decode(data: bytes) -> Any:
+    """Inverse of encode, for entries written with any codec or before framing."""
+    if not is_framed(data):
+        return serialization.loads(data)
+    codec, body = _unframe(data)
+    if codec == RAW:
+        raise ValueError("Cache entry holds raw bytes, not a value")
+    return _deserialize(body, codec)
+
+
+def encode_bytes(data: bytes) -> bytes:
+    """Frame already-serialized bytes, compressing them if that pays off."""
+    return _frame(data, RAW)
+
+
+def decode_bytes(data: bytes) -> bytes:
+    """Inverse of encode_bytes; data without the header is returned as-is."""
+    if not is_framed(data):
+        return data
+    codec, body = _unframe(data)
+    if codec != RAW:
+        raise ValueError("Cache entry holds a serialized value, not raw bytes")
+    return body
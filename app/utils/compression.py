@@ -0,0 +1,193 @@
+# app/utils/compression.py
+"""
+Content-Encoding helpers: negotiation, one-shot and streaming compressors, and
+pre-compressed payloads for cached response bodies.
+
+gzip is always available; zstd needs the zstandard package and br needs brotli
+(or brotlicffi). Encodings whose package is missing are simply not offered.
+"""
+import zlib
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional encoder
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional encoder
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+_INSTALLED = {"gzip": True, "zstd": zstandard is not None, "br": brotli is not None}
+
+# Cached entries with compressed variants start with this line, then a line of
+# comma-separated "encoding:length" pairs, then the bodies back to back. The
+# uncompressed body is left out and rebuilt from a variant for the rare client
+# that accepts none of them.
+PAYLOAD_MAGIC = b"PCZ2\n"
+# Cheapest to decompress first
+_DECOMPRESS_ORDER = ("zstd", "gzip", "br")
+
+
+def available_encodings() -> List[str]:
+    """Configured encodings that can be produced here, in server preference order."""
+    configured = [name.strip() for name in settings.compression_encodings.split(",") if name.strip()]
+    return [name for name in configured if _INSTALLED.get(name)]
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        # wbits=31 writes the gzip container rather than a raw zlib stream
+        compressor = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=settings.compression_zstd_level).compress(data)
+    if encoding == "br":
+        return brotli.compress(data, quality=settings.compression_brotli_quality)
+    raise ValueError(f"Unsupported content encoding '{encoding}'")
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return zlib.decompress(data, 31)
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    if encoding == "br":
+        return brotli.decompress(data)
+    raise ValueError(f"Unsupported content encoding '{encoding}'")
+
+
+class StreamCompressor:
+    """Incremental compressor for bodies sent in several chunks."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 31)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=settings.compression_zstd_level).compressobj()
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.compression_brotli_quality)
+        else:
+            raise ValueError(f"Unsupported content encoding '{encoding}'")
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        if self.encoding == "zstd":
+            return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish() if self.encoding == "br" else self._compressor.flush()
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str], offered: List[str]) -> Optional[str]:
+    """
+    Best of the offered encodings (in server preference order) that the client
+    accepts with a non-zero q-value; None means send the body as-is.
+    """
+    if not accept_encoding or not offered:
+        return None
+    accepted = _parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for name in offered:
+        quality = accepted.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class PrecompressedPayload:
+    """
+    A response body plus compressed variants produced once, when a cache entry
+    is filled, instead of on every request.
+    """
+
+    def __init__(self, identity: Optional[bytes], variants: Optional[Dict[str, bytes]] = None):
+        # None: not stored, decompressed from a variant when first needed
+        self._identity = identity
+        self.variants = variants or {}
+
+    @property
+    def identity(self) -> bytes:
+        if self._identity is None:
+            for encoding in _DECOMPRESS_ORDER:
+                if encoding in self.variants and _INSTALLED[encoding]:
+                    self._identity = decompress(self.variants[encoding], encoding)
+                    break
+            else:
+                raise ValueError(f"No decodable variant among {sorted(self.variants)}")
+        return self._identity
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held once the body is rebuilt (what an L1 entry of this payload costs)."""
+        return len(self.identity) + sum(len(body) for body in self.variants.values())
+
+    @classmethod
+    def build(cls, data: bytes) -> "PrecompressedPayload":
+        if len(data) < settings.compression_min_size:
+            return cls(data)
+        variants = {}
+        for encoding in available_encodings():
+            compressed = compress(data, encoding)
+            if len(compressed) < len(data):
+                variants[encoding] = compressed
+        return cls(data, variants)
+
+    def to_bytes(self) -> bytes:
+        """
+        The variants alone when there are any (the body is recoverable from each
+        of them), which makes cached catalogue entries several times smaller.
+        """
+        if not self.variants:
+            return self.identity
+        parts: List[Tuple[str, bytes]] = list(self.variants.items())
+        header = ",".join(f"{name}:{len(body)}" for name, body in parts).encode()
+        return PAYLOAD_MAGIC + header + b"\n" + b"".join(body for _, body in parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PrecompressedPayload":
+        """
+        Inverse of to_bytes; plain bytes (no magic line) are an uncompressed body.
+        """
+        if not data.startswith(PAYLOAD_MAGIC):
+            return cls(data)
+        header, _, bodies = data[len(PAYLOAD_MAGIC):].partition(b"\n")
+        offset, parts = 0, {}
+        for item in header.decode().split(","):
+            name, _, length = item.partition(":")
+            parts[name] = bodies[offset:offset + int(length)]
+            offset += int(length)
+        return cls(None, parts)
+
+    def select(self, accept_encoding: Optional[str]) -> Tuple[Optional[str], bytes]:
+        """(Content-Encoding or None, body) best matching the request's Accept-Encoding."""
+        offered = [name for name in available_encodings() if name in self.variants]
+        encoding = choose_encoding(accept_encoding, offered)
+        return encoding, self.variants[encoding] if encoding else self.identity
@@ -0,0 +1,60 @@
+# app/utils/conditional.py
+"""
+HTTP validators (ETag/Last-Modified), 304 handling and Cache-Control for reads.
+"""
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+from fastapi import Request, Response, status
+from app.core.config import settings
+from app.services.versions import Version
+
+
+def cache_headers(version: Optional[Version]) -> Dict[str, str]:
+    headers = {
+        "Cache-Control": (
+            f"public, max-age={settings.http_cache_max_age}, s-maxage={settings.http_cache_s_maxage}, "
+            f"stale-while-revalidate={settings.http_cache_stale_while_revalidate}"
+        )
+    }
+    if version is not None:
+        headers["ETag"] = version.etag
+        headers["Last-Modified"] = formatdate(version.modified, usegmt=True)
+    return headers
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: W/"x" and "x" are the same tag
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, version: Optional[Version]) -> bool:
+    """
+    RFC 9110 evaluation for GET: If-None-Match when present, else If-Modified-Since.
+    """
+    if version is None:
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, version.etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return int(version.modified) <= since
+    return False
+
+
+def not_modified_response(version: Version) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(version))
@@ -20,4 +20,11 @@ class ValidationException(HTTPException):
         super().__init__(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=detail
-        )
\ No newline at end of file
+        )
+
+class ForbiddenException(HTTPException):
+    def __init__(self, detail: str = "Not allowed"):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=detail
+        )
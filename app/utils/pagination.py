@@ -0,0 +1,32 @@
+# app/utils/pagination.py
+import base64
+import json
+from typing import Any, Dict, Optional
+from app.utils.exceptions import ValidationException
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """
+    Encode a keyset position (e.g. {"id": 42}) into an opaque, URL-safe cursor.
+    """
+    raw = json.dumps(position, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Decode a cursor produced by encode_cursor. Returns None for the first page.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValidationException("Invalid pagination cursor")
+    if not isinstance(position, dict):
+        raise ValidationException("Invalid pagination cursor")
+    return position
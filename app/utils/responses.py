@@ -0,0 +1,27 @@
+# app/utils/responses.py
+from typing import Dict, Optional
+from fastapi import Request
+from fastapi.responses import Response
+from app.utils.compression import PrecompressedPayload
+
+
+class PrecomputedJSONResponse(Response):
+    """
+    Sends JSON bytes that were already validated and serialized against the
+    endpoint's response model (e.g. when the cache was filled), skipping FastAPI's
+    per-request response_model validation and re-serialization.
+    """
+    media_type = "application/json"
+
+
+def precompressed_json_response(request: Request, payload: PrecompressedPayload,
+                                headers: Optional[Dict[str, str]] = None) -> PrecomputedJSONResponse:
+    """
+    Sends the cached variant matching the request's Accept-Encoding, so hot
+    payloads are never compressed per request.
+    """
+    encoding, body = payload.select(request.headers.get("accept-encoding"))
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return PrecomputedJSONResponse(body, headers=headers)
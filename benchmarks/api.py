@@ -0,0 +1,60 @@
+# benchmarks/api.py
+"""
+HTTP load scenarios driven in-process through httpx's ASGI transport, so the
+numbers cover routing, validation, services, cache and SQL but no network.
+"""
+from typing import Any, Dict, List
+import httpx
+from app.main import app
+from .env import BenchmarkEnvironment
+from .harness import run_concurrent, summarize
+
+
+def _scenarios(env: BenchmarkEnvironment, client: httpx.AsyncClient):
+    rng = env.random
+
+    async def list_books(i: int) -> bool:
+        response = await client.get("/books/")
+        return response.status_code == 200
+
+    async def create_book(i: int) -> bool:
+        response = await client.post("/books/", json={
+            "title": f"Load Book {i}",
+            "author": "Load Author",
+            "isbn": f"{env.next_isbn():013d}",
+        })
+        return response.status_code == 201
+
+    async def list_reviews(i: int) -> bool:
+        response = await client.get(f"/books/{rng.choice(env.book_ids)}/reviews")
+        return response.status_code == 200
+
+    async def create_review(i: int) -> bool:
+        response = await client.post(f"/books/{rng.choice(env.book_ids)}/reviews", json={
+            "reviewer_name": "Load Reader",
+            "rating": rng.randint(1, 5),
+            "comment": "Load test review",
+        })
+        return response.status_code == 201
+
+    return [
+        ("GET /books/", list_books),
+        ("POST /books/", create_book),
+        ("GET /books/{id}/reviews", list_reviews),
+        ("POST /books/{id}/reviews", create_review),
+    ]
+
+
+async def run_api_benchmarks(env: BenchmarkEnvironment, requests: int, concurrency: int) -> List[Dict[str, Any]]:
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for cache in (False, True):
+            await env.use_cache(cache)
+            for name, operation in _scenarios(env, client):
+                latencies, elapsed, errors = await run_concurrent(operation, requests, concurrency)
+                results.append(summarize(
+                    name, latencies, elapsed, errors,
+                    kind="api", cache=cache, concurrency=concurrency,
+                ))
+    return results
@@ -0,0 +1,107 @@
+# benchmarks/env.py
+"""
+A self-contained environment for benchmarks: a fresh SQLite database file
+seeded with a fixed, reproducible data set, and fakeredis standing in for Redis.
+"""
+import asyncio
+import os
+import random
+import tempfile
+from typing import List
+import fakeredis
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core.database import Base, enable_sqlite_foreign_keys, get_async_db
+from app.main import app
+from app.services.book_service import BookService
+from app.services.cache import cache_service
+
+SEED_CHUNK_SIZE = 1000
+
+
+class BenchmarkEnvironment:
+    def __init__(self, books: int, reviews: int, seed: int = 1234):
+        self.books = books
+        self.reviews = reviews
+        self.random = random.Random(seed)
+        self.book_ids: List[int] = []
+        self._isbns = iter(range(9790000000000, 9800000000000))
+        self._dir = tempfile.TemporaryDirectory(prefix="bookbench-")
+        path = os.path.join(self._dir.name, "bench.db")
+        self.sync_engine = create_engine(f"sqlite:///{path}")
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        enable_sqlite_foreign_keys(self.engine.sync_engine)
+        self.sessionmaker = async_sessionmaker(
+            bind=self.engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+        self.redis = fakeredis.FakeAsyncRedis()
+        self._saved_cache = (cache_service.redis_client, cache_service.is_available)
+        self._saved_override = None
+
+    async def __aenter__(self) -> "BenchmarkEnvironment":
+        Base.metadata.create_all(bind=self.sync_engine)
+
+        async def override_get_async_db():
+            async with self.sessionmaker() as db:
+                yield db
+
+        self._saved_override = app.dependency_overrides.get(get_async_db)
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        cache_service.redis_client = self.redis
+        await self.seed()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await cache_service.stop_invalidation_listener()
+        cache_service.redis_client, cache_service.is_available = self._saved_cache
+        if self._saved_override is None:
+            app.dependency_overrides.pop(get_async_db, None)
+        else:
+            app.dependency_overrides[get_async_db] = self._saved_override
+        await self.engine.dispose()
+        self.sync_engine.dispose()
+        self._dir.cleanup()
+
+    async def seed(self) -> None:
+        """Insert the books and reviews through the same bulk path the importer uses."""
+        for start in range(0, self.books, SEED_CHUNK_SIZE):
+            rows = [
+                {
+                    "title": f"Benchmark Book {i}",
+                    "author": f"Author {i % 97}",
+                    "isbn": f"{9780000000000 + i}",
+                    "description": "Seeded for benchmarks " * 4,
+                }
+                for i in range(start, min(start + SEED_CHUNK_SIZE, self.books))
+            ]
+            async with self.sessionmaker() as db:
+                result = await BookService.bulk_create_books(db, rows)
+            self.book_ids.extend(book["id"] for book in result["created"])
+
+        for start in range(0, self.reviews, SEED_CHUNK_SIZE):
+            rows = [
+                {
+                    "book_id": self.random.choice(self.book_ids),
+                    "reviewer_name": f"Reader {i % 500}",
+                    "rating": self.random.randint(1, 5),
+                    "comment": "Seeded review",
+                }
+                for i in range(start, min(start + SEED_CHUNK_SIZE, self.reviews))
+            ]
+            async with self.sessionmaker() as db:
+                await BookService.bulk_create_reviews(db, rows)
+
+    def next_isbn(self) -> int:
+        """ISBNs for books created during the run, disjoint from the seeded ones."""
+        return next(self._isbns)
+
+    async def use_cache(self, enabled: bool) -> None:
+        """Switch Redis (and the pub/sub-backed L1) on or off, starting from an empty cache."""
+        await cache_service.stop_invalidation_listener()
+        await self.redis.flushall()
+        cache_service.local_cache.clear()
+        cache_service.is_available = enabled
+        if enabled:
+            cache_service.start_invalidation_listener()
+            # Let the listener subscribe so L1 is in play from the first request
+            await asyncio.sleep(0.05)
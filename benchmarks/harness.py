@@ -0,0 +1,69 @@
+# benchmarks/harness.py
+"""
+Timing helpers shared by the API load tests and the micro-benchmarks.
+"""
+import asyncio
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+def summarize(name: str, latencies: List[float], elapsed: float, errors: int = 0, **labels: Any) -> Dict[str, Any]:
+    """
+    One result row: throughput plus latency percentiles in milliseconds.
+    """
+    count = len(latencies)
+    ordered = sorted(latencies)
+    if count >= 2:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ordered[0] if ordered else 0.0
+    return {
+        "name": name,
+        **labels,
+        "operations": count,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_ops": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4) if ordered else 0.0,
+        "p50_ms": round(p50 * 1000, 4),
+        "p95_ms": round(p95 * 1000, 4),
+        "p99_ms": round(p99 * 1000, 4),
+    }
+
+
+async def run_concurrent(operation: Callable[[int], Awaitable[bool]], total: int, concurrency: int):
+    """
+    Run operation(i) total times from `concurrency` workers. operation returns
+    False for a failed call. Returns (latencies, elapsed, errors).
+    """
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            ok = await operation(i)
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started, errors
+
+
+async def time_calls(operation: Callable[[], Awaitable[Any]], iterations: int, warmup: int = 10):
+    """Sequential calls of an async operation. Returns (latencies, elapsed)."""
+    for _ in range(warmup):
+        await operation()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        await operation()
+        latencies.append(time.perf_counter() - call_started)
+    return latencies, time.perf_counter() - started
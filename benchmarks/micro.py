@@ -0,0 +1,50 @@
+# benchmarks/micro.py
+"""
+Micro-benchmarks of BookService and CacheService calls, without HTTP.
+"""
+from typing import Any, Dict, List
+from app.services.book_service import BookService
+from app.services.cache import cache_service
+from .env import BenchmarkEnvironment
+from .harness import summarize, time_calls
+
+
+async def _measure(results: List[Dict[str, Any]], name: str, operation, iterations: int, **labels) -> None:
+    latencies, elapsed = await time_calls(operation, iterations)
+    results.append(summarize(name, latencies, elapsed, kind="micro", **labels))
+
+
+async def run_micro_benchmarks(env: BenchmarkEnvironment, iterations: int) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    book_id = env.book_ids[len(env.book_ids) // 2]
+
+    for cache in (False, True):
+        await env.use_cache(cache)
+        async with env.sessionmaker() as db:
+            await _measure(results, "BookService.get_books_page_json",
+                           lambda: BookService.get_books_page_json(db, 50), iterations, cache=cache)
+            await _measure(results, "BookService.get_reviews_page",
+                           lambda: BookService.get_reviews_page(db, book_id, 50), iterations, cache=cache)
+            await _measure(results, "BookService.get_book_stats",
+                           lambda: BookService.get_book_stats(db, book_id), iterations, cache=cache)
+
+    await env.use_cache(True)
+    value = {"items": [{"id": i, "title": f"Book {i}"} for i in range(50)], "next_cursor": None, "limit": 50}
+    await cache_service.set("bench:value", value)
+    await cache_service.set_raw("bench:raw", b"x" * 20000)
+
+    async def loader():
+        return value
+
+    await _measure(results, "CacheService.set", lambda: cache_service.set("bench:value", value), iterations)
+    await _measure(results, "CacheService.get", lambda: cache_service.get("bench:value"), iterations)
+    await _measure(results, "CacheService.get_raw", lambda: cache_service.get_raw("bench:raw"), iterations)
+    await _measure(results, "CacheService.get_or_load",
+                   lambda: cache_service.get_or_load("bench:load", loader), iterations)
+
+    # Same reads with L1 out of the way: every call goes to (fake) Redis
+    await cache_service.stop_invalidation_listener()
+    await _measure(results, "CacheService.get", lambda: cache_service.get("bench:value"), iterations, l1=False)
+    await _measure(results, "CacheService.get_or_load",
+                   lambda: cache_service.get_or_load("bench:load", loader), iterations, l1=False)
+    return results
@@ -0,0 +1,136 @@
+# benchmarks/run.py
+"""
+Benchmark suite: seeds a fresh SQLite database, then measures the API under
+concurrent load and a set of service-level micro-benchmarks, with the cache
+off and on (fakeredis stands in for Redis).
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --output new.json --compare results.json
+
+Results are JSON: run metadata plus one row per scenario with throughput and
+p50/p95/p99 latency. --compare prints per-scenario p95 and throughput changes
+against an earlier file and exits with status 1 when a scenario regressed by
+more than --max-regression.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+from .api import run_api_benchmarks
+from .env import BenchmarkEnvironment
+from .micro import run_micro_benchmarks
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _row_key(row: Dict[str, Any]) -> str:
+    labels = ",".join(f"{k}={row[k]}" for k in ("kind", "cache", "l1", "concurrency") if k in row)
+    return f"{row['name']} [{labels}]"
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], max_regression: float) -> List[str]:
+    """
+    Print the p95 latency and throughput change of every scenario present in
+    both runs; returns the scenarios whose p95 or throughput got worse by more
+    than max_regression (a fraction).
+    """
+    before = {_row_key(row): row for row in baseline["results"]}
+    regressions = []
+    for row in current["results"]:
+        key = _row_key(row)
+        old = before.get(key)
+        if old is None or not old["p95_ms"] or not old["throughput_ops"]:
+            continue
+        p95_change = row["p95_ms"] / old["p95_ms"] - 1
+        throughput_change = row["throughput_ops"] / old["throughput_ops"] - 1
+        flag = ""
+        if p95_change > max_regression or throughput_change < -max_regression:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(f"{key}: p95 {old['p95_ms']:.3f} -> {row['p95_ms']:.3f} ms ({p95_change:+.1%}), "
+              f"throughput {old['throughput_ops']:.1f} -> {row['throughput_ops']:.1f}/s "
+              f"({throughput_change:+.1%}){flag}")
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    started = time.time()
+    async with BenchmarkEnvironment(args.books, args.reviews, seed=args.seed) as env:
+        results = []
+        if not args.skip_api:
+            results += await run_api_benchmarks(env, args.requests, args.concurrency)
+        if not args.skip_micro:
+            results += await run_micro_benchmarks(env, args.iterations)
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "started_at": started,
+        "parameters": {
+            "books": args.books,
+            "reviews": args.reviews,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "iterations": args.iterations,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--books", type=int, default=1000, help="Books to seed")
+    parser.add_argument("--reviews", type=int, default=10000, help="Reviews to seed")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per API scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent API clients")
+    parser.add_argument("--iterations", type=int, default=500, help="Calls per micro-benchmark")
+    parser.add_argument("--seed", type=int, default=1234, help="Random seed for data and request mix")
+    parser.add_argument("--skip-api", action="store_true")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--output", help="Write the JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Allowed relative p95/throughput regression with --compare (default 0.2)")
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    # Per-request INFO logs would dominate the measurements
+    logging.disable(logging.WARNING)
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        logging.disable(logging.NOTSET)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = compare(json.load(handle), report, args.max_regression)
+        if regressions:
+            print(f"{len(regressions)} scenario(s) regressed by more than {args.max_regression:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
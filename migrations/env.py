@@ -15,6 +15,7 @@ from app.models import book  # Make sure this imports your model
 target_metadata = book.Base.metadata
 from app.models import review 
 target_metadata = review.Base.metadata
+from app.models import book_stats
 
 # --- Alembic Config object ---
 config = context.config
@@ -0,0 +1,54 @@
+"""create book stats table
+
+Revision ID: 3c1f7a9d2b6e
+Revises: ed67eaec726f
+Create Date: 2026-10-18 10:12:31.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f7a9d2b6e'
+down_revision: Union[str, None] = 'ed67eaec726f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('book_stats',
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('review_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rating_1', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rating_2', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rating_3', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rating_4', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rating_5', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('book_id')
+    )
+    # Backfill aggregates for books that already have reviews (and zero rows for the rest)
+    op.execute("""
+        INSERT INTO book_stats (book_id, review_count, rating_sum,
+                                rating_1, rating_2, rating_3, rating_4, rating_5)
+        SELECT b.id,
+               COUNT(r.id),
+               COALESCE(SUM(r.rating), 0),
+               COUNT(r.id) FILTER (WHERE r.rating = 1),
+               COUNT(r.id) FILTER (WHERE r.rating = 2),
+               COUNT(r.id) FILTER (WHERE r.rating = 3),
+               COUNT(r.id) FILTER (WHERE r.rating = 4),
+               COUNT(r.id) FILTER (WHERE r.rating = 5)
+        FROM books b
+        LEFT JOIN reviews r ON r.book_id = b.id
+        GROUP BY b.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('book_stats')
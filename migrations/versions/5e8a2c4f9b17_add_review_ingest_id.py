@@ -0,0 +1,28 @@
+"""add review ingest id
+
+Revision ID: 5e8a2c4f9b17
+Revises: 8d2e4b7c1a93
+Create Date: 2026-10-18 14:21:07.402311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8a2c4f9b17'
+down_revision: Union[str, None] = '8d2e4b7c1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('reviews', sa.Column('ingest_id', sa.String(length=64), nullable=True))
+    op.create_index('uq_reviews_ingest_id', 'reviews', ['ingest_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_reviews_ingest_id', table_name='reviews')
+    op.drop_column('reviews', 'ingest_id')
@@ -0,0 +1,44 @@
+"""add full text search
+
+Revision ID: 8d2e4b7c1a93
+Revises: 3c1f7a9d2b6e
+Create Date: 2026-10-18 11:04:52.731906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.book import BOOKS_SEARCH_DDL
+from app.models.review import REVIEWS_SEARCH_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e4b7c1a93'
+down_revision: Union[str, None] = '3c1f7a9d2b6e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    # Postgres fills the generated tsvector columns for existing rows while adding them
+    for statement in BOOKS_SEARCH_DDL.get(dialect, []) + REVIEWS_SEARCH_DDL.get(dialect, []):
+        op.execute(statement)
+    if dialect == "sqlite":
+        # Index rows that existed before the FTS tables and triggers
+        op.execute("INSERT INTO books_fts(books_fts) VALUES ('rebuild')")
+        op.execute("INSERT INTO reviews_fts(reviews_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.drop_index('ix_reviews_search_vector', table_name='reviews')
+        op.drop_column('reviews', 'search_vector')
+        op.drop_index('ix_books_search_vector', table_name='books')
+        op.drop_column('books', 'search_vector')
+    elif dialect == "sqlite":
+        op.execute("DROP TABLE IF EXISTS reviews_fts")
+        op.execute("DROP TABLE IF EXISTS books_fts")